@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, status
 from app.api.deps import get_current_user_id
+from app.core.artifact_cache import dataset_artifacts
 from app.services import dataset_service
 from app.services.dataset_service import DatasetValidationError
 
@@ -19,6 +20,12 @@ async def get_user_datasets(user_id: str = Depends(get_current_user_id)):
         )
 
 
+@router.get("/cache/stats")
+async def dataset_cache_stats(user_id: str = Depends(get_current_user_id)):
+    """Size and hit/miss/eviction counters of this host's local dataset cache"""
+    return {"status": "success", "data": dataset_artifacts.stats()}
+
+
 @router.post("/upload")
 async def upload_dataset(
     file: UploadFile = File(...),
@@ -44,42 +51,10 @@ async def upload_dataset(
 async def delete_dataset(dataset_id: str, user_id: str = Depends(get_current_user_id)):
     """Delete a dataset (from Supabase DB and storage)"""
     try:
-        # Fetch the dataset record first
-        dataset = (
-            dataset_service.supabase.table("datasets")
-            .select("file_url, name")
-            .eq("id", dataset_id)
-            .eq("user_id", user_id)
-            .single()
-            .execute()
-        )
-
-        if not dataset.data:
+        deleted = await dataset_service.delete_dataset(dataset_id, user_id)
+        if not deleted:
             raise HTTPException(status_code=404, detail="Dataset not found")
 
-        # Extract file path from URL
-        file_name = dataset.data["name"]
-        file_path = f"{user_id}/{file_name}"
-
-        # Delete from Supabase storage
-        storage_res = (
-            dataset_service.supabase.storage.from_("datasets").remove([file_path])
-        )
-        if storage_res.get("error"):
-            raise Exception(storage_res["error"].get("message", "Storage deletion failed"))
-
-        # Delete from Supabase table
-        db_res = (
-            dataset_service.supabase.table("datasets")
-            .delete()
-            .eq("id", dataset_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
-
-        if db_res.error:
-            raise Exception("Failed to delete dataset metadata")
-
         return {"message": "Dataset deleted successfully", "dataset_id": dataset_id}
 
     except HTTPException:
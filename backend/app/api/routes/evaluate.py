@@ -1,6 +1,7 @@
 # app/api/routes/evaluate.py
 from fastapi import APIRouter, HTTPException
 from app.services.evaluate_service import evaluate_model
+from app.utils.serialization import NumpyJSONResponse
 
 router = APIRouter(prefix="/evaluate")
 
@@ -8,6 +9,6 @@ router = APIRouter(prefix="/evaluate")
 async def evaluate_route(model_id: str):
     try:
         result = await evaluate_model(model_id)
-        return result
+        return NumpyJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {e}")
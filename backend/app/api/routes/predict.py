@@ -1,14 +1,254 @@
-from typing import Any, Dict
+import asyncio
+from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import Response, StreamingResponse
 
 from app.api.deps import get_current_user_id
+from app.core.artifact_cache import model_artifacts
+from app.core.model_events import model_events
+from app.db.models import MultiModelPredictionRequest, PredictionRequest
+from app.services import predict_service
+from app.services.input_formats import MEDIA_TYPES, InputFormatError, decode_body, encode_body, format_for_media_type
+from app.services.model_metadata import model_metadata
+from app.services.predict_service import PredictionError, model_store
+from app.services.prediction_log import prediction_log
+from app.utils.serialization import NumpyJSONResponse
+from app.services.streaming_predict import OUTPUT_FORMATS, open_scoring_stream, scoring_progress
 
 router = APIRouter()
 
 
-@router.post("/predict")
-async def predict(payload: Dict[str, Any], user_id: str = Depends(get_current_user_id)):
-    return {"predictions": [], "user_id": user_id}
+@router.post("")
+async def predict(payload: PredictionRequest, user_id: str = Depends(get_current_user_id)):
+    """Score feature rows with a trained model."""
+    try:
+        result = await predict_service.predict(
+            model_id=payload.model_id,
+            user_id=user_id,
+            input_data=payload.columns if payload.columns is not None else payload.input_data,
+            return_probabilities=payload.return_probabilities,
+            save_predictions=payload.save_predictions,
+            row_details=payload.row_details,
+        )
+        return NumpyJSONResponse({"success": True, **result})
+    except PredictionError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Prediction failed: {str(e)}"
+        )
 
 
+@router.post("/multi")
+async def predict_multi(payload: MultiModelPredictionRequest, user_id: str = Depends(get_current_user_id)):
+    """
+    Score the same rows with several models and return their predictions side by side.
+
+    Models sharing a fitted preprocessor (e.g. several models trained on
+    one dataset) are grouped, and the input is transformed once per group.
+    """
+    try:
+        result = await predict_service.predict_many(
+            model_ids=payload.model_ids,
+            user_id=user_id,
+            input_data=payload.columns if payload.columns is not None else payload.input_data,
+            return_probabilities=payload.return_probabilities,
+            save_predictions=payload.save_predictions,
+            row_details=payload.row_details,
+        )
+        return NumpyJSONResponse({"success": True, **result})
+    except PredictionError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Prediction failed: {str(e)}"
+        )
+
+
+@router.post("/binary")
+async def predict_binary(
+    request: Request,
+    model_id: str,
+    return_probabilities: bool = False,
+    save_predictions: bool = True,
+    row_details: bool = False,
+    columns: Optional[str] = Query(None, description="Comma-separated names for the columns of a plain .npy array"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Score a binary body: a NumPy ``.npy`` array or an Arrow IPC stream.
+
+    The input format comes from ``Content-Type`` and the response format
+    from ``Accept`` (``application/x-npy``, ``application/vnd.apache.arrow.stream``
+    or ``application/json``), defaulting to the input format. Plain 2-D
+    ``.npy`` arrays take column names from ``columns`` or, by default, the
+    model's training columns.
+    """
+    input_format = format_for_media_type(request.headers.get("content-type"))
+    if input_format not in ("npy", "arrow"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Send {MEDIA_TYPES['npy']} or {MEDIA_TYPES['arrow']}"
+        )
+    output_format = format_for_media_type(request.headers.get("accept"), default=input_format)
+
+    try:
+        feature_names = [c.strip() for c in columns.split(",")] if columns else None
+        if feature_names is None and input_format == "npy":
+            feature_names = await predict_service.input_columns(model_id, user_id)
+        df = decode_body(await request.body(), input_format, feature_names)
+
+        model_data, predictor, predictions, probabilities, details = await predict_service.predict_arrays(
+            model_id, user_id, df, return_probabilities, save_predictions
+        )
+        if output_format == "json":
+            return NumpyJSONResponse(
+                {"success": True, "model_id": model_id, **predictor.format_result(predictions, probabilities, row_details), **details}
+            )
+        content = await asyncio.to_thread(encode_body, output_format, predictions, probabilities)
+    except (PredictionError, InputFormatError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Prediction failed: {str(e)}"
+        )
+
+    return Response(
+        content=content,
+        media_type=MEDIA_TYPES[output_format],
+        headers={
+            "X-Model-Type": str(model_data.get("model_type")),
+            "X-Samples": str(len(predictions)),
+            **({"X-Cache-Hit-Rate": str(details["cache"]["hit_rate"])} if "cache" in details else {}),
+        },
+    )
+
+
+@router.post("/file")
+async def predict_file(
+    model_id: str = Form(...),
+    file: UploadFile = File(...),
+    output_format: str = Form("ndjson"),
+    chunk_rows: Optional[int] = Form(None),
+    return_probabilities: bool = Form(False),
+    save_predictions: bool = Form(True),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Score a CSV file chunk by chunk and stream the results back as NDJSON or CSV.
+
+    Memory stays bounded by ``chunk_rows`` whatever the file size. Progress
+    is available at ``/file/jobs/{job_id}`` using the ``X-Scoring-Job-Id``
+    response header. A failure after streaming has started cannot change the
+    200 status: the stream ends with an error record (an ``{"error": ...}``
+    line for NDJSON, a ``#error:`` line for CSV), and clients must check the
+    job's final status before trusting the output.
+    """
+    try:
+        job, chunks = await open_scoring_stream(
+            model_id=model_id,
+            user_id=user_id,
+            source=file.file,
+            source_file=file.filename,
+            total_bytes=file.size,
+            output_format=output_format,
+            chunk_rows=chunk_rows,
+            return_probabilities=return_probabilities,
+            save_summary=save_predictions,
+        )
+    except PredictionError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Prediction failed: {str(e)}"
+        )
+
+    return StreamingResponse(
+        chunks,
+        media_type=OUTPUT_FORMATS[output_format],
+        headers={"X-Scoring-Job-Id": job.id},
+    )
+
+
+@router.get("/file/jobs/{job_id}")
+async def predict_file_progress(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Rows scored, bytes read and status of a streamed file prediction."""
+    job = scoring_progress.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scoring job not found")
+    return {"status": "success", "data": job.to_dict()}
+
+
+@router.get("/history")
+async def prediction_history(
+    model_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Saved predictions of a model, newest first, with summaries instead of full outputs."""
+    try:
+        items = await predict_service.get_prediction_history(model_id, user_id, limit=limit, offset=offset)
+        return {"status": "success", "data": items}
+    except PredictionError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/history/{prediction_id}/results")
+async def prediction_results(
+    prediction_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=50000),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    One page of the full outputs of a saved prediction.
+
+    Outputs kept in object storage are fetched with a range request over the
+    compressed blocks covering the page; follow ``next_offset`` for the rest.
+    """
+    try:
+        page = await predict_service.get_prediction_results(prediction_id, user_id, offset=offset, limit=limit)
+        return {"status": "success", "data": page}
+    except PredictionError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read prediction results: {str(e)}"
+        )
+
+
+@router.get("/metrics")
+async def prediction_metrics(user_id: str = Depends(get_current_user_id)):
+    """Per-model p50/p99 latency, micro-batch sizes and memo hit rates for this worker."""
+    return {
+        "status": "success",
+        "data": predict_service.batchers.metrics(),
+        "memo": predict_service.prediction_memos.stats(),
+    }
+
+
+@router.get("/log/stats")
+async def prediction_log_stats(user_id: str = Depends(get_current_user_id)):
+    """Pending, flushed and dropped rows of this worker's write-behind prediction log."""
+    return {"status": "success", "data": prediction_log.stats()}
+
+
+@router.get("/cache/stats")
+async def model_cache_stats(user_id: str = Depends(get_current_user_id)):
+    """Hit/miss/eviction counters of this worker's model caches (memory, local disk, metadata) and event bus."""
+    return {
+        "status": "success",
+        "data": {
+            "memory": model_store.stats(),
+            "disk": model_artifacts.stats(),
+            "metadata": model_metadata.stats(),
+            "events": model_events.stats(),
+        },
+    }
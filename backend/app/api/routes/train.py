@@ -1,13 +1,94 @@
 # app/api/routes/train.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from app.api.deps import get_current_user_id
-from app.services.training_service import train_model, ModelTrainingError, analyze_target_column
-from app.services.data_preprocessing import DataPreprocessingError
-from app.services.dataset_service import list_user_datasets
-from app.db.supabase_client import supabase
+from app.core.model_events import MODEL_DELETED
+from app.services.predict_service import announce_model_event
+from app.services.training_service import analyze_target_column, delete_model
+from app.services.training_jobs import job_manager, JobStatus
+from app.db import repositories
+from app.utils.serialization import NumpyJSONResponse
 
 router = APIRouter()
 
+
+def _job_payload(job):
+    return {**job.to_dict(), "queue_position": job_manager.queue_position(job)}
+
+
+@router.get("/jobs")
+async def list_training_jobs(user_id: str = Depends(get_current_user_id)):
+    """List the current user's queued, running and recently finished training jobs."""
+    jobs = sorted(job_manager.list(user_id), key=lambda j: j.created_at, reverse=True)
+    return {"status": "success", "data": [_job_payload(job) for job in jobs]}
+
+
+@router.get("/jobs/{job_id}")
+async def get_training_job(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Poll the status of a training job."""
+    job = job_manager.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return {"status": "success", "data": _job_payload(job)}
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_training_job_result(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Fetch the training result of a finished job."""
+    job = job_manager.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+
+    if job.status == JobStatus.SUCCEEDED:
+        # Results carry NumPy arrays (sample predictions, coefficients), serialized without list copies
+        return NumpyJSONResponse({
+            "status": "success",
+            "message": "Model trained successfully",
+            "data": job.result,
+        })
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Model training failed: {job.error}"
+        )
+    if job.status == JobStatus.CANCELLED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Training job was cancelled")
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Training job is still {job.status.value}"
+    )
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_training_job(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Cancel a queued or running training job."""
+    job = job_manager.cancel(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return {"status": "success", "data": _job_payload(job)}
+
+@router.delete("/models/{model_id}")
+async def delete_trained_model(model_id: str, user_id: str = Depends(get_current_user_id)):
+    """Delete a model and its artifact; every serving worker drops its cached copy."""
+    try:
+        model = await delete_model(model_id, user_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Model deletion failed: {str(e)}"
+        )
+    if model is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+
+    await announce_model_event(
+        MODEL_DELETED,
+        model_id,
+        user_id=user_id,
+        model_url=model.get("model_url"),
+        version=model.get("updated_at") or model.get("created_at"),
+    )
+    return {"status": "success", "message": "Model deleted successfully", "model_id": model_id}
+
+
 @router.get("/{dataset_id}/analyze-target")
 async def analyze_target(
         dataset_id: str,
@@ -20,15 +101,9 @@ async def analyze_target(
     """
     try:
         # Verify dataset exists and belongs to user
-        dataset_check = (
-            supabase.table("datasets")
-            .select("id")
-            .eq("id", dataset_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
+        dataset_check = await repositories.datasets.get("id", id=dataset_id, user_id=user_id)
 
-        if not dataset_check.data:
+        if not dataset_check:
             raise HTTPException(
                 status_code=404,
                 detail="Dataset not found or does not belong to user"
@@ -50,7 +125,7 @@ async def analyze_target(
 
 
 
-@router.post("/{dataset_id}")
+@router.post("/{dataset_id}", status_code=status.HTTP_202_ACCEPTED)
 async def train_user_dataset(
         dataset_id: str,
         target_col: str = Query(..., description="Target column name"),
@@ -63,8 +138,9 @@ async def train_user_dataset(
         user_id: str = Depends(get_current_user_id),
 ):
     """
-    Train a model on a given dataset.
-    Automatically preprocesses, trains, saves model, and returns metrics.
+    Submit a training job for a given dataset.
+    The job preprocesses, trains and saves the model in a worker process;
+    poll /jobs/{job_id} for status and /jobs/{job_id}/result for metrics.
 
     Args:
         dataset_id (str): The dataset ID to train on
@@ -78,53 +154,39 @@ async def train_user_dataset(
     """
     try:
         # Verify dataset exists and belongs to user
-        dataset_check = (
-            supabase.table("datasets")
-            .select("id")
-            .eq("id", dataset_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
+        dataset_check = await repositories.datasets.get("id", id=dataset_id, user_id=user_id)
 
-        if not dataset_check.data:
+        if not dataset_check:
             raise HTTPException(
                 status_code=404,
                 detail="Dataset not found or does not belong to user"
             )
 
-        # Trigger model training pipeline
-        result = await train_model(
-            dataset_id=dataset_id,
+        # Queue the model training pipeline
+        job = job_manager.submit(
             user_id=user_id,
-            target_col=target_col,
-            model_type=model_type,
-            problem_type=problem_type,
-            test_size=test_size,
-            use_polynomial=use_polynomial,
-            polynomial_degree=polynomial_degree,
-            use_target_encoder=use_target_encoder,
+            dataset_id=dataset_id,
+            params={
+                "target_col": target_col,
+                "model_type": model_type,
+                "problem_type": problem_type,
+                "test_size": test_size,
+                "use_polynomial": use_polynomial,
+                "polynomial_degree": polynomial_degree,
+                "use_target_encoder": use_target_encoder,
+            },
         )
 
         return {
-            "status": "success",
-            "message": "Model trained successfully",
-            "data": result,
+            "status": "accepted",
+            "message": "Training job queued",
+            "data": _job_payload(job),
         }
 
-    except DataPreprocessingError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Preprocessing error: {str(e)}"
-        )
-    except ModelTrainingError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Model training failed: {str(e)}"
-        )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
-        )
\ No newline at end of file
+        )
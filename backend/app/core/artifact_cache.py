@@ -0,0 +1,147 @@
+# app/core/artifact_cache.py
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class DiskArtifactCache:
+    """
+    Local on-disk cache of storage artifacts that survives process restarts.
+
+    Files are content-addressed by ``sha256(storage_path@version)`` and laid
+    out as ``<root>/<2-char prefix>/<digest>``. Writes go to a temp file in the
+    same directory and are published with an atomic ``os.replace``, so several
+    workers on one host can share the directory without ever reading a
+    partial file. A file's mtime is its last-use time; once the total size
+    exceeds ``max_bytes`` the least recently used files are deleted.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(storage_path: str, version: Optional[str] = None) -> str:
+        return hashlib.sha256(f"{storage_path}@{version or ''}".encode()).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def get_path(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        path = self.path_for(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        self._enforce_capacity(keep=path)
+        return path
+
+    async def fetch(
+            self,
+            storage_path: str,
+            download: Callable[[], Awaitable[bytes]],
+            version: Optional[str] = None,
+    ) -> str:
+        """Return a local path for the artifact, downloading it only on a disk miss."""
+        key = self.key(storage_path, version)
+        path = await asyncio.to_thread(self.get_path, key)
+        if path is not None:
+            return path
+
+        data = await download()
+        return await asyncio.to_thread(self.put_bytes, key, data)
+
+    def invalidate(self, storage_path: str, version: Optional[str] = None) -> bool:
+        try:
+            os.unlink(self.path_for(self.key(storage_path, version)))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _scan(self):
+        entries = []
+        for prefix in os.scandir(self.root):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _enforce_capacity(self, keep: Optional[str] = None) -> None:
+        with self._lock:
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._scan()
+        return {
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+model_artifacts = DiskArtifactCache(
+    root=os.path.join(settings.artifact_cache_dir, "models"),
+    max_bytes=settings.model_artifact_cache_max_bytes,
+)
+
+dataset_artifacts = DiskArtifactCache(
+    root=os.path.join(settings.artifact_cache_dir, "datasets"),
+    max_bytes=settings.dataset_cache_max_bytes,
+)
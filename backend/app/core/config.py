@@ -1,4 +1,6 @@
 # backend/config/settings.py
+import os
+import tempfile
 from functools import lru_cache
 from typing import List, Optional
 from pydantic import Field
@@ -16,6 +18,97 @@ class Settings(BaseSettings):
     supabase_anon_key: str
     supabase_service_role_key: Optional[str] = None
     supabase_jwks_url: Optional[str] = None
+    supabase_jwt_secret: Optional[str] = None
+    supabase_jwt_audience: str = "authenticated"
+
+    # Supabase HTTP pool
+    supabase_http_max_connections: int = 50
+    supabase_http_max_keepalive: int = 20
+    supabase_http_max_concurrency: int = 32
+    supabase_http_timeout_seconds: float = 30.0
+
+    # Training job queue
+    training_workers: int = 2
+    training_job_retention_seconds: int = 3600
+    training_reserve_cores: int = 1
+    training_max_cores_per_job: Optional[int] = None
+    # Job records shared by all API worker processes; the process holding the lock in this
+    # directory runs the queue (default: <artifact_cache_dir>/training-jobs)
+    training_jobs_dir: Optional[str] = None
+    training_job_poll_seconds: float = 1.0
+
+    # Model cache
+    model_cache_max_bytes: int = 1024 ** 3
+    model_cache_ttl_seconds: Optional[float] = None
+    # Map bundle arrays read-only from the local artifact so worker processes share them
+    model_mmap_enabled: bool = True
+    # Host-local model lifecycle events between worker processes (default: <artifact_cache_dir>/events)
+    model_events_dir: Optional[str] = None
+    model_prefetch_enabled: bool = True
+
+    # Serving metadata of models rows, keyed by (model_id, user_id); misses are cached for the negative TTL
+    model_metadata_cache_size: int = 10000
+    model_metadata_ttl_seconds: float = 30.0
+    model_metadata_negative_ttl_seconds: float = 5.0
+
+    # Prediction micro-batching
+    prediction_batching_enabled: bool = True
+    prediction_batch_max_rows: int = 512
+    prediction_batch_max_wait_ms: float = 5.0
+
+    # Write-behind prediction logging (rows and last_used_at are flushed in bulk)
+    prediction_log_write_behind: bool = True
+    prediction_log_flush_interval_seconds: float = 1.0
+    prediction_log_batch_rows: int = 500
+    prediction_log_max_pending_rows: int = 10000
+    prediction_log_max_pending_samples: int = 1_000_000
+
+    # Saved predictions with at least this many rows go to object storage as compressed NPZ blocks
+    prediction_output_min_rows: int = 1000
+    prediction_output_block_rows: int = 50000
+
+    # Memoize outputs per model version by input row hash (for clients re-scoring the same rows)
+    prediction_memo_enabled: bool = False
+    prediction_memo_max_entries: int = 100_000
+    prediction_memo_max_models: int = 64
+
+    # Dataset uploads are spooled to disk (default: system temp dir) and parsed in chunks
+    dataset_spool_dir: Optional[str] = None
+    dataset_upload_chunk_bytes: int = 1024 * 1024
+    dataset_upload_chunk_rows: int = 100_000
+    # Also store a typed column-major copy of each upload, so loads read only the columns they need
+    dataset_columnar_copy: bool = True
+
+    # Dataset profiling turns approximate (HyperLogLog distinct counts) from this many rows or parsed MB
+    profile_approximate_min_rows: int = 1_000_000
+    profile_approximate_min_memory_mb: int = 512
+    profile_hll_precision: int = 14
+    profile_quantile_k: int = 200
+
+    # Streamed file scoring
+    prediction_stream_chunk_rows: int = 10000
+
+    # Multi-core batch scoring (workers default to cpu_count - 1)
+    parallel_scoring_workers: Optional[int] = None
+    parallel_scoring_memory_budget_bytes: int = 512 * 1024 ** 2
+    parallel_scoring_min_rows: int = 10000
+
+    # Compiled NumPy preprocessing (falls back to sklearn when unsupported)
+    compiled_preprocessor_enabled: bool = True
+    # Compiled tree/linear models (falls back to the original estimator when unsupported)
+    compiled_model_enabled: bool = True
+
+    # Local disk cache for downloaded artifacts
+    artifact_cache_dir: str = os.path.join(tempfile.gettempdir(), "regresslab-cache")
+    model_artifact_cache_max_bytes: int = 10 * 1024 ** 3
+    # Downloaded datasets (columnar copy or CSV), keyed by dataset id and content hash
+    dataset_cache_enabled: bool = True
+    dataset_cache_max_bytes: int = 5 * 1024 ** 3
+
+    # Auth caching
+    jwks_cache_ttl_seconds: int = 600
+    jwks_min_refresh_interval_seconds: int = 30
+    token_cache_size: int = 10_000
 
     # Other integrations
     openai_api_key: Optional[str] = None
@@ -0,0 +1,197 @@
+# app/core/model_cache.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    version: Optional[str]
+    loaded_at: float
+    shared: int = 0
+
+
+class ModelCache:
+    """
+    Thread-safe, byte-budgeted LRU cache for loaded model bundles.
+
+    - Eviction is least-recently-used, driven by the total ``size`` of the
+      entries rather than their count, so one large forest can push out many
+      small linear models. ``size`` is the entry's unique resident bytes;
+      memory-mapped pages shared with other processes are reported as
+      ``shared`` bytes and do not count against the budget.
+    - Entries optionally expire after ``ttl`` seconds, and an entry whose
+      ``version`` differs from the requested one counts as a miss.
+    - Concurrent misses for the same key share one load (single-flight):
+      the first caller runs the loader, the others await its result.
+    - Listeners registered with ``add_listener`` are called with
+      ``(key, reason)`` whenever an entry is evicted or invalidated.
+    """
+
+    def __init__(self, max_bytes: int, ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._listeners: List[Callable[[Hashable, str], None]] = []
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._shared_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.coalesced = 0
+
+    # ---------------- lookups ----------------
+
+    def get(self, key: Hashable, version: Optional[str] = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._is_stale(entry, version):
+                self._remove(key, "expired")
+                return None
+            self._entries.move_to_end(key)
+            return entry.value
+
+    async def get_or_load(
+            self,
+            key: Hashable,
+            loader: Callable[[], Awaitable[Tuple[Any, int]]],
+            version: Optional[str] = None,
+    ) -> Any:
+        """
+        Return the cached value for ``key`` or load it with ``loader``.
+
+        ``loader`` is an async callable returning ``(value, size_in_bytes)``
+        or ``(value, size_in_bytes, shared_bytes)``.
+        """
+        with self._lock:
+            value = self.get(key, version)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = Future()
+                self._inflight[key] = pending
+                generation = self._generations.get(key, 0)
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            # Shielded so a cancelled waiter (e.g. a client disconnect) does not cancel the shared load
+            return await asyncio.shield(asyncio.wrap_future(pending))
+
+        try:
+            value, size, *shared = await loader()
+        except BaseException as e:
+            with self._lock:
+                self._finish_inflight(key, pending)
+            if not pending.done():
+                pending.set_exception(e)
+            raise
+
+        with self._lock:
+            self._finish_inflight(key, pending)
+            # Skip caching if the key was invalidated while we were loading
+            if self._generations.get(key, 0) == generation:
+                self.put(key, value, size, version, shared=shared[0] if shared else 0)
+        if not pending.done():
+            pending.set_result(value)
+        return value
+
+    def put(self, key: Hashable, value: Any, size: int, version: Optional[str] = None, shared: int = 0) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, "replaced")
+            if size > self.max_bytes:
+                # Larger than the whole budget: serve it, but never cache it
+                return
+            self._entries[key] = _Entry(
+                value=value, size=size, version=version, loaded_at=time.monotonic(), shared=shared
+            )
+            self._bytes += size
+            self._shared_bytes += shared
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest, "evicted")
+                self.evictions += 1
+
+    # ---------------- invalidation ----------------
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            # Callers arriving after this point must not join a load of the old artifact
+            self._inflight.pop(key, None)
+            if key not in self._entries:
+                return False
+            self._remove(key, "invalidated")
+            self.invalidations += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self.invalidate(key)
+
+    def add_listener(self, listener: Callable[[Hashable, str], None]) -> None:
+        self._listeners.append(listener)
+
+    # ---------------- internals ----------------
+
+    def _finish_inflight(self, key: Hashable, pending: Future) -> None:
+        if self._inflight.get(key) is pending:
+            del self._inflight[key]
+
+    def _is_stale(self, entry: _Entry, version: Optional[str]) -> bool:
+        if version is not None and entry.version is not None and entry.version != version:
+            return True
+        return self.ttl is not None and time.monotonic() - entry.loaded_at > self.ttl
+
+    def _remove(self, key: Hashable, reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        self._shared_bytes -= entry.shared
+        for listener in self._listeners:
+            try:
+                listener(key, reason)
+            except Exception as e:
+                print(f"[ModelCache] Listener failed for {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "shared_bytes": self._shared_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "coalesced_loads": self.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "inflight": len(self._inflight),
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
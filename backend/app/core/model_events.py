@@ -0,0 +1,137 @@
+# app/core/model_events.py
+import asyncio
+import errno
+import glob
+import json
+import os
+import socket
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+MODEL_CREATED = "model.created"
+MODEL_UPDATED = "model.updated"
+MODEL_DELETED = "model.deleted"
+
+# Datagrams above this size are not sent; events are small JSON objects
+_MAX_EVENT_BYTES = 8192
+
+
+class ModelEventBus:
+    """
+    Host-local pub/sub for model lifecycle events, without an external broker.
+
+    Every worker process binds a unix datagram socket in ``directory``;
+    publishing sends the event to every other socket found there (sockets of
+    dead workers are removed on the way). Subscribed handlers run on the
+    subscriber's event loop and receive the event dict:
+    ``{"type", "model_id", "user_id", "model_url", "version", "origin"}``.
+    On platforms without unix sockets the bus is disabled and publishing is
+    a no-op.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self.published = 0
+        self.received = 0
+
+    @property
+    def enabled(self) -> bool:
+        return hasattr(socket, "AF_UNIX")
+
+    def subscribe(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        self._handlers.append(handler)
+
+    async def start(self) -> None:
+        if self._sock is not None or not self.enabled:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self.path)
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+
+    async def close(self) -> None:
+        if self._sock is None:
+            return
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def publish(self, event_type: str, model_id: Any, **fields: Any) -> int:
+        """Send an event to every other worker; returns the number of receivers"""
+        if not self.enabled:
+            return 0
+        payload = json.dumps(
+            {"type": event_type, "model_id": model_id, "origin": os.getpid(), **fields}, default=str
+        ).encode()
+        if len(payload) > _MAX_EVENT_BYTES:
+            raise ValueError(f"Model event too large ({len(payload)} bytes)")
+
+        delivered = 0
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            sender.setblocking(False)
+            for path in glob.glob(os.path.join(self.directory, "*.sock")):
+                if path == self.path:
+                    continue
+                try:
+                    sender.sendto(payload, path)
+                    delivered += 1
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Nobody is bound to it any more: a worker that exited without cleanup
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                except OSError as e:
+                    if e.errno not in (errno.EAGAIN, errno.ENOBUFS):
+                        raise
+                    print(f"[ModelEvents] Receiver {path} is not keeping up; dropped {event_type}")
+        self.published += 1
+        return delivered
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                data = self._sock.recv(_MAX_EVENT_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            self.received += 1
+            self.dispatch(event)
+
+    def dispatch(self, event: Dict[str, Any]) -> None:
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"[ModelEvents] Handler failed for {event.get('type')}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled and self._sock is not None,
+            "subscribers": len(glob.glob(os.path.join(self.directory, "*.sock"))),
+            "published": self.published,
+            "received": self.received,
+        }
+
+
+model_events = ModelEventBus(settings.model_events_dir or os.path.join(settings.artifact_cache_dir, "events"))
@@ -41,9 +41,9 @@ class AutoModelSelector:
                 print("[AutoML] Warning: No model found. Possible reasons: time_budget too low or invalid data.")
                 print("[AutoML] Trying fallback with RandomForestRegressor...")
                 if self.task == "regression":
-                    best_model = RandomForestRegressor(n_estimators=100, random_state=42)
+                    best_model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=self.n_jobs)
                 else:
-                    best_model = RandomForestClassifier(n_estimators=100, random_state=42)
+                    best_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=self.n_jobs)
                 best_model.fit(X_train, y_train)
 
             reason = {
@@ -0,0 +1,141 @@
+# app/core/resources.py
+import asyncio
+import math
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Time constant of the kernel's 1-minute load average (an exponentially damped moving average)
+_LOAD_AVERAGE_TAU = 60.0
+
+
+@dataclass
+class CoreLease:
+    """Cores granted to one training run"""
+    cores: int
+    requested: int
+    waited_seconds: float
+    load_average: Optional[float]
+    total_cores: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _load_average() -> Optional[float]:
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        # Not available on Windows
+        return None
+
+
+class CoreBudget:
+    """
+    Process-wide budget of CPU cores shared by concurrent trainings.
+
+    Each training leases a number of cores before it starts and must size its
+    parallelism (estimator ``n_jobs``, FLAML trials, BLAS/OpenMP threads) to
+    the lease. Free cores are what is left after a reserve for the API, the
+    cores already leased, and any load on the host not caused by our own
+    leases (taken from the 1-minute load average). Released leases stay in
+    the load average for a while, so their decayed contribution is
+    subtracted too; otherwise a training queued right behind another would
+    see its predecessor as external load. When nothing is free the caller
+    waits until a lease is released or the load drops.
+    """
+
+    def __init__(
+            self,
+            total_cores: Optional[int] = None,
+            reserve_cores: int = 1,
+            max_cores_per_lease: Optional[int] = None,
+            poll_interval: float = 1.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.total_cores = total_cores or os.cpu_count() or 1
+        self.reserve_cores = min(reserve_cores, self.total_cores - 1)
+        self.max_cores_per_lease = max_cores_per_lease
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._leased = 0
+        # (released_at, cores) of recent releases still decaying out of the load average
+        self._released: List[Tuple[float, int]] = []
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def leased(self) -> int:
+        return self._leased
+
+    def _recently_released(self) -> float:
+        """Estimated load average still caused by leases released in the last minutes"""
+        now = self._clock()
+        decayed = [(at, cores, cores * math.exp(-(now - at) / _LOAD_AVERAGE_TAU)) for at, cores in self._released]
+        self._released = [(at, cores) for at, cores, remaining in decayed if remaining >= 0.05]
+        return sum(remaining for _, _, remaining in decayed if remaining >= 0.05)
+
+    def free_cores(self) -> int:
+        usable = self.total_cores - self.reserve_cores
+        load = _load_average()
+        own = self._leased + self._recently_released()
+        external = max(0.0, load - own) if load is not None else 0.0
+        return max(0, int(usable - self._leased - external))
+
+    def _cap(self, requested: Optional[int]) -> int:
+        usable = max(1, self.total_cores - self.reserve_cores)
+        cap = min(usable, self.max_cores_per_lease or usable)
+        return max(1, min(requested or cap, cap))
+
+    async def acquire(self, requested: Optional[int] = None, min_cores: int = 1,
+                      wait: bool = True) -> Optional[CoreLease]:
+        """
+        Lease up to ``requested`` cores, at least ``min_cores``
+
+        With ``wait=False`` the call never queues: it returns None when fewer
+        than ``min_cores`` are free, so latency-sensitive callers can fall back
+        to running inline instead of waiting behind training leases.
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        wanted = self._cap(requested)
+        min_cores = min(min_cores, wanted)
+        start = time.monotonic()
+
+        async with self._condition:
+            while True:
+                free = self.free_cores()
+                if not wait and free < min_cores:
+                    return None
+                # Never starve completely: with nothing leased, run on the minimum
+                if free >= min_cores or self._leased == 0:
+                    cores = max(min_cores, min(wanted, free))
+                    self._leased += cores
+                    return CoreLease(
+                        cores=cores,
+                        requested=wanted,
+                        waited_seconds=round(time.monotonic() - start, 3),
+                        load_average=_load_average(),
+                        total_cores=self.total_cores,
+                    )
+                try:
+                    await asyncio.wait_for(self._condition.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, lease: CoreLease) -> None:
+        async with self._condition:
+            self._leased = max(0, self._leased - lease.cores)
+            self._released.append((self._clock(), lease.cores))
+            self._condition.notify_all()
+
+
+core_budget = CoreBudget(
+    reserve_cores=settings.training_reserve_cores,
+    max_cores_per_lease=settings.training_max_cores_per_job,
+)
@@ -1,22 +1,179 @@
 #app/core/security.py
-from fastapi import Depends, HTTPException, Header
-from jose import jwt
-import requests
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import HTTPException, Header
+from jose import jwt, JWTError
+from jose.exceptions import JWKError
+
 from app.core.config import get_settings
+from app.utils.cache import TTLCache
 
 settings = get_settings()
 
+
+class JWKSCache:
+    """
+    Caches the Supabase JSON Web Key Set.
+
+    Fresh keys are served from memory. Once the TTL has passed the stale set is
+    still served while a single background thread refetches it, so only the
+    very first request (or an unknown ``kid`` after key rotation) waits on the
+    network. Fetches are single-flight: callers that queued behind a fetch use
+    its result instead of fetching again. After a failed fetch no new fetch
+    starts until an exponential backoff (capped at the TTL) has passed.
+    """
+
+    def __init__(self, jwks_url: str, ttl: float, min_refresh_interval: float, timeout: float = 5.0):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+        self._attempts = 0
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def _fetch(self, seen_attempts: Optional[int] = None) -> None:
+        """
+        Fetch the key set, unless a fetch finished after the caller read ``_attempts``
+        (it queued behind that fetch and can use its result) or a failed one is backing off
+        """
+        with self._fetch_lock:
+            if seen_attempts is not None and seen_attempts != self._attempts:
+                return
+            if time.monotonic() < self._retry_at:
+                return
+            self._last_attempt = time.monotonic()
+            try:
+                response = httpx.get(
+                    self.jwks_url, headers={"apikey": settings.supabase_anon_key}, timeout=self.timeout
+                )
+                response.raise_for_status()
+                keys = {key["kid"]: key for key in response.json().get("keys", []) if "kid" in key}
+            except Exception:
+                self._attempts += 1
+                self._failures += 1
+                backoff = min(self.ttl, max(self.min_refresh_interval, 1.0) * 2 ** (self._failures - 1))
+                self._retry_at = time.monotonic() + backoff
+                raise
+            self._attempts += 1
+            self._failures = 0
+            self._retry_at = 0.0
+            with self._lock:
+                self._keys = keys
+                self._fetched_at = time.monotonic()
+
+    def _background_refresh(self) -> None:
+        try:
+            self._fetch()
+        except Exception as e:
+            print(f"[Auth] JWKS background refresh failed: {e}")
+        finally:
+            self._refreshing = False
+
+    def _schedule_refresh(self) -> None:
+        with self._lock:
+            if self._refreshing or time.monotonic() < self._retry_at:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="jwks-refresh", daemon=True).start()
+
+    def get_key(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        attempts = self._attempts
+
+        if not self._keys:
+            self._fetch(attempts)
+        elif now - self._fetched_at > self.ttl:
+            self._schedule_refresh()
+
+        key = self._keys.get(kid) if kid else None
+        if key is None and now - self._last_attempt > self.min_refresh_interval:
+            # Unknown kid: the signing key may have been rotated since the last fetch
+            self._fetch(attempts)
+            key = self._keys.get(kid) if kid else None
+        return key
+
+
+jwks_cache = JWKSCache(
+    jwks_url=settings.supabase_jwks_url or f"{settings.supabase_url}/auth/v1/.well-known/jwks.json",
+    ttl=settings.jwks_cache_ttl_seconds,
+    min_refresh_interval=settings.jwks_min_refresh_interval_seconds,
+)
+
+# Algorithms each JWK key type may verify; a key's own "alg" must be one of them
+_KEY_TYPE_ALGORITHMS = {
+    "RSA": ("RS256", "RS384", "RS512"),
+    "EC": ("ES256", "ES384", "ES512"),
+    "OKP": ("EdDSA",),
+}
+
+
+def _key_algorithm(key: Dict[str, Any], header_algorithm: Optional[str]) -> str:
+    """
+    The one algorithm a token signed with ``key`` may use
+
+    Taken from the key (its ``alg``, else the default for its ``kty``), never
+    from the token; a token whose header names another algorithm is rejected.
+    """
+    allowed = _KEY_TYPE_ALGORITHMS.get(key.get("kty"))
+    if allowed is None:
+        raise JWTError(f"Unsupported JWK key type {key.get('kty')!r}")
+    algorithm = key.get("alg", allowed[0])
+    if algorithm not in allowed:
+        raise JWTError(f"JWK algorithm {algorithm!r} does not match key type {key.get('kty')!r}")
+    if header_algorithm != algorithm:
+        raise JWTError(f"Token algorithm {header_algorithm!r} does not match signing key ({algorithm})")
+    return algorithm
+
+
+# Verified claims keyed by sha256(token); each entry expires with the token's own `exp`
+_verified_tokens = TTLCache(maxsize=settings.token_cache_size, clock=time.time)
+
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    options = {"verify_aud": bool(settings.supabase_jwt_audience)}
+    audience = settings.supabase_jwt_audience or None
+
+    if algorithm == "HS256":
+        # Legacy Supabase projects sign with the shared JWT secret
+        if not settings.supabase_jwt_secret:
+            raise JWTError("HS256 token received but SUPABASE_JWT_SECRET is not configured")
+        return jwt.decode(token, settings.supabase_jwt_secret, algorithms=["HS256"], audience=audience, options=options)
+
+    key = jwks_cache.get_key(header.get("kid"))
+    if key is None:
+        raise JWTError("Signing key not found in JWKS")
+    return jwt.decode(token, key, algorithms=[_key_algorithm(key, algorithm)], audience=audience, options=options)
+
+
 def verify_supabase_token(authorization: str = Header(...)):
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
     token = authorization.split(" ")[1]
 
-    # Optional: verify token using Supabase JWKS (secure)
-    jwks_url = f"{settings.supabase_url}/auth/v1/keys"
-    jwks = requests.get(jwks_url).json()
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    cached = _verified_tokens.get(token_hash)
+    if cached is not None:
+        return cached
+
     try:
-        # Decode without signature verification if local
-        decoded = jwt.get_unverified_claims(token)
-        return decoded
-    except Exception:
+        decoded = _decode_token(token)
+    except (JWTError, JWKError, httpx.HTTPError, KeyError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token")
+
+    exp = decoded.get("exp")
+    if exp is not None:
+        _verified_tokens.set(token_hash, decoded, expires_at=float(exp))
+    return decoded
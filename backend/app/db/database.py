@@ -0,0 +1,93 @@
+# app/db/database.py
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class DatabaseError(Exception):
+    """Raised when a Supabase REST or storage call fails"""
+    pass
+
+
+class SupabaseHTTP:
+    """
+    Shared, pooled async HTTP client for the Supabase REST and storage APIs.
+
+    One keep-alive connection pool is reused by every request in the process,
+    and a semaphore caps how many calls are in flight at once so a burst of
+    storage downloads cannot starve table lookups of connections. The client
+    is bound to the event loop it was created on; a different loop (e.g. a
+    training worker running its own ``asyncio.run``) gets its own pool.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            api_key: str,
+            max_connections: int = 50,
+            max_keepalive_connections: int = 20,
+            max_concurrency: int = 32,
+            timeout: float = 30.0,
+            transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(timeout, connect=10.0)
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "apikey": self.api_key,
+                    "Authorization": f"Bearer {self.api_key}",
+                },
+                limits=self.limits,
+                timeout=self.timeout,
+                transport=self.transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        client = self._ensure_client()
+        async with self._semaphore:
+            try:
+                response = await client.request(method, path, **kwargs)
+            except httpx.HTTPError as e:
+                raise DatabaseError(f"{method} {path} failed: {str(e)}")
+
+        if response.is_error:
+            raise DatabaseError(f"{method} {path} failed ({response.status_code}): {response.text}")
+        return response
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+http = SupabaseHTTP(
+    base_url=settings.supabase_url,
+    api_key=settings.supabase_service_role_key or settings.supabase_anon_key,
+    max_connections=settings.supabase_http_max_connections,
+    max_keepalive_connections=settings.supabase_http_max_keepalive,
+    max_concurrency=settings.supabase_http_max_concurrency,
+    timeout=settings.supabase_http_timeout_seconds,
+)
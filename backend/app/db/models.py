@@ -2,7 +2,7 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
 
 # ========================================== 
@@ -196,13 +196,45 @@ class HistoryListResponse(BaseModel):
 class PredictionRequest(BaseModel):
     """Request model for making predictions"""
     model_id: str
-    input_data: List[Dict[str, Any]] = Field(..., description="List of feature dictionaries")
+    input_data: Optional[List[Dict[str, Any]]] = Field(default=None, description="List of feature dictionaries")
+    columns: Optional[Dict[str, List[Any]]] = Field(
+        default=None, description="Columnar input: feature name -> list of values (alternative to input_data)"
+    )
     return_probabilities: bool = Field(default=False, description="Return class probabilities (classification only)")
     save_predictions: bool = Field(default=True, description="Save predictions to database")
+    row_details: bool = Field(
+        default=False, description="Also return predictions_with_confidence, one dict per row (classification only)"
+    )
 
     # Legacy support
     features: Optional[List[List[float]]] = Field(default=None, description="(Legacy) Pre-processed features")
 
+    @model_validator(mode="after")
+    def check_input(self) -> "PredictionRequest":
+        if (self.input_data is None) == (self.columns is None):
+            raise ValueError("Provide exactly one of 'input_data' or 'columns'")
+        return self
+
+
+class MultiModelPredictionRequest(BaseModel):
+    """Request model for scoring the same rows with several models"""
+    model_ids: List[str] = Field(..., min_length=1, max_length=20, description="Models to score with")
+    input_data: Optional[List[Dict[str, Any]]] = Field(default=None, description="List of feature dictionaries")
+    columns: Optional[Dict[str, List[Any]]] = Field(
+        default=None, description="Columnar input: feature name -> list of values (alternative to input_data)"
+    )
+    return_probabilities: bool = Field(default=False, description="Return class probabilities (classification only)")
+    save_predictions: bool = Field(default=True, description="Save predictions to database")
+    row_details: bool = Field(
+        default=False, description="Also return predictions_with_confidence, one dict per row (classification only)"
+    )
+
+    @model_validator(mode="after")
+    def check_input(self) -> "MultiModelPredictionRequest":
+        if (self.input_data is None) == (self.columns is None):
+            raise ValueError("Provide exactly one of 'input_data' or 'columns'")
+        return self
+
 
 class PredictionResponse(BaseModel):
     """Response after making predictions"""
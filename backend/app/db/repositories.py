@@ -0,0 +1,186 @@
+# app/db/repositories.py
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote, unquote
+
+from app.db.database import SupabaseHTTP, DatabaseError, http
+from app.utils.serialization import dumps
+
+
+def _filter_params(filters: Dict[str, Any]) -> Dict[str, str]:
+    """Translate keyword filters into PostgREST query params (lists become `in.(...)`)."""
+    params = {}
+    for column, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            params[column] = f"in.({','.join(str(v) for v in value)})"
+        elif value is None:
+            params[column] = "is.null"
+        else:
+            params[column] = f"eq.{value}"
+    return params
+
+
+def _prefer_return(returning: bool) -> str:
+    return "return=representation" if returning else "return=minimal"
+
+
+class TableRepository:
+    """Async access to one Supabase (PostgREST) table; row values may contain NumPy arrays and scalars."""
+
+    def __init__(self, table: str, client: SupabaseHTTP = http):
+        self.table = table
+        self.client = client
+
+    @property
+    def _path(self) -> str:
+        return f"/rest/v1/{self.table}"
+
+    async def select(
+            self,
+            columns: str = "*",
+            order: Optional[str] = None,
+            desc: bool = False,
+            limit: Optional[int] = None,
+            offset: Optional[int] = None,
+            **filters
+    ) -> List[Dict[str, Any]]:
+        params = {"select": columns, **_filter_params(filters)}
+        if order:
+            params["order"] = f"{order}.{'desc' if desc else 'asc'}"
+        if limit is not None:
+            params["limit"] = str(limit)
+        if offset is not None:
+            params["offset"] = str(offset)
+
+        response = await self.client.request("GET", self._path, params=params)
+        return response.json()
+
+    async def get(self, columns: str = "*", **filters) -> Optional[Dict[str, Any]]:
+        rows = await self.select(columns, limit=1, **filters)
+        return rows[0] if rows else None
+
+    async def insert(
+            self,
+            data: Union[Dict[str, Any], List[Dict[str, Any]]],
+            returning: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Insert one row or a list of rows (bulk rows must share the same keys)"""
+        response = await self.client.request(
+            "POST", self._path, content=dumps(data),
+            headers={"Prefer": _prefer_return(returning), "Content-Type": "application/json"},
+        )
+        return response.json() if returning else []
+
+    async def update(self, values: Dict[str, Any], returning: bool = True, **filters) -> List[Dict[str, Any]]:
+        if not filters:
+            raise DatabaseError(f"Refusing to update every row of '{self.table}'")
+        response = await self.client.request(
+            "PATCH", self._path, params=_filter_params(filters), content=dumps(values),
+            headers={"Prefer": _prefer_return(returning), "Content-Type": "application/json"},
+        )
+        return response.json() if returning else []
+
+    async def delete(self, **filters) -> List[Dict[str, Any]]:
+        if not filters:
+            raise DatabaseError(f"Refusing to delete every row of '{self.table}'")
+        response = await self.client.request(
+            "DELETE", self._path, params=_filter_params(filters),
+            headers={"Prefer": "return=representation"},
+        )
+        return response.json()
+
+
+class StorageRepository:
+    """Async access to one Supabase storage bucket."""
+
+    def __init__(self, bucket: str, client: SupabaseHTTP = http):
+        self.bucket = bucket
+        self.client = client
+
+    def _object_path(self, path: str) -> str:
+        return f"/storage/v1/object/{self.bucket}/{quote(path)}"
+
+    def public_url(self, path: str) -> str:
+        return f"{self.client.base_url}/storage/v1/object/public/{self.bucket}/{quote(path)}"
+
+    def path_from_url(self, url: str) -> str:
+        """Recover the object path inside this bucket from a stored public URL."""
+        url = url.split("?", 1)[0]
+        marker = f"/{self.bucket}/"
+        if marker not in url:
+            raise DatabaseError(f"URL does not point into bucket '{self.bucket}': {url}")
+        return unquote(url.split(marker, 1)[1])
+
+    async def download(self, path: str, byte_range: Optional[Tuple[int, int]] = None) -> bytes:
+        """Download an object, or only the inclusive ``(first, last)`` byte range of it."""
+        if byte_range is None:
+            response = await self.client.request("GET", self._object_path(path))
+            return response.content
+
+        first, last = byte_range
+        response = await self.client.request(
+            "GET", self._object_path(path), headers={"Range": f"bytes={first}-{last}"}
+        )
+        if response.status_code == 206:
+            return response.content
+        # Server ignored the range and sent the whole object
+        return response.content[first:last + 1]
+
+    async def upload(
+            self,
+            path: str,
+            content: bytes,
+            upsert: bool = False,
+            content_type: str = "application/octet-stream"
+    ) -> Dict[str, Any]:
+        response = await self.client.request(
+            "POST", self._object_path(path), content=content,
+            headers={"Content-Type": content_type, "x-upsert": "true" if upsert else "false"},
+        )
+        return response.json()
+
+    async def upload_file(
+            self,
+            path: str,
+            local_path: str,
+            upsert: bool = False,
+            content_type: str = "application/octet-stream",
+            chunk_bytes: int = 1024 * 1024
+    ) -> Dict[str, Any]:
+        """Upload a local file, streamed from disk in chunks instead of read into memory."""
+        async def body():
+            with open(local_path, "rb") as f:
+                while True:
+                    chunk = await asyncio.to_thread(f.read, chunk_bytes)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        response = await self.client.request(
+            "POST", self._object_path(path), content=body(),
+            headers={
+                "Content-Type": content_type,
+                "Content-Length": str(os.path.getsize(local_path)),
+                "x-upsert": "true" if upsert else "false",
+            },
+        )
+        return response.json()
+
+    async def remove(self, paths: Sequence[str]) -> List[Dict[str, Any]]:
+        response = await self.client.request(
+            "DELETE", f"/storage/v1/object/{self.bucket}", json={"prefixes": list(paths)}
+        )
+        return response.json()
+
+
+# Tables
+datasets = TableRepository("datasets")
+models = TableRepository("models")
+predictions = TableRepository("predictions")
+evaluations = TableRepository("evaluations")
+
+# Storage buckets
+dataset_files = StorageRepository("datasets")
+model_files = StorageRepository("models")
+prediction_files = StorageRepository("predictions")
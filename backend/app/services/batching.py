@@ -0,0 +1,224 @@
+# app/services/batching.py
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class LatencyTracker:
+    """Rolling window of request latencies and batch sizes for one model"""
+
+    def __init__(self, window: int = 2048):
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_rows = deque(maxlen=window)
+        self.batch_requests = deque(maxlen=window)
+        self.total_requests = 0
+        self.total_batches = 0
+
+    def record_batch(self, n_requests: int, n_rows: int) -> None:
+        self.batch_requests.append(n_requests)
+        self.batch_rows.append(n_rows)
+        self.total_batches += 1
+
+    def record_request(self, latency_ms: float) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.total_requests += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = np.fromiter(self.latencies_ms, dtype=float)
+        rows = np.fromiter(self.batch_rows, dtype=float)
+        requests = np.fromiter(self.batch_requests, dtype=float)
+        return {
+            "requests": self.total_requests,
+            "batches": self.total_batches,
+            "latency_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 3) if latencies.size else None,
+                "p99": round(float(np.percentile(latencies, 99)), 3) if latencies.size else None,
+            },
+            "batch_rows": {
+                "mean": round(float(rows.mean()), 2) if rows.size else None,
+                "max": int(rows.max()) if rows.size else None,
+            },
+            "requests_per_batch": {
+                "mean": round(float(requests.mean()), 2) if requests.size else None,
+            },
+        }
+
+
+@dataclass
+class _PendingRequest:
+    frame: pd.DataFrame
+    return_probabilities: bool
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests for one model into a single call.
+
+    The first queued request opens a window of at most ``max_wait_ms``;
+    requests arriving within it are gathered until ``max_batch_rows`` is
+    reached. Requests with the same columns are concatenated, run through one
+    vectorized transform + predict in a worker thread, and each caller gets
+    back its own slice. If a combined batch fails, its requests are retried
+    one by one so a single malformed request cannot fail its neighbours.
+    """
+
+    def __init__(self, predictor, max_batch_rows: int = 512, max_wait_ms: float = 5.0):
+        self.predictor = predictor
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.metrics = LatencyTracker()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def submit(self, frame: pd.DataFrame, return_probabilities: bool = False):
+        """Queue a frame and wait for ``(predictions, probabilities)``."""
+        if self._task is None or self._task.done():
+            self._start()
+
+        request = _PendingRequest(
+            frame=frame,
+            return_probabilities=return_probabilities,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        await self._queue.put(request)
+        return await request.future
+
+    def _start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        # Restart a loop that died unexpectedly so queued requests are still served
+        if task.cancelled() or task.exception() is None:
+            return
+        print(f"[Batching] Batcher loop failed, restarting: {task.exception()}")
+        if not self._closed or not self._queue.empty():
+            self._start()
+
+    def close(self) -> None:
+        """Stop after serving the requests already queued"""
+        self._closed = True
+        self._queue.put_nowait(None)
+
+    async def _collect(self) -> List[_PendingRequest]:
+        first = await self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        rows = len(first.frame)
+        deadline = time.perf_counter() + self.max_wait
+
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if request is None:
+                break
+            batch.append(request)
+            rows += len(request.frame)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            if not batch:
+                if self._closed and self._queue.empty():
+                    return
+                continue
+
+            # Only frames with identical columns can share a transform
+            groups: Dict[Tuple, List[_PendingRequest]] = {}
+            for request in batch:
+                groups.setdefault(tuple(request.frame.columns), []).append(request)
+
+            try:
+                for requests in groups.values():
+                    await self._execute(requests)
+            except Exception as e:
+                # Never leave a caller waiting on a batch that failed
+                for request in batch:
+                    self._resolve(request, exception=e)
+
+            if self._closed and self._queue.empty():
+                return
+
+    async def _execute(self, requests: List[_PendingRequest]) -> None:
+        want_probabilities = any(r.return_probabilities for r in requests)
+        try:
+            frames = [r.frame for r in requests]
+            combined = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            self.metrics.record_batch(len(requests), len(combined))
+            predictions, probabilities = await asyncio.to_thread(
+                self.predictor.predict_arrays, combined, want_probabilities
+            )
+        except Exception as e:
+            if len(requests) == 1:
+                self._resolve(requests[0], exception=e)
+                return
+            for request in requests:
+                await self._execute([request])
+            return
+
+        offset = 0
+        for request in requests:
+            end = offset + len(request.frame)
+            try:
+                request_probabilities = (
+                    probabilities[offset:end]
+                    if probabilities is not None and request.return_probabilities else None
+                )
+                result = (predictions[offset:end], request_probabilities)
+            except Exception as e:
+                self._resolve(request, exception=e)
+            else:
+                self._resolve(request, result=result)
+            offset = end
+
+    def _resolve(self, request: _PendingRequest, result=None, exception: Optional[Exception] = None) -> None:
+        self.metrics.record_request((time.perf_counter() - request.enqueued_at) * 1000)
+        if request.future.done():
+            return
+        if exception is not None:
+            request.future.set_exception(exception)
+        else:
+            request.future.set_result(result)
+
+
+class BatcherRegistry:
+    """One MicroBatcher per (model_id, artifact version)"""
+
+    def __init__(self, max_batch_rows: int = 512, max_wait_ms: float = 5.0):
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self._batchers: Dict[Hashable, Tuple[str, MicroBatcher]] = {}
+
+    def get(self, model_id: Hashable, version: str, predictor) -> MicroBatcher:
+        current = self._batchers.get(model_id)
+        if current is not None and current[0] == version:
+            return current[1]
+        if current is not None:
+            current[1].close()
+
+        batcher = MicroBatcher(predictor, self.max_batch_rows, self.max_wait_ms)
+        self._batchers[model_id] = (version, batcher)
+        return batcher
+
+    def drop(self, model_id: Hashable, reason: str = "invalidated") -> None:
+        current = self._batchers.pop(model_id, None)
+        if current is not None:
+            current[1].close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {str(model_id): batcher.metrics.snapshot() for model_id, (_, batcher) in self._batchers.items()}
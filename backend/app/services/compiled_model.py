@@ -0,0 +1,289 @@
+# app/services/compiled_model.py
+from abc import ABC, abstractmethod
+
+import numpy as np
+import sklearn
+from scipy.special import expit, softmax
+from sklearn.dummy import DummyClassifier, DummyRegressor
+from sklearn.ensemble import (
+    RandomForestRegressor, RandomForestClassifier, GradientBoostingRegressor, GradientBoostingClassifier
+)
+from sklearn.linear_model import LinearRegression, Ridge, Lasso, LogisticRegression
+from sklearn.tree import DecisionTreeRegressor, DecisionTreeClassifier
+from typing import Any, List, Optional
+
+
+class ModelCompileError(Exception):
+    """Raised when an estimator has no compiled representation"""
+    pass
+
+
+class _NodeArrays:
+    """
+    All nodes of a list of fitted sklearn trees in contiguous arrays.
+
+    Leaves point to themselves, so a batch can be traversed with a fixed
+    number of vectorized steps (the deepest tree's depth) and every
+    (sample, tree) pair ends on its leaf.
+    """
+
+    def __init__(self, trees: List[Any]):
+        lefts, rights, features, thresholds, missing_left, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            n = tree.node_count
+            nodes = np.arange(offset, offset + n)
+            is_leaf = tree.children_left == -1
+            lefts.append(np.where(is_leaf, nodes, tree.children_left + offset))
+            rights.append(np.where(is_leaf, nodes, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            missing = getattr(tree, "missing_go_to_left", None)
+            missing_left.append(np.zeros(n, dtype=bool) if missing is None else missing.astype(bool))
+            values.append(tree.value.reshape(n, -1))
+            roots.append(offset)
+            offset += n
+
+        self.left = np.concatenate(lefts).astype(np.intp)
+        self.right = np.concatenate(rights).astype(np.intp)
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds).astype(np.float64)
+        self.missing_left = np.concatenate(missing_left)
+        self.value = np.ascontiguousarray(np.concatenate(values), dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.n_trees = len(trees)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index for every (sample, tree) pair"""
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        node = np.tile(self.roots, (X.shape[0], 1))
+        rows = np.arange(X.shape[0])[:, None]
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.missing_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def leaf_values(self, X: np.ndarray, chunk_size: int = 0) -> np.ndarray:
+        """Leaf values of shape (n_samples, n_trees, n_values), traversed in row chunks"""
+        # Bound the (rows x trees) index arrays to roughly a million entries
+        chunk_size = chunk_size or max(1, (1 << 20) // self.n_trees)
+        parts = [self.value[self.apply(X[i:i + chunk_size])] for i in range(0, X.shape[0], chunk_size)]
+        return np.concatenate(parts) if parts else np.empty((0, self.n_trees, self.value.shape[1]))
+
+
+class CompiledModel(ABC):
+    """
+    Common interface: ``predict`` and, for classifiers, ``predict_proba``.
+
+    ``max_rows`` is the batch size above which sklearn's own Cython
+    traversal is faster and callers should use the original estimator.
+    """
+
+    kind = "model"
+    max_rows: Optional[int] = None
+    classes_: Optional[np.ndarray] = None
+
+    @abstractmethod
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        ...
+
+
+class CompiledLinearModel(CompiledModel):
+    """Linear and logistic models as a single ``X @ coef + intercept``"""
+
+    kind = "linear"
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, classes: Optional[np.ndarray] = None,
+                 ravel: bool = True):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = classes
+        self._ravel = ravel
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        scores = np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+        return scores.ravel() if self._ravel and scores.shape[1] == 1 else scores
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        scores = self.decision_function(X)
+        if self.classes_ is None:
+            return scores
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        return self.classes_[np.argmax(scores, axis=1)]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            positive = expit(scores)
+            return np.column_stack([1 - positive, positive])
+        return softmax(scores, axis=1)
+
+
+class CompiledForest(CompiledModel):
+    """Decision trees and random forests: the mean of per-tree leaf values"""
+
+    kind = "forest"
+    max_rows = 512
+
+    def __init__(self, nodes: _NodeArrays, classes: Optional[np.ndarray] = None):
+        self.nodes = nodes
+        self.classes_ = classes
+
+    def _mean_leaf_values(self, X: np.ndarray) -> np.ndarray:
+        return self.nodes.leaf_values(X).mean(axis=1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        values = self._mean_leaf_values(X)
+        if self.classes_ is None:
+            return values[:, 0]
+        return self.classes_.take(np.argmax(values, axis=1))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._mean_leaf_values(X)
+
+
+class CompiledBoosting(CompiledModel):
+    """Gradient boosting: constant init score plus a weighted sum of tree outputs per class"""
+
+    kind = "boosting"
+    max_rows = 64
+
+    def __init__(self, nodes: _NodeArrays, weights: np.ndarray, init: np.ndarray,
+                 classes: Optional[np.ndarray] = None, loss: Optional[str] = None):
+        self.nodes = nodes
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.init = np.asarray(init, dtype=np.float64)
+        self.classes_ = classes
+        self.loss = loss
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        raw = self.init + self.nodes.leaf_values(X)[:, :, 0] @ self.weights
+        return raw.ravel() if raw.shape[1] == 1 else raw
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        raw = self.decision_function(X)
+        if self.classes_ is None:
+            return raw
+        if raw.ndim == 1:
+            return self.classes_[(raw >= 0).astype(int)]
+        return self.classes_[np.argmax(raw, axis=1)]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        raw = self.decision_function(X)
+        if raw.ndim == 1:
+            positive = expit(2 * raw if self.loss == "exponential" else raw)
+            return np.column_stack([1 - positive, positive])
+        return softmax(raw, axis=1)
+
+
+# ---------------- compilation ----------------
+
+def _compile_linear(model) -> CompiledLinearModel:
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64))
+    ravel = coef.ndim == 1 or isinstance(model, LogisticRegression)
+    coef = coef.reshape(1, -1) if coef.ndim == 1 else coef
+    classes = model.classes_ if isinstance(model, LogisticRegression) else None
+    return CompiledLinearModel(coef.T, intercept, classes=classes, ravel=ravel)
+
+
+def _compile_forest(model) -> CompiledForest:
+    estimators = [model] if isinstance(model, (DecisionTreeRegressor, DecisionTreeClassifier)) else model.estimators_
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ModelCompileError("Multi-output trees are not supported")
+
+    nodes = _NodeArrays([estimator.tree_ for estimator in estimators])
+    classes = getattr(model, "classes_", None)
+    if classes is not None:
+        # Store per-tree class probabilities, exactly as each tree's predict_proba reports them
+        totals = nodes.value.sum(axis=1, keepdims=True)
+        nodes.value = np.divide(nodes.value, totals, out=np.zeros_like(nodes.value), where=totals > 0)
+    return CompiledForest(nodes, classes=classes)
+
+
+def _boosting_init(model) -> np.ndarray:
+    """Raw init score per class, read through sklearn's private ``_raw_predict_init``"""
+    # Private API: if a scikit-learn release drops or changes it, serve the uncompiled model
+    try:
+        return model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0]
+    except (AttributeError, TypeError) as e:
+        raise ModelCompileError(
+            f"Cannot read the boosting init score with scikit-learn {sklearn.__version__}: {e}"
+        )
+
+
+def _compile_boosting(model) -> CompiledBoosting:
+    if not (model.init_ == "zero" or isinstance(model.init_, (DummyRegressor, DummyClassifier))):
+        raise ModelCompileError("Custom init estimators are not supported")
+
+    stages, per_stage = model.estimators_.shape
+    nodes = _NodeArrays([tree.tree_ for tree in model.estimators_.ravel()])
+    # Tree (stage, k) adds learning_rate * leaf value to class k's raw score
+    weights = np.zeros((stages * per_stage, per_stage))
+    weights[np.arange(stages * per_stage), np.tile(np.arange(per_stage), stages)] = model.learning_rate
+    init = _boosting_init(model)
+
+    classes = getattr(model, "classes_", None)
+    return CompiledBoosting(nodes, weights, init, classes=classes, loss=model.loss)
+
+
+_COMPILERS = (
+    ((LinearRegression, Ridge, Lasso, LogisticRegression), _compile_linear),
+    ((RandomForestRegressor, RandomForestClassifier, DecisionTreeRegressor, DecisionTreeClassifier), _compile_forest),
+    ((GradientBoostingRegressor, GradientBoostingClassifier), _compile_boosting),
+)
+
+
+def compile_estimator(model) -> CompiledModel:
+    """Build the compiled form of a fitted registry model (exact type match only)"""
+    for types, compiler in _COMPILERS:
+        if type(model) in types:
+            return compiler(model)
+    raise ModelCompileError(f"No compiled form for {type(model).__name__}")
+
+
+def verify_compiled_model(model, compiled: CompiledModel, X: np.ndarray,
+                          rtol: float = 1e-7, atol: float = 1e-9) -> bool:
+    """Check that the compiled model reproduces the estimator's predictions on ``X``"""
+    expected = np.asarray(model.predict(X))
+    actual = compiled.predict(X)
+    if expected.shape != actual.shape:
+        return False
+    if getattr(model, "classes_", None) is not None:
+        if not np.array_equal(expected, actual):
+            return False
+        if hasattr(model, "predict_proba"):
+            return np.allclose(model.predict_proba(X), compiled.predict_proba(X), rtol=rtol, atol=atol)
+        return True
+    return np.allclose(expected, actual, rtol=rtol, atol=atol)
+
+
+def compile_model(model, X: np.ndarray) -> Optional[CompiledModel]:
+    """
+    Compile a fitted model and prove it equivalent on ``X`` (the holdout set).
+
+    Returns:
+        The compiled model, or None if the model type is unsupported or the
+        compiled form disagrees with the original
+    """
+    try:
+        compiled = compile_estimator(model)
+        X = np.asarray(X, dtype=np.float64)
+        if verify_compiled_model(model, compiled, X):
+            return compiled
+        print(f"[Training] Compiled {type(model).__name__} differs from the original; not using it")
+    except ModelCompileError as e:
+        print(f"[Training] Model not compiled: {e}")
+    except Exception as e:
+        print(f"[Training] Model compilation failed: {e}")
+    return None
@@ -0,0 +1,263 @@
+# app/services/compiled_preprocessor.py
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, TargetEncoder
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+
+class PreprocessorCompileError(Exception):
+    """Raised when a fitted preprocessor uses steps the compiler does not support"""
+    pass
+
+
+class _NumericBlock:
+    """Median/mean imputation followed by standard scaling, as flat arrays"""
+
+    def __init__(self, columns: List[str], fill_values: np.ndarray, means: np.ndarray, scales: np.ndarray):
+        self.columns = columns
+        self.fill_values = fill_values
+        self.means = means
+        self.scales = scales
+        self.width = len(columns)
+
+    def transform(self, get_column: Callable[[str], np.ndarray], out: np.ndarray, offset: int) -> None:
+        block = out[:, offset:offset + self.width]
+        for j, column in enumerate(self.columns):
+            block[:, j] = np.asarray(get_column(column), dtype=np.float64)
+        np.copyto(block, self.fill_values, where=np.isnan(block))
+        block -= self.means
+        block /= self.scales
+
+
+class _CategoricalBlock:
+    """
+    Constant imputation followed by one-hot or target encoding.
+
+    For every input column, ``categories`` lists the fitted categories and
+    ``targets`` gives, per category, the output column it switches on
+    (one-hot) or the value it is replaced with (target encoding).
+    """
+
+    def __init__(
+            self,
+            kind: str,
+            columns: List[str],
+            fill_value: Any,
+            categories: List[np.ndarray],
+            targets: List[np.ndarray],
+            widths: List[int],
+            unknown_values: Optional[List[float]] = None,
+    ):
+        self.kind = kind
+        self.columns = columns
+        self.fill_value = fill_value
+        self.categories = categories
+        self.targets = targets
+        self.widths = widths
+        self.unknown_values = unknown_values
+        self.width = sum(widths)
+        self._indexes = [pd.Index(c) for c in categories]
+
+    def transform(self, get_column: Callable[[str], np.ndarray], out: np.ndarray, offset: int) -> None:
+        n_rows = out.shape[0]
+        rows = np.arange(n_rows)
+        for j, column in enumerate(self.columns):
+            values = np.array(get_column(column), dtype=object)
+            values[pd.isna(values)] = self.fill_value
+            positions = self._indexes[j].get_indexer(values)
+            known = positions >= 0
+
+            if self.kind == "onehot":
+                # Unknown categories encode as all zeros (handle_unknown="ignore")
+                out[rows[known], offset + self.targets[j][positions[known]]] = 1.0
+            else:
+                encoded = np.full(n_rows, self.unknown_values[j], dtype=np.float64)
+                encoded[known] = self.targets[j][positions[known]]
+                out[:, offset] = encoded
+            offset += self.widths[j]
+
+
+class CompiledPreprocessor:
+    """
+    A fitted ``ColumnTransformer`` lowered into precomputed NumPy tables.
+
+    Supports the pipelines built by ``DataPreprocessing.build_pipeline``:
+    imputer → StandardScaler for numeric columns and imputer → OneHotEncoder
+    or TargetEncoder for categorical ones. ``transform_*`` take a DataFrame,
+    a list of row dicts, or a ``{column: values}`` mapping and produce the same
+    feature matrix as ``ColumnTransformer.transform`` without building
+    intermediate DataFrames.
+    """
+
+    def __init__(self, blocks: List[Union[_NumericBlock, _CategoricalBlock]]):
+        self.blocks = blocks
+        self.n_features_out = sum(block.width for block in blocks)
+        self.input_columns = [column for block in blocks for column in block.columns]
+
+    # ---------------- compilation ----------------
+
+    @classmethod
+    def compile(cls, preprocessor: ColumnTransformer) -> "CompiledPreprocessor":
+        if not isinstance(preprocessor, ColumnTransformer) or not hasattr(preprocessor, "transformers_"):
+            raise PreprocessorCompileError("Expected a fitted ColumnTransformer")
+        if getattr(preprocessor, "sparse_output_", False):
+            raise PreprocessorCompileError("Sparse ColumnTransformer output is not supported")
+
+        blocks = []
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == "remainder" or transformer == "drop" or len(columns) == 0:
+                continue
+            steps = transformer.steps if isinstance(transformer, Pipeline) else [(name, transformer)]
+            blocks.append(cls._compile_block(list(columns), [step for _, step in steps]))
+        return cls(blocks)
+
+    @staticmethod
+    def _compile_block(columns: List[str], steps: List[Any]):
+        if len(steps) != 2 or not isinstance(steps[0], SimpleImputer):
+            raise PreprocessorCompileError(f"Unsupported pipeline: {steps}")
+        imputer, encoder = steps
+        if imputer.add_indicator:
+            raise PreprocessorCompileError("Missing indicators are not supported")
+
+        if isinstance(encoder, StandardScaler):
+            statistics = np.asarray(imputer.statistics_, dtype=np.float64)
+            # SimpleImputer drops columns that were entirely empty at fit time
+            keep = ~np.isnan(statistics) if not imputer.keep_empty_features else np.ones_like(statistics, bool)
+            kept = [c for c, k in zip(columns, keep) if k]
+            n = len(kept)
+            means = encoder.mean_ if encoder.with_mean else np.zeros(n)
+            scales = encoder.scale_ if encoder.with_std else np.ones(n)
+            return _NumericBlock(
+                kept,
+                np.ascontiguousarray(statistics[keep]),
+                np.ascontiguousarray(means, dtype=np.float64),
+                np.ascontiguousarray(scales, dtype=np.float64),
+            )
+
+        if imputer.strategy != "constant":
+            raise PreprocessorCompileError("Categorical imputers must use a constant fill value")
+
+        if isinstance(encoder, OneHotEncoder):
+            if encoder.drop is not None or encoder.handle_unknown != "ignore":
+                raise PreprocessorCompileError("Only OneHotEncoder(handle_unknown='ignore', drop=None) is supported")
+            infrequent = (
+                encoder.infrequent_categories_ if getattr(encoder, "_infrequent_enabled", False)
+                else [None] * len(columns)
+            )
+            categories, targets, widths = [], [], []
+            for fitted, rare in zip(encoder.categories_, infrequent):
+                rare = set(rare.tolist()) if rare is not None else set()
+                positions = np.empty(len(fitted), dtype=np.int64)
+                n_frequent = 0
+                for i, category in enumerate(fitted):
+                    if category not in rare:
+                        positions[i] = n_frequent
+                        n_frequent += 1
+                # Infrequent categories share one trailing output column
+                positions[[i for i, c in enumerate(fitted) if c in rare]] = n_frequent
+                categories.append(np.asarray(fitted, dtype=object))
+                targets.append(positions)
+                widths.append(n_frequent + (1 if rare else 0))
+            return _CategoricalBlock("onehot", columns, imputer.fill_value, categories, targets, widths)
+
+        if isinstance(encoder, TargetEncoder):
+            if encoder.target_type_ not in ("continuous", "binary"):
+                raise PreprocessorCompileError("Multiclass target encoding is not supported")
+            return _CategoricalBlock(
+                "target",
+                columns,
+                imputer.fill_value,
+                [np.asarray(c, dtype=object) for c in encoder.categories_],
+                [np.asarray(e, dtype=np.float64) for e in encoder.encodings_],
+                [1] * len(columns),
+                unknown_values=[float(encoder.target_mean_)] * len(columns),
+            )
+
+        raise PreprocessorCompileError(f"Unsupported encoder: {type(encoder).__name__}")
+
+    # ---------------- transforms ----------------
+
+    def _transform(self, get_column: Callable[[str], np.ndarray], n_rows: int) -> np.ndarray:
+        out = np.zeros((n_rows, self.n_features_out), dtype=np.float64)
+        offset = 0
+        for block in self.blocks:
+            block.transform(get_column, out, offset)
+            offset += block.width
+        return out
+
+    def transform_frame(self, df: pd.DataFrame) -> np.ndarray:
+        missing = [c for c in self.input_columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"columns are missing: {missing}")
+        return self._transform(lambda column: df[column].to_numpy(), len(df))
+
+    def transform_columns(self, columns: Mapping[str, Sequence[Any]]) -> np.ndarray:
+        missing = [c for c in self.input_columns if c not in columns]
+        if missing:
+            raise ValueError(f"columns are missing: {missing}")
+        n_rows = len(columns[self.input_columns[0]]) if self.input_columns else 0
+        return self._transform(lambda column: columns[column], n_rows)
+
+    def transform_records(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        present = set().union(*(r.keys() for r in records)) if records else set()
+        missing = [c for c in self.input_columns if c not in present]
+        if missing:
+            raise ValueError(f"columns are missing: {missing}")
+        return self._transform(lambda column: [r.get(column) for r in records], len(records))
+
+    def transform(self, data: Union[pd.DataFrame, Mapping[str, Sequence[Any]], Sequence[Mapping[str, Any]]]) -> np.ndarray:
+        if isinstance(data, pd.DataFrame):
+            return self.transform_frame(data)
+        if isinstance(data, Mapping):
+            return self.transform_columns(data)
+        return self.transform_records(data)
+
+    # ---------------- verification ----------------
+
+    def synthetic_sample(self, n_rows: int = 64, seed: int = 0) -> pd.DataFrame:
+        """Rows covering missing values, every fitted category and unseen ones"""
+        rng = np.random.default_rng(seed)
+        data: Dict[str, Any] = {}
+        for block in self.blocks:
+            for j, column in enumerate(block.columns):
+                if isinstance(block, _NumericBlock):
+                    values = rng.normal(block.means[j], block.scales[j], n_rows)
+                    values[::7] = np.nan
+                else:
+                    pool = list(block.categories[j]) + ["__unseen__", None]
+                    values = np.array([pool[i % len(pool)] for i in range(n_rows)], dtype=object)
+                data[column] = values
+        return pd.DataFrame(data)
+
+    def verify(self, preprocessor: ColumnTransformer, X: Optional[pd.DataFrame] = None,
+               rtol: float = 1e-7, atol: float = 1e-9) -> bool:
+        """Check numerical equivalence with the sklearn path on ``X`` (or a synthetic sample)"""
+        X = self.synthetic_sample() if X is None else X
+        expected = np.asarray(preprocessor.transform(X), dtype=np.float64)
+        actual = self.transform_frame(X)
+        return expected.shape == actual.shape and np.allclose(expected, actual, rtol=rtol, atol=atol, equal_nan=True)
+
+
+def compile_preprocessor(
+        preprocessor: ColumnTransformer,
+        sample: Optional[pd.DataFrame] = None
+) -> Optional[CompiledPreprocessor]:
+    """
+    Compile a fitted preprocessor and check it against sklearn.
+
+    Returns:
+        The compiled preprocessor, or None if it is unsupported or not equivalent
+    """
+    try:
+        compiled = CompiledPreprocessor.compile(preprocessor)
+        if compiled.verify(preprocessor, sample):
+            return compiled
+        print("[Preprocessing] Compiled preprocessor differs from sklearn output; using sklearn path")
+    except PreprocessorCompileError as e:
+        print(f"[Preprocessing] Preprocessor not compiled: {e}")
+    except Exception as e:
+        print(f"[Preprocessing] Preprocessor compilation failed: {e}")
+    return None
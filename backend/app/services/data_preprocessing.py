@@ -7,9 +7,11 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.feature_selection import VarianceThreshold
-from typing import Tuple, Dict, Any
-import io
-from app.db.supabase_client import supabase
+from typing import Tuple, Dict, Any, Optional
+from app.db import repositories
+from app.services.compiled_preprocessor import compile_preprocessor
+from app.services.dataset_columnar import load_dataset
+from app.services.profiling import DatasetProfile, profile_frame
 
 
 class DataPreprocessingError(Exception):
@@ -22,12 +24,14 @@ class DataPreprocessing:
         self.preprocessor = None
         self.feature_names = None
         self.removed_features = []
+        self.compiled_preprocessor = None
 
     def build_pipeline(
             self,
             X: pd.DataFrame,
             use_target_encoder: bool = False,
-            variance_threshold: float = 0.0
+            variance_threshold: float = 0.0,
+            profile: Optional[DatasetProfile] = None
     ):
         """
         Builds preprocessing pipeline dynamically based on column types
@@ -36,16 +40,25 @@ class DataPreprocessing:
             X: Input features DataFrame
             use_target_encoder: Use TargetEncoder for high-cardinality categoricals
             variance_threshold: Remove features with variance below this threshold
+            profile: Profile of X itself, never of a superset such as the whole
+                dataset (test rows would leak into the decisions); X is
+                profiled in one pass when omitted
         """
         # Identify feature types
         numeric_features = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
         categorical_features = X.select_dtypes(include=["object", "category"]).columns.tolist()
 
+        # Variances and cardinalities come from the profile instead of per-column scans
+        if profile is None or not all(col in profile for col in numeric_features + categorical_features):
+            profile = profile_frame(X, memory=False)
+
         # Remove zero-variance columns
         if variance_threshold > 0:
             selector = VarianceThreshold(threshold=variance_threshold)
-            numeric_variances = X[numeric_features].var()
-            low_variance_cols = numeric_variances[numeric_variances <= variance_threshold].index.tolist()
+            low_variance_cols = [
+                col for col in numeric_features
+                if profile[col].std is not None and profile[col].std ** 2 <= variance_threshold
+            ]
             numeric_features = [col for col in numeric_features if col not in low_variance_cols]
             self.removed_features.extend(low_variance_cols)
 
@@ -54,8 +67,8 @@ class DataPreprocessing:
         low_cardinality_cats = []
 
         for col in categorical_features:
-            n_unique = X[col].nunique()
-            if n_unique > 50 or n_unique > len(X) * 0.5:
+            n_unique = profile[col].unique
+            if n_unique > 50 or n_unique > profile.rows * 0.5:
                 high_cardinality_cats.append(col)
             else:
                 low_cardinality_cats.append(col)
@@ -177,7 +190,7 @@ class DataPreprocessing:
                 random_state=random_state
             )
 
-        # Build and fit preprocessing pipeline
+        # Build and fit preprocessing pipeline; variance and cardinality decisions see the training split only
         preprocessor = self.build_pipeline(
             X_train,
             use_target_encoder=use_target_encoder,
@@ -191,6 +204,9 @@ class DataPreprocessing:
         # Store feature names for later reference
         self.feature_names = self._get_feature_names(preprocessor, X_train)
 
+        # Lower the fitted pipeline to NumPy tables for fast inference, checked on the holdout
+        self.compiled_preprocessor = compile_preprocessor(preprocessor, X_test)
+
         # Generate metadata
         metadata = {
             "original_features": X.columns.tolist(),
@@ -202,7 +218,8 @@ class DataPreprocessing:
             "problem_type": problem_type,
             "target_column": target_col,
             "test_size": test_size,
-            "null_target_removed": int((y.isnull().sum() if 'null_count' in locals() else 0))
+            "null_target_removed": int((y.isnull().sum() if 'null_count' in locals() else 0)),
+            "compiled_preprocessor": self.compiled_preprocessor is not None
         }
 
         return X_train_processed, X_test_processed, y_train, y_test, preprocessor, metadata
@@ -263,21 +280,13 @@ async def preprocess_dataset(
     """
     try:
         # Fetch dataset metadata
-        dataset = supabase.table("datasets").select("*").eq("id", dataset_id).eq("user_id", user_id).execute()
+        dataset_info = await repositories.datasets.get(id=dataset_id, user_id=user_id)
 
-        if not dataset.data:
+        if not dataset_info:
             raise DataPreprocessingError("Dataset not found")
 
-        dataset_info = dataset.data[0]
-
-        # Download dataset from storage
-        file_path = dataset_info['file_url'].split('/')[-2:]
-        file_path = '/'.join(file_path)
-
-        file_data = supabase.storage.from_('datasets').download(file_path)
-
-        # Load into DataFrame
-        df = pd.read_csv(io.BytesIO(file_data))
+        # Load from the columnar copy when there is one, else download and parse the CSV
+        df, load_report = await load_dataset(dataset_info)
 
         # Preprocess
         preprocessor = DataPreprocessing()
@@ -293,6 +302,7 @@ async def preprocess_dataset(
             "dataset_id": dataset_id,
             "target_column": target_col,
             "metadata": metadata,
+            "load": load_report,
             "status": "success"
         }
 
@@ -302,7 +312,8 @@ async def preprocess_dataset(
             "X_test": X_test,
             "y_train": y_train,
             "y_test": y_test,
-            "preprocessor": fitted_preprocessor
+            "preprocessor": fitted_preprocessor,
+            "compiled_preprocessor": preprocessor.compiled_preprocessor
         }
 
     except Exception as e:
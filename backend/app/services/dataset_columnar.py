@@ -0,0 +1,441 @@
+# app/services/dataset_columnar.py
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.artifact_cache import dataset_artifacts
+from app.core.config import get_settings
+from app.db import repositories
+
+settings = get_settings()
+
+COLUMNAR_FORMAT = "npz-columns"
+
+
+class ColumnarDatasetError(Exception):
+    """Custom exception for columnar dataset copies"""
+    pass
+
+
+# Literals pandas parses as booleans when a column holds nothing else
+_BOOL_LITERALS = {"True": True, "TRUE": True, "true": True, "False": False, "FALSE": False, "false": False}
+
+
+def _pack_strings(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 bytes of all strings back to back, and the ``n + 1`` offsets delimiting them"""
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(data: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    buffer = data.tobytes()
+    bounds = offsets.tolist()
+    values = np.empty(len(bounds) - 1, dtype=object)
+    values[:] = [buffer[start:end].decode("utf-8") for start, end in zip(bounds[:-1], bounds[1:])]
+    return values
+
+
+def _encode_column(values: pd.Series) -> Tuple[bytes, bool]:
+    """
+    One block of one column as a compressed NPZ
+
+    Numbers and non-null booleans are stored as their NumPy array. Text is
+    stored as UTF-8 bytes plus offsets, as codes into a vocabulary when the
+    block repeats values, so a block costs what its text does rather than
+    its longest cell times its rows.
+
+    Returns:
+        Tuple of (NPZ bytes, whether every non-null value is a boolean literal)
+    """
+    buffer = io.BytesIO()
+    if pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+        np.savez_compressed(buffer, values=values.to_numpy())
+        return buffer.getvalue(), pd.api.types.is_bool_dtype(values.dtype)
+
+    codes, vocabulary = pd.factorize(values.astype(object), use_na_sentinel=True)
+    vocabulary = [str(value) for value in vocabulary]
+    is_bool = all(value in _BOOL_LITERALS for value in vocabulary)
+    if len(vocabulary) <= len(values) // 2:
+        data, offsets = _pack_strings(vocabulary)
+        np.savez_compressed(buffer, codes=codes.astype(np.int32), data=data, offsets=offsets)
+    else:
+        nulls = codes < 0
+        data, offsets = _pack_strings(["" if null else vocabulary[code] for code, null in zip(codes, nulls)])
+        np.savez_compressed(buffer, data=data, offsets=offsets, nulls=nulls)
+    return buffer.getvalue(), is_bool
+
+
+def _merge_dtype(previous: Optional[str], dtype) -> str:
+    """Column dtype over the chunks seen so far: NumPy promotion for numbers, object otherwise"""
+    if not isinstance(dtype, np.dtype) or dtype == object:
+        return "object"
+    if previous is None:
+        return str(dtype)
+    if previous == "object":
+        return previous
+    return str(np.result_type(np.dtype(previous), dtype))
+
+
+def _as_bools(values: np.ndarray) -> np.ndarray:
+    converted = np.empty(len(values), dtype=object)
+    converted[:] = [_BOOL_LITERALS.get(value, value) if isinstance(value, str) else value for value in values]
+    return converted
+
+
+def _decode_column(content: bytes, boolean: bool = False) -> np.ndarray:
+    """Values of one block; text comes back as an object array with NaN for nulls"""
+    with np.load(io.BytesIO(content), allow_pickle=False) as npz:
+        if "codes" in npz.files:
+            vocabulary = _unpack_strings(npz["data"], npz["offsets"])
+            if boolean:
+                vocabulary = _as_bools(vocabulary)
+            # Code -1 (null) picks the trailing NaN
+            lookup = np.append(vocabulary, np.nan).astype(object)
+            return lookup[npz["codes"]]
+        if "offsets" in npz.files:
+            values = _unpack_strings(npz["data"], npz["offsets"])
+            if boolean:
+                values = _as_bools(values)
+            values[npz["nulls"]] = np.nan
+            return values
+
+        values = npz["values"]
+        if "nulls" not in npz.files:
+            return values
+        # Fixed-width strings written by earlier versions
+        values = values.astype(object)
+        values[npz["nulls"]] = np.nan
+        return values
+
+
+def write_columnar(
+        csv_path: str,
+        out_path: str,
+        chunk_rows: int = 100_000,
+        text_columns: Sequence[str] = ()
+) -> Dict[str, Any]:
+    """
+    Write a typed, column-major copy of a CSV file
+
+    The CSV is parsed once, ``chunk_rows`` rows at a time. Every chunk of
+    every column becomes an independently compressed NPZ block (a row
+    group), and each column's blocks are laid out contiguously, so a column
+    or a prefix of its row groups is one byte range of the object.
+
+    Args:
+        csv_path: CSV file on local disk
+        out_path: Destination of the columnar copy
+        chunk_rows: Rows per row group
+        text_columns: Columns parsed as text in every chunk (columns whose
+            values are not numeric throughout the file), so their type does
+            not depend on which chunk a value fell in
+
+    Returns:
+        Index of the copy, stored with the dataset metadata
+    """
+    text_columns = set(text_columns)
+    spool_dir = tempfile.mkdtemp(prefix="regresslab-columnar-", dir=settings.dataset_spool_dir)
+    try:
+        names: List[str] = []
+        blocks: Dict[str, List[List[int]]] = {}
+        dtypes: Dict[str, str] = {}
+        # Per column: non-null values so far all boolean literals / any non-null value / any null
+        boolean: Dict[str, bool] = {}
+        filled: Dict[str, bool] = {}
+        nullable: Dict[str, bool] = {}
+        spools = {}
+        n_rows = 0
+        dtype = {column: object for column in text_columns} or None
+        with pd.read_csv(csv_path, chunksize=chunk_rows, dtype=dtype) as reader:
+            for chunk in reader:
+                if not names:
+                    names = [str(c) for c in chunk.columns]
+                    blocks = {name: [] for name in names}
+                    spools = {name: open(os.path.join(spool_dir, str(i)), "wb") for i, name in enumerate(names)}
+                for i, name in enumerate(names):
+                    values = chunk.iloc[:, i]
+                    content, is_bool = _encode_column(values)
+                    nulls = int(values.isna().sum())
+                    boolean[name] = boolean.get(name, True) and is_bool
+                    filled[name] = filled.get(name, False) or nulls < len(values)
+                    nullable[name] = nullable.get(name, False) or nulls > 0
+                    spool = spools[name]
+                    blocks[name].append([n_rows, spool.tell(), len(content)])
+                    spool.write(content)
+                    dtypes[name] = _merge_dtype(dtypes.get(name), values.dtype)
+                n_rows += len(chunk)
+
+        columns = []
+        with open(out_path, "wb") as out:
+            for name in names:
+                spool = spools[name]
+                spool.close()
+                offset = out.tell()
+                with open(spool.name, "rb") as f:
+                    shutil.copyfileobj(f, out)
+                is_bool = boolean[name] and filled[name]
+                dtype = "bool" if is_bool and not nullable[name] else dtypes[name]
+                columns.append({
+                    "name": name,
+                    "dtype": dtype,
+                    "boolean": is_bool,
+                    "offset": offset,
+                    "bytes": out.tell() - offset,
+                    "blocks": blocks[name],
+                })
+    finally:
+        for spool in spools.values():
+            spool.close()
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    return {
+        "format": COLUMNAR_FORMAT,
+        "n_rows": n_rows,
+        "block_rows": chunk_rows,
+        "columns": columns,
+    }
+
+
+def plan_reads(
+        index: Dict[str, Any],
+        columns: Optional[Sequence[str]] = None,
+        max_rows: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, int]]]:
+    """
+    Byte ranges needed to read some columns and the row groups covering the first ``max_rows`` rows
+
+    Returns:
+        Tuple of (column entries with the blocks to read, coalesced inclusive byte ranges)
+    """
+    if index.get("format") != COLUMNAR_FORMAT:
+        raise ColumnarDatasetError(f"Unsupported columnar format '{index.get('format')}'")
+    by_name = {column["name"]: column for column in index["columns"]}
+    if columns is None:
+        columns = list(by_name)
+    missing = [name for name in columns if name not in by_name]
+    if missing:
+        raise ColumnarDatasetError(f"Columns not found in dataset: {missing}")
+
+    selected = []
+    ranges: List[Tuple[int, int]] = []
+    for name in columns:
+        column = by_name[name]
+        needed = [block for block in column["blocks"] if max_rows is None or block[0] < max_rows]
+        selected.append({**column, "blocks": needed})
+        if not needed:
+            continue
+        first = column["offset"] + needed[0][1]
+        last = column["offset"] + needed[-1][1] + needed[-1][2] - 1
+        ranges.append((first, last))
+
+    # Adjacent columns (e.g. a full read) become one request
+    coalesced: List[Tuple[int, int]] = []
+    for first, last in sorted(ranges):
+        if coalesced and first <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(last, coalesced[-1][1]))
+        else:
+            coalesced.append((first, last))
+    return selected, coalesced
+
+
+def assemble_frame(
+        selected: List[Dict[str, Any]],
+        parts: Dict[Tuple[int, int], bytes],
+        max_rows: Optional[int] = None
+) -> pd.DataFrame:
+    """Decode the blocks of the selected columns from the downloaded byte ranges"""
+    def block_bytes(start: int, length: int) -> bytes:
+        for (first, last), content in parts.items():
+            if first <= start and start + length - 1 <= last:
+                return content[start - first:start - first + length]
+        raise ColumnarDatasetError("Columnar read is missing a block")
+
+    data = {}
+    for column in selected:
+        # Boolean text comes back as True/False (NaN for nulls), as pandas parses it
+        boolean = column.get("boolean", False)
+        arrays = [_decode_column(block_bytes(column["offset"] + offset, length), boolean)
+                  for _, offset, length in column["blocks"]]
+        if not arrays:
+            values = np.empty(0, dtype=column["dtype"])
+        elif any(array.dtype == object for array in arrays):
+            values = np.concatenate([array.astype(object) for array in arrays])
+        else:
+            values = np.concatenate(arrays)
+        if column["dtype"] == "bool":
+            values = values.astype(bool)
+        data[column["name"]] = values[:max_rows] if max_rows is not None else values
+    return pd.DataFrame(data, copy=False)
+
+
+def columnar_path(csv_path: str) -> str:
+    return f"{csv_path}.npzc"
+
+
+def _read_ranges(local_path: str, ranges: List[Tuple[int, int]]) -> Dict[Tuple[int, int], bytes]:
+    parts = {}
+    with open(local_path, "rb") as f:
+        for first, last in ranges:
+            f.seek(first)
+            parts[(first, last)] = f.read(last - first + 1)
+    return parts
+
+
+async def read_columnar(
+        info: Dict[str, Any],
+        columns: Optional[Sequence[str]] = None,
+        max_rows: Optional[int] = None,
+        local_path: Optional[str] = None
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Read columns (and the first ``max_rows`` rows) of a stored columnar copy
+
+    Args:
+        info: Columnar pointer and index from the dataset metadata
+        columns: Columns to read (all when omitted)
+        max_rows: Read only the row groups covering the first rows
+        local_path: Local copy of the object to read from instead of storage
+
+    Returns:
+        Tuple of (typed DataFrame, bytes downloaded)
+    """
+    selected, ranges = plan_reads(info["index"], columns, max_rows)
+    if local_path is not None:
+        parts = await asyncio.to_thread(_read_ranges, local_path, ranges)
+        df = await asyncio.to_thread(assemble_frame, selected, parts, max_rows)
+        return df, 0
+
+    path = repositories.dataset_files.path_from_url(info["url"])
+    contents = await asyncio.gather(*(
+        repositories.dataset_files.download(path, byte_range=byte_range) for byte_range in ranges
+    ))
+    parts = dict(zip(ranges, contents))
+    df = await asyncio.to_thread(assemble_frame, selected, parts, max_rows)
+    return df, sum(len(content) for content in contents)
+
+
+def _cache_version(dataset: Dict[str, Any]) -> str:
+    """Dataset id and content hash (upload time for datasets uploaded before hashing)"""
+    metadata = dataset.get("metadata")
+    digest = metadata.get("content_sha256") if isinstance(metadata, dict) else None
+    return f"{dataset.get('id')}:{digest or dataset.get('uploaded_at') or ''}"
+
+
+async def _cached_object(path: str, version: str, download: bool = True) -> Tuple[Optional[str], int, str]:
+    """
+    Local copy of a dataset object from the disk cache
+
+    Args:
+        path: Object path in the datasets bucket
+        version: Cache version of the dataset
+        download: Download and cache the whole object on a miss
+
+    Returns:
+        Tuple of (local path or None, bytes downloaded, "hit", "miss" or "bypass")
+    """
+    if not settings.dataset_cache_enabled:
+        return None, 0, "bypass"
+    key = dataset_artifacts.key(path, version)
+    local_path = await asyncio.to_thread(dataset_artifacts.get_path, key)
+    if local_path is not None:
+        return local_path, 0, "hit"
+    if not download:
+        return None, 0, "miss"
+    content = await repositories.dataset_files.download(path)
+    local_path = await asyncio.to_thread(dataset_artifacts.put_bytes, key, content)
+    return local_path, len(content), "miss"
+
+
+def invalidate_cached_dataset(dataset: Dict[str, Any]) -> None:
+    """Drop a dataset's CSV and columnar copy from the local disk cache"""
+    version = _cache_version(dataset)
+    paths = [repositories.dataset_files.path_from_url(dataset["file_url"])]
+    metadata = dataset.get("metadata")
+    columnar = metadata.get("columnar") if isinstance(metadata, dict) else None
+    if columnar:
+        paths.append(repositories.dataset_files.path_from_url(columnar["url"]))
+    for path in paths:
+        dataset_artifacts.invalidate(path, version)
+
+
+async def load_dataset(
+        dataset: Dict[str, Any],
+        columns: Optional[Sequence[str]] = None,
+        max_rows: Optional[int] = None
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Load a dataset, from its columnar copy when it has one
+
+    Only the requested columns and row groups are downloaded from the
+    columnar copy, already typed; datasets uploaded before columnar copies
+    existed fall back to downloading and parsing the CSV.
+
+    Objects are kept in a local disk cache keyed by dataset id and content
+    hash, so repeated analysis and training runs read from disk. A full load
+    downloads and caches the whole object; a projected load uses the cached
+    object if there is one and otherwise downloads only its byte ranges.
+
+    Args:
+        dataset: Row of the datasets table (``id``, ``file_url``, ``uploaded_at`` and ``metadata``)
+        columns: Columns to load (all when omitted)
+        max_rows: Load only the first rows
+
+    Returns:
+        Tuple of (DataFrame, load report with source, cache result, bytes downloaded, CSV size and seconds)
+
+    Raises:
+        ColumnarDatasetError: If a requested column does not exist
+    """
+    started = time.perf_counter()
+    metadata = dataset.get("metadata")
+    columnar = metadata.get("columnar") if isinstance(metadata, dict) else None
+    version = _cache_version(dataset)
+
+    if columnar and columnar.get("index", {}).get("format") == COLUMNAR_FORMAT:
+        path = repositories.dataset_files.path_from_url(columnar["url"])
+        full = columns is None and max_rows is None
+        local_path, downloaded, cache = await _cached_object(path, version, download=full)
+        df, bytes_read = await read_columnar(columnar, columns, max_rows, local_path)
+        source, bytes_read, csv_bytes = "columnar", bytes_read + downloaded, columnar.get("csv_bytes")
+    else:
+        file_path = repositories.dataset_files.path_from_url(dataset["file_url"])
+        local_path, bytes_read, cache = await _cached_object(file_path, version)
+        if local_path is None:
+            content = await repositories.dataset_files.download(file_path)
+            csv_source, bytes_read, csv_bytes = io.BytesIO(content), len(content), len(content)
+        else:
+            csv_source, csv_bytes = local_path, os.path.getsize(local_path)
+        wanted = set(columns) if columns is not None else None
+        df = await asyncio.to_thread(
+            pd.read_csv, csv_source,
+            usecols=(lambda name: name in wanted) if wanted is not None else None,
+            nrows=max_rows,
+        )
+        if columns is not None:
+            missing = [name for name in columns if name not in df.columns]
+            if missing:
+                raise ColumnarDatasetError(f"Columns not found in dataset: {missing}")
+            df = df[list(columns)]
+        source = "csv"
+
+    report = {
+        "source": source,
+        "cache": cache,
+        "bytes_read": bytes_read,
+        "csv_bytes": csv_bytes,
+        "columns": len(df.columns),
+        "rows": len(df),
+        "load_seconds": round(time.perf_counter() - started, 4),
+    }
+    print(f"[Dataset] Loaded {report['rows']}x{report['columns']} from {source} (cache {cache}): "
+          f"{bytes_read} bytes read (CSV {csv_bytes} bytes) in {report['load_seconds']}s")
+    return df, report
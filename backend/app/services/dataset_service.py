@@ -1,86 +1,96 @@
 # app/services/dataset_service.py
+import asyncio
+import csv
+import hashlib
+import os
+import sys
+import tempfile
 import pandas as pd
-import io
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from app.db.supabase_client import supabase
+from app.core.config import get_settings
+from app.db import repositories
+from app.services.dataset_columnar import columnar_path, invalidate_cached_dataset, write_columnar
+from app.services.profiling import CATEGORICAL, NUMERIC, DatasetProfile, profile_csv, profile_frame
+
+settings = get_settings()
 
 
 class DatasetValidationError(Exception):
     """Custom exception for dataset validation errors"""
     pass
 
-def get_upload_error(res):
-    if isinstance(res, dict):
-        return res.get("error")
-    if hasattr(res, "error"):
-        return res.error
-    return None
-
 async def upload_dataset(file, user_id: str) -> Dict[str, Any]:
     """
     Upload and validate dataset with comprehensive checks.
 
+    The upload is spooled to a temp file in chunks, validated and analyzed
+    chunk by chunk with a streaming CSV parser, and streamed to storage from
+    disk, so memory stays bounded by the parser chunk whatever the file size.
+
     Args:
         file: Uploaded file object
         user_id: User identifier
 
     Returns:
-        Dict containing upload status and dataset summary
+        Dict containing upload status, dataset summary and peak memory of the upload
 
     Raises:
         DatasetValidationError: If dataset fails validation
     """
+    rss_before = _peak_rss_bytes()
+    spool_path = None
     try:
-        # Read file content
-        content = await file.read()
+        # Spool the request body to disk
+        spool_path, size, content_sha256 = await _spool_upload(file)
 
         # Validate file is not empty
-        if len(content) == 0:
+        if size == 0:
             raise DatasetValidationError("Uploaded file is empty")
 
-        # Parse CSV with error handling
+        # Check for duplicate column names (pandas would silently rename them)
+        header = await asyncio.to_thread(_read_header, spool_path)
+        duplicates = sorted({name for name in header if header.count(name) > 1})
+        if duplicates:
+            raise DatasetValidationError(
+                f"Dataset contains duplicate column names: {duplicates}"
+            )
+
+        # Parse and analyze in bounded chunks
         try:
-            df = pd.read_csv(io.BytesIO(content))
+            profile = await asyncio.to_thread(profile_csv, spool_path, settings.dataset_upload_chunk_rows)
         except pd.errors.EmptyDataError:
             raise DatasetValidationError("CSV file contains no data")
         except pd.errors.ParserError as e:
             raise DatasetValidationError(f"CSV parsing error: {str(e)}")
 
         # Validate dataset has rows and columns
-        if df.empty:
+        if profile.rows == 0:
             raise DatasetValidationError("Dataset contains no rows")
 
-        if len(df.columns) == 0:
+        if len(profile.columns) == 0:
             raise DatasetValidationError("Dataset contains no columns")
 
         # Check for minimum number of rows (at least 10 for meaningful ML)
-        if len(df) < 10:
-            raise DatasetValidationError(
-                f"Dataset has only {len(df)} rows. Minimum 10 rows required for training."
-            )
-
-        # Check for duplicate column names
-        if df.columns.duplicated().any():
-            duplicates = df.columns[df.columns.duplicated()].tolist()
+        if profile.rows < 10:
             raise DatasetValidationError(
-                f"Dataset contains duplicate column names: {duplicates}"
+                f"Dataset has only {profile.rows} rows. Minimum 10 rows required for training."
             )
 
         # Perform comprehensive dataset analysis
-        summary = analyze_dataset(df)
+        summary = summarize_profile(profile)
 
-        # Upload to Supabase storage
+        # Stream to Supabase storage from disk
         filename = f"{user_id}/{file.filename}"
-        storage_res = supabase.storage.from_("datasets").upload(filename, content)
-
-        # Check for upload errors
-        error = get_upload_error(storage_res)
-        if error:
-            raise Exception(f"Failed to upload dataset to storage: {error}")
+        await repositories.dataset_files.upload_file(filename, spool_path, content_type="text/csv")
 
         # Get public URL
-        public_url = supabase.storage.from_('datasets').get_public_url(filename)
+        public_url = repositories.dataset_files.public_url(filename)
+
+        # Typed columnar copy for column-projected loads (the CSV stays the source of truth)
+        columnar = None
+        if settings.dataset_columnar_copy:
+            columnar = await _store_columnar(spool_path, filename, profile, size)
 
         # Insert metadata into datasets table
         data = {
@@ -88,30 +98,115 @@ async def upload_dataset(file, user_id: str) -> Dict[str, Any]:
             "name": file.filename,
             "file_url": public_url,
             "uploaded_at": datetime.utcnow().isoformat(),
-            "rows": len(df),
-            "columns": len(df.columns),
-            "has_missing": bool(df.isnull().values.any()),
-            "metadata": summary  # Store rich metadata for later use
+            "rows": profile.rows,
+            "columns": len(profile.columns),
+            "has_missing": summary["has_missing"],
+            # Store rich metadata for later use; the content hash versions local dataset caches
+            "metadata": {**summary, "columnar": columnar, "content_sha256": content_sha256}
         }
 
-        db_res = supabase.table("datasets").insert(data).execute()
+        inserted = await repositories.datasets.insert(data)
 
-        if not db_res.data:
+        if not inserted:
             raise Exception("Failed to insert dataset metadata into database")
 
+        memory = {
+            "file_bytes": size,
+            "chunk_rows": settings.dataset_upload_chunk_rows,
+            "peak_chunk_mb": round(profile.peak_chunk_bytes / (1024 ** 2), 2),
+            # Growth of the process high-water mark during this upload (0 if it stayed below an earlier peak)
+            "peak_rss_increase_mb": round(max(0, _peak_rss_bytes() - rss_before) / (1024 ** 2), 2),
+        }
+        print(f"[Dataset] Uploaded {file.filename}: {size} bytes, {profile.rows} rows, "
+              f"peak chunk {memory['peak_chunk_mb']} MB")
+
         return {
             "message": "Dataset uploaded successfully",
-            "dataset_id": db_res.data[0].get("id"),
+            "dataset_id": inserted[0].get("id"),
             "summary": summary,
+            "memory": memory,
+            "columnar": {key: columnar[key] for key in ("format", "bytes", "csv_bytes")} if columnar else None,
         }
 
     except DatasetValidationError:
         raise
     except Exception as e:
         raise Exception(f"Dataset upload failed: {str(e)}")
+    finally:
+        if spool_path is not None:
+            try:
+                os.unlink(spool_path)
+            except FileNotFoundError:
+                pass
+
+
+async def _spool_upload(file) -> Tuple[str, int, str]:
+    """Copy an upload to a temp file chunk by chunk; returns (path, size, sha256 of the content)"""
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=".csv", dir=settings.dataset_spool_dir)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(settings.dataset_upload_chunk_bytes)
+                if not chunk:
+                    break
+                await asyncio.to_thread(out.write, chunk)
+                digest.update(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, size, digest.hexdigest()
+
+
+async def _store_columnar(spool_path: str, filename: str, profile: DatasetProfile,
+                          csv_bytes: int) -> Optional[Dict[str, Any]]:
+    """
+    Write and upload the columnar copy of a spooled CSV
+
+    Returns:
+        Pointer, index and sizes of the copy, or None if it could not be stored
+    """
+    local_path = columnar_path(spool_path)
+    path = columnar_path(filename)
+    try:
+        index = await asyncio.to_thread(
+            write_columnar, spool_path, local_path, settings.dataset_upload_chunk_rows,
+            profile.of_kind(CATEGORICAL),
+        )
+        await repositories.dataset_files.upload_file(path, local_path)
+        return {
+            "url": repositories.dataset_files.public_url(path),
+            "format": index["format"],
+            "bytes": os.path.getsize(local_path),
+            "csv_bytes": csv_bytes,
+            "index": index,
+        }
+    except Exception as e:
+        print(f"[Dataset] Columnar copy of {filename} failed, loads will parse the CSV: {e}")
+        return None
+    finally:
+        try:
+            os.unlink(local_path)
+        except FileNotFoundError:
+            pass
+
 
+def _read_header(path: str) -> List[str]:
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        return next(csv.reader(f), [])
 
 
+def _peak_rss_bytes() -> int:
+    """High-water mark of this process's resident memory (0 where unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
 
 
 def analyze_dataset(df: pd.DataFrame) -> Dict[str, Any]:
@@ -124,40 +219,50 @@ def analyze_dataset(df: pd.DataFrame) -> Dict[str, Any]:
     Returns:
         Dict containing dataset statistics and warnings
     """
-    numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
-    categorical_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
+    return summarize_profile(profile_frame(df))
+
+
+def summarize_profile(profile: DatasetProfile) -> Dict[str, Any]:
+    """
+    Dataset summary and warnings stored as the dataset's metadata.
+
+    Args:
+        profile: Profile of the whole dataset
+
+    Returns:
+        Dict containing dataset statistics, warnings and the serialized profile
+    """
+    rows = profile.rows
+    feature_names = profile.names
+    numeric_cols = profile.of_kind(NUMERIC)
+    categorical_cols = profile.of_kind(CATEGORICAL)
 
     # Analyze categorical cardinality
     high_cardinality_cols = []
     cardinality_info = {}
-
     for col in categorical_cols:
-        n_unique = df[col].nunique()
+        n_unique = profile[col].unique
         cardinality_info[col] = n_unique
 
         # Flag if cardinality > 50 or > 50% of rows
-        if n_unique > 50 or n_unique > len(df) * 0.5:
+        if n_unique > 50 or n_unique > rows * 0.5:
             high_cardinality_cols.append({
                 "column": col,
                 "unique_values": n_unique,
-                "percentage": round(n_unique / len(df) * 100, 2)
+                "percentage": round(n_unique / rows * 100, 2)
             })
 
-    # Analyze zero variance columns
-    zero_variance_cols = []
-    for col in numeric_cols:
-        if df[col].nunique() == 1:
-            zero_variance_cols.append(col)
+    # Numeric columns whose non-null values are all equal
+    zero_variance_cols = [col for col in numeric_cols if profile[col].constant]
 
     # Calculate missing value percentages
-    missing_percentages = {}
-    for col in df.columns:
-        missing_pct = (df[col].isnull().sum() / len(df)) * 100
-        if missing_pct > 0:
-            missing_percentages[col] = round(missing_pct, 2)
+    missing_percentages = {
+        column.name: round(column.null_fraction(rows) * 100, 2)
+        for column in profile.columns if column.nulls
+    }
 
     # Memory usage estimate
-    memory_mb = df.memory_usage(deep=True).sum() / (1024 ** 2)
+    memory_mb = profile.memory_bytes / (1024 ** 2)
 
     # Generate warnings
     warnings = []
@@ -183,29 +288,53 @@ def analyze_dataset(df: pd.DataFrame) -> Dict[str, Any]:
             "memory_mb": round(memory_mb, 2)
         })
 
-    if len(df.columns) > 100:
+    if len(feature_names) > 100:
         warnings.append({
             "type": "high_dimensionality",
-            "message": f"High number of features ({len(df.columns)}). Consider feature selection.",
-            "n_features": len(df.columns)
+            "message": f"High number of features ({len(feature_names)}). Consider feature selection.",
+            "n_features": len(feature_names)
         })
 
     return {
-        "rows": len(df),
-        "columns": len(df.columns),
-        "feature_names": df.columns.tolist(),
+        "rows": rows,
+        "columns": len(feature_names),
+        "feature_names": feature_names,
         "numeric_features": numeric_cols,
         "categorical_features": categorical_cols,
-        "has_missing": bool(df.isnull().values.any()),
+        "has_missing": bool(missing_percentages),
         "missing_percentages": missing_percentages,
         "cardinality_info": cardinality_info,
         "zero_variance_columns": zero_variance_cols,
         "memory_mb": round(memory_mb, 2),
-        "warnings": warnings
+        "warnings": warnings,
+        "profile": profile.to_dict(),
     }
 
 
 async def list_user_datasets(user_id: str):
     """Retrieve all datasets for a user"""
-    res = supabase.table('datasets').select("*").eq("user_id", user_id).execute()
-    return res.data
\ No newline at end of file
+    return await repositories.datasets.select(user_id=user_id)
+
+
+async def delete_dataset(dataset_id: str, user_id: str) -> bool:
+    """
+    Delete a dataset file from storage and its metadata row.
+
+    Returns:
+        False if the dataset does not exist or belongs to another user
+    """
+    dataset = await repositories.datasets.get(
+        "id, file_url, name, uploaded_at, metadata", id=dataset_id, user_id=user_id
+    )
+    if not dataset:
+        return False
+
+    paths = [repositories.dataset_files.path_from_url(dataset["file_url"])]
+    metadata = dataset.get("metadata")
+    columnar = metadata.get("columnar") if isinstance(metadata, dict) else None
+    if columnar:
+        paths.append(repositories.dataset_files.path_from_url(columnar["url"]))
+    await repositories.dataset_files.remove(paths)
+    invalidate_cached_dataset(dataset)
+    await repositories.datasets.delete(id=dataset_id, user_id=user_id)
+    return True
\ No newline at end of file
@@ -3,7 +3,6 @@
 import numpy as np
 import pandas as pd
 import joblib
-import json
 import asyncio
 from datetime import datetime
 from sklearn.metrics import (
@@ -11,23 +10,23 @@ from sklearn.metrics import (
     accuracy_score, precision_score, recall_score,
     f1_score, roc_auc_score, confusion_matrix, classification_report
 )
-from app.db.supabase_client import supabase
+from app.core.artifact_cache import model_artifacts
+from app.db import repositories
 
-def load_model_from_storage(model_path: str):
+async def load_model_from_storage(model_path: str):
     """
     Loads a trained model from local path or Supabase Storage.
     Assumes model was saved with joblib.
     """
     try:
         if model_path.startswith("http"):  # Supabase file URL
-            import requests, io
-            response = requests.get(model_path)
-            response.raise_for_status()
-            buffer = io.BytesIO(response.content)
-            model = joblib.load(buffer)
+            file_path = repositories.model_files.path_from_url(model_path)
+            local_path = await model_artifacts.fetch(
+                file_path, lambda: repositories.model_files.download(file_path)
+            )
+            model = await asyncio.to_thread(joblib.load, local_path)
         else:  # Local file
-            with open(model_path, "rb") as f:
-                model = joblib.load(f)
+            model = await asyncio.to_thread(joblib.load, model_path)
         return model
     except Exception as e:
         raise RuntimeError(f"Error loading model: {str(e)}")
@@ -42,16 +41,13 @@ async def evaluate_model(model_id, model_path, X_test, y_test, user_id):
     """
 
     # Load model
-    model = await asyncio.to_thread(load_model_from_storage, model_path)
+    model = await load_model_from_storage(model_path)
 
-    # Fetch model info (blocking, so wrap in thread)
-    model_info_resp = await asyncio.to_thread(
-        supabase.table("models").select("*").eq("id", model_id).execute
-    )
-    if not model_info_resp.data:
+    # Fetch model info
+    model_info = await repositories.models.get(id=model_id)
+    if not model_info:
         raise ValueError(f"Model with id {model_id} not found.")
 
-    model_info = model_info_resp.data[0]
     model_type = model_info.get("model_type", "unknown")
     problem_type = model_info.get("problem_type", "regression").lower()
 
@@ -103,45 +99,33 @@ async def evaluate_model(model_id, model_path, X_test, y_test, user_id):
             "Recall": recall,
             "F1_Score": f1,
             "ROC_AUC": roc_auc,
-            "Confusion_Matrix": confusion_matrix(y_test, y_pred_class).tolist(),
+            "Confusion_Matrix": confusion_matrix(y_test, y_pred_class),
         }
 
         summary = _generate_summary_classification(metrics)
 
-    # JSON-safe serialization
-    metrics_json = json.loads(json.dumps(metrics, default=str))
-    summary_json = json.loads(json.dumps(summary, default=str))
-
+    # NumPy values are serialized as-is by the repository's JSON encoder
     evaluation_data = {
         "model_id": model_id,
         "user_id": user_id,
         "model_type": model_type,
         "problem_type": problem_type,
-        "metrics": metrics_json,
-        "summary": summary_json,
+        "metrics": metrics,
+        "summary": summary,
         "created_at": datetime.utcnow().isoformat(),
     }
 
-    # Insert results into Supabase (non-blocking safe)
-    insert_resp = await asyncio.to_thread(
-        supabase.table("evaluations").insert(evaluation_data).execute
-    )
+    # Insert results into Supabase
+    inserted = await repositories.evaluations.insert(evaluation_data)
 
-    return {"evaluation": evaluation_data, "db_response": insert_resp.data}
+    return {"evaluation": evaluation_data, "db_response": inserted}
 
 
 # -------------------------------------------------------------------
 # Get all evaluations for a given model/user
 # -------------------------------------------------------------------
 async def get_model_evaluations(model_id: str, user_id: str):
-    resp = await asyncio.to_thread(
-        supabase.table("evaluations")
-        .select("*")
-        .eq("model_id", model_id)
-        .eq("user_id", user_id)
-        .execute
-    )
-    return resp.data
+    return await repositories.evaluations.select(model_id=model_id, user_id=user_id)
 
 
 # -------------------------------------------------------------------
@@ -149,20 +133,19 @@ async def get_model_evaluations(model_id: str, user_id: str):
 # -------------------------------------------------------------------
 async def compare_models(user_id: str):
     # Get all evaluations for user
-    resp = await asyncio.to_thread(
-        supabase.table("evaluations").select("*").eq("user_id", user_id).execute
-    )
-    evaluations = resp.data
+    evaluations = await repositories.evaluations.select(user_id=user_id)
 
     if not evaluations:
         return {"status": "error", "message": "No evaluations found for this user."}
 
+    # One round trip for every evaluated model instead of one per evaluation
+    model_ids = list({eval_item["model_id"] for eval_item in evaluations})
+    model_rows = await repositories.models.select(id=model_ids)
+    models_by_id = {row["id"]: row for row in model_rows}
+
     comparisons = []
     for eval_item in evaluations:
-        model_info_resp = await asyncio.to_thread(
-            supabase.table("models").select("*").eq("id", eval_item["model_id"]).execute
-        )
-        model_info = model_info_resp.data[0] if model_info_resp.data else {}
+        model_info = models_by_id.get(eval_item["model_id"], {})
 
         comparisons.append({
             "model_name": model_info.get("name", "Unnamed Model"),
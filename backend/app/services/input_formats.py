@@ -0,0 +1,150 @@
+# app/services/input_formats.py
+import io
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json"
+
+MEDIA_TYPES = {
+    "json": JSON_MEDIA_TYPE,
+    "npy": NPY_MEDIA_TYPE,
+    "arrow": ARROW_MEDIA_TYPE,
+}
+
+
+class InputFormatError(Exception):
+    """Custom exception for undecodable prediction inputs"""
+    pass
+
+
+def format_for_media_type(media_type: Optional[str], default: Optional[str] = None) -> Optional[str]:
+    """Map a Content-Type or Accept value to "json", "npy" or "arrow" """
+    if not media_type:
+        return default
+    for candidate in media_type.split(","):
+        candidate = candidate.split(";", 1)[0].strip().lower()
+        for name, known in MEDIA_TYPES.items():
+            if candidate == known:
+                return name
+        if candidate in ("application/octet-stream", "*/*"):
+            return default
+    return default
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise InputFormatError("Arrow IPC requires the optional 'pyarrow' package")
+    return pyarrow
+
+
+def columns_to_frame(columns: Mapping[str, Sequence[Any]]) -> pd.DataFrame:
+    """Build a DataFrame from ``{column: values}``, one array per column"""
+    arrays = {name: np.asarray(values) for name, values in columns.items()}
+    lengths = {len(values) for values in arrays.values()}
+    if len(lengths) > 1:
+        raise InputFormatError(f"Columns have different lengths: {sorted(lengths)}")
+    return pd.DataFrame(arrays, copy=False)
+
+
+def decode_npy(content: bytes, feature_names: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Decode a ``.npy`` body
+
+    Structured arrays carry their own column names; a plain 2-D array is
+    matched to ``feature_names`` by position and wrapped without copying.
+    """
+    try:
+        array = np.load(io.BytesIO(content), allow_pickle=False)
+    except ValueError as e:
+        raise InputFormatError(f"Invalid .npy body: {str(e)}")
+
+    if array.dtype.names:
+        return pd.DataFrame({name: array[name] for name in array.dtype.names}, copy=False)
+
+    if array.ndim == 1:
+        array = array[None, :]
+    if array.ndim != 2:
+        raise InputFormatError(f"Expected a 2-D feature array, got shape {array.shape}")
+    if not feature_names:
+        raise InputFormatError("Column names are required for an unstructured .npy array")
+    if len(feature_names) != array.shape[1]:
+        raise InputFormatError(f"Array has {array.shape[1]} columns but {len(feature_names)} names were given")
+    return pd.DataFrame(array, columns=feature_names, copy=False)
+
+
+def decode_arrow(content: bytes) -> pd.DataFrame:
+    """Decode an Arrow IPC stream (or file) body into a DataFrame"""
+    pa = _arrow()
+    try:
+        reader = pa.ipc.open_stream(pa.py_buffer(content))
+    except pa.ArrowInvalid:
+        try:
+            reader = pa.ipc.open_file(pa.py_buffer(content))
+        except pa.ArrowInvalid as e:
+            raise InputFormatError(f"Invalid Arrow IPC body: {str(e)}")
+    return reader.read_all().to_pandas()
+
+
+def decode_body(content: bytes, input_format: str, feature_names: Optional[List[str]] = None) -> pd.DataFrame:
+    if input_format == "npy":
+        return decode_npy(content, feature_names)
+    if input_format == "arrow":
+        return decode_arrow(content)
+    raise InputFormatError(f"Unsupported input format '{input_format}'. Use one of {list(MEDIA_TYPES)}")
+
+
+def output_columns(predictions: np.ndarray, probabilities: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Prediction and per-class probability columns, as arrays"""
+    predictions = np.asarray(predictions)
+    if predictions.dtype == object:
+        predictions = predictions.astype(str)
+    columns = {"prediction": predictions}
+    if probabilities is not None:
+        probabilities = np.asarray(probabilities)
+        if probabilities.ndim == 1:
+            probabilities = probabilities[:, None]
+        for i in range(probabilities.shape[1]):
+            columns[f"probability_{i}"] = probabilities[:, i]
+    return columns
+
+
+def encode_npy(predictions: np.ndarray, probabilities: Optional[np.ndarray] = None) -> bytes:
+    """
+    Encode outputs as ``.npy``: a plain array of predictions, or a structured
+    array with ``prediction`` and ``probability_<i>`` fields
+    """
+    columns = output_columns(predictions, probabilities)
+    if len(columns) == 1:
+        array = columns["prediction"]
+    else:
+        array = np.empty(len(predictions), dtype=[(name, values.dtype) for name, values in columns.items()])
+        for name, values in columns.items():
+            array[name] = values
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def encode_arrow(predictions: np.ndarray, probabilities: Optional[np.ndarray] = None) -> bytes:
+    """Encode outputs as an Arrow IPC stream with the same columns as ``encode_npy``"""
+    pa = _arrow()
+    table = pa.table(output_columns(predictions, probabilities))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_body(output_format: str, predictions: np.ndarray, probabilities: Optional[np.ndarray] = None) -> bytes:
+    if output_format == "npy":
+        return encode_npy(predictions, probabilities)
+    if output_format == "arrow":
+        return encode_arrow(predictions, probabilities)
+    raise InputFormatError(f"Unsupported output format '{output_format}'")
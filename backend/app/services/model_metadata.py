@@ -0,0 +1,133 @@
+# app/services/model_metadata.py
+import asyncio
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.db import repositories
+from app.utils.cache import TTLCache
+
+settings = get_settings()
+
+# Fields of a models row that serving needs; the rest (metrics, training metadata) is not cached
+SERVING_FIELDS = (
+    "id", "user_id", "status", "model_url", "target_column", "model_type", "problem_type",
+    "created_at", "updated_at",
+)
+SERVING_COLUMNS = ",".join(SERVING_FIELDS)
+
+_NOT_FOUND = object()
+
+
+class ModelMetadataCache:
+    """
+    Short-lived cache of ``models`` rows keyed by ``(model_id, user_id)``.
+
+    Entries expire after ``ttl`` seconds, so changes made outside this
+    service show up within that window; training and deletion invalidate
+    explicitly through the model lifecycle events. Lookups that find no row
+    (missing model or another user's model) are cached for ``negative_ttl``
+    so repeated bad requests do not reach the database either. Concurrent
+    misses for the same key share one query.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 30.0, negative_ttl: float = 5.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, clock=time.monotonic, on_evict=self._forget)
+        # model_id -> users with an entry, so invalidating a model reaches every key;
+        # kept in step with the cache, so it never outgrows maxsize
+        self._users: Dict[str, Set[str]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Bumped on every invalidation; a lookup that raced with one is not cached
+        self._generation = 0
+        self.lookups = 0
+
+    @staticmethod
+    def _key(model_id: Any, user_id: str) -> Tuple[str, str]:
+        return str(model_id), str(user_id)
+
+    async def get(self, model_id: Any, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Serving metadata of a model owned by ``user_id``
+
+        Returns:
+            The cached fields of the models row, or None if the user has no such model
+        """
+        key = self._key(model_id, user_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return None if cached is _NOT_FOUND else cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The request doing the lookup went away; do it ourselves
+                return await self.get(model_id, user_id)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            row = await repositories.models.get(columns=SERVING_COLUMNS, id=model_id, user_id=user_id)
+            self.lookups += 1
+            metadata = {field: row[field] for field in SERVING_FIELDS if field in row} if row else None
+            if generation == self._generation:
+                self.put(model_id, user_id, metadata)
+            future.set_result(metadata)
+            return metadata
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; nobody else needs to retrieve it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def put(self, model_id: Any, user_id: str, metadata: Optional[Dict[str, Any]]) -> None:
+        key = self._key(model_id, user_id)
+        if metadata is None:
+            self._cache.set(key, _NOT_FOUND, ttl=self.negative_ttl)
+        else:
+            self._cache.set(key, metadata)
+        self._users.setdefault(key[0], set()).add(key[1])
+
+    def _forget(self, key: Tuple[str, str]) -> None:
+        users = self._users.get(key[0])
+        if users is None:
+            return
+        users.discard(key[1])
+        if not users:
+            del self._users[key[0]]
+
+    def invalidate(self, model_id: Any) -> int:
+        """Drop every entry of a model, including negative ones; returns how many were dropped"""
+        model_key = str(model_id)
+        self._generation += 1
+        dropped = 0
+        for user_id in self._users.pop(model_key, ()):
+            if self._cache.pop((model_key, user_id), None) is not None:
+                dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._cache.clear()
+        self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "lookups": self.lookups}
+
+
+model_metadata = ModelMetadataCache(
+    maxsize=settings.model_metadata_cache_size,
+    ttl=settings.model_metadata_ttl_seconds,
+    negative_ttl=settings.model_metadata_negative_ttl_seconds,
+)
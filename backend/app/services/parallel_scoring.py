@@ -0,0 +1,292 @@
+# app/services/parallel_scoring.py
+import asyncio
+import math
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.core.resources import core_budget
+
+settings = get_settings()
+
+# Loaded bundles inside a scoring worker process, keyed by local artifact path
+_worker_predictors: "OrderedDict[str, Any]" = OrderedDict()
+_WORKER_MAX_MODELS = 4
+
+
+@dataclass
+class _PartitionTask:
+    """Everything a worker needs to score rows [start, end); only names and offsets are pickled"""
+    artifact_path: str
+    input_name: str
+    n_rows: int
+    n_features: int
+    start: int
+    end: int
+    output_name: str
+    proba_name: Optional[str] = None
+    n_proba: int = 0
+
+
+def _init_worker() -> None:
+    from threadpoolctl import threadpool_limits
+
+    # Parallelism comes from the partitions; keep native pools single-threaded
+    threadpool_limits(limits=1)
+
+
+def _worker_predictor(artifact_path: str):
+    predictor = _worker_predictors.get(artifact_path)
+    if predictor is not None:
+        _worker_predictors.move_to_end(artifact_path)
+        return predictor
+
+    import joblib
+    from app.services.predict_service import PredictionService
+
+    # Arrays stay in the OS page cache of the artifact file, shared by all workers
+    predictor = PredictionService(joblib.load(artifact_path, mmap_mode="r"))
+    _worker_predictors[artifact_path] = predictor
+    while len(_worker_predictors) > _WORKER_MAX_MODELS:
+        _worker_predictors.popitem(last=False)
+    return predictor
+
+
+def _score_partition(task: _PartitionTask) -> int:
+    """Worker entry point: predict one slice of the shared input into the shared outputs"""
+    predictor = _worker_predictor(task.artifact_path)
+    model = predictor.estimator_for(task.end - task.start)
+
+    blocks = [shared_memory.SharedMemory(name=task.input_name), shared_memory.SharedMemory(name=task.output_name)]
+    if task.proba_name:
+        blocks.append(shared_memory.SharedMemory(name=task.proba_name))
+    try:
+        views = [
+            np.ndarray((task.n_rows, task.n_features), dtype=np.float64, buffer=blocks[0].buf),
+            np.ndarray((task.n_rows,), dtype=np.float64, buffer=blocks[1].buf),
+        ]
+        if task.proba_name:
+            views.append(np.ndarray((task.n_rows, task.n_proba), dtype=np.float64, buffer=blocks[2].buf))
+
+        rows = views[0][task.start:task.end]
+        views[1][task.start:task.end] = model.predict(rows)
+        if task.proba_name:
+            views[2][task.start:task.end] = np.asarray(model.predict_proba(rows)).reshape(-1, task.n_proba)
+        # Views must be gone before the blocks can be closed
+        del rows, views
+    finally:
+        for block in blocks:
+            block.close()
+    return task.end - task.start
+
+
+def choose_batch_size(model, n_features: int, n_rows: int, n_workers: int, memory_budget_bytes: int) -> int:
+    """
+    Rows per partition, from the model's per-row working memory and a memory budget
+
+    Per-row cost is the input row plus what predict allocates per row: a
+    distance to every training sample for KNN, a kernel value per support
+    vector for SVMs, and per-tree outputs for ensembles. The budget is split
+    between workers, and partitions are capped so every worker gets several
+    of them for load balancing.
+    """
+    estimator = model.steps[-1][1] if hasattr(model, "steps") else model
+    classes = getattr(estimator, "classes_", None)
+    n_outputs = len(classes) if classes is not None else 1
+    per_row = 8 * max(1, n_features)
+
+    if getattr(estimator, "n_samples_fit_", None):
+        per_row += 16 * estimator.n_samples_fit_
+    elif getattr(estimator, "support_vectors_", None) is not None:
+        per_row += 8 * len(estimator.support_vectors_)
+    elif getattr(estimator, "estimators_", None) is not None:
+        per_row += 16 * np.size(estimator.estimators_) * n_outputs
+    elif getattr(estimator, "nodes", None) is not None:
+        # Compiled forest or boosting model
+        per_row += 16 * estimator.nodes.n_trees * n_outputs
+    else:
+        per_row += 8 * n_outputs
+
+    by_memory = max(1, memory_budget_bytes // (max(1, n_workers) * per_row))
+    by_balance = max(1, math.ceil(n_rows / (max(1, n_workers) * 4)))
+    return int(max(1, min(by_memory, by_balance, 65536)))
+
+
+class ParallelScorer:
+    """
+    Scores large inputs on several cores with a pool of spawned worker processes.
+
+    The parent transforms the input once and copies the feature matrix into a
+    shared-memory block. Workers load the model bundle once, memory-mapped
+    from the local artifact file, and score row partitions straight from the
+    shared input into shared output arrays. Only partition offsets cross the
+    process boundary, never the model or the data, and writing by offset
+    keeps the output in input order. Cores are leased from the process-wide
+    ``core_budget`` so scoring and training do not oversubscribe the host;
+    the lease never waits, so while training holds the cores inputs are
+    scored in-process instead of queueing behind it.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, memory_budget_bytes: int = 512 * 1024 ** 2,
+                 min_rows: int = 10000):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) - 1)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.min_rows = min_rows
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def score(
+            self,
+            predictor,
+            df: pd.DataFrame,
+            artifact_path: Optional[str],
+            return_probabilities: bool = False,
+            batch_size: Optional[int] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Predict every row of ``df``
+
+        Falls back to one in-process vectorized call for small inputs, models
+        whose outputs are not numeric, when no local artifact is available,
+        when fewer than two cores are free, or when the artifact was evicted
+        from the disk cache before the workers loaded it.
+
+        Args:
+            predictor: PredictionService of the loaded bundle
+            df: Raw input rows
+            artifact_path: Local model file the workers memory-map
+            return_probabilities: Also return class probabilities
+            batch_size: Rows per partition (default: ``choose_batch_size``)
+
+        Returns:
+            Tuple of (predictions, probabilities or None, scoring details)
+        """
+        X = await asyncio.to_thread(lambda: np.ascontiguousarray(predictor.transform(df), dtype=np.float64))
+        n_rows = len(X)
+
+        want_probabilities = return_probabilities and predictor.problem_type == "classification"
+        if (
+                n_rows < self.min_rows or self.max_workers <= 1 or artifact_path is None
+                # decision_function scores are left to the in-process path
+                or (want_probabilities and not hasattr(predictor.estimator_for(1), "predict_proba"))
+        ):
+            return await self._score_in_process(predictor, X, return_probabilities)
+
+        # Output dtype and probability width from one row, scored in-process
+        probe = predictor.estimator_for(1)
+        probe_predictions = np.asarray(probe.predict(X[:1]))
+        if not np.issubdtype(probe_predictions.dtype, np.number):
+            return await self._score_in_process(predictor, X, return_probabilities)
+        n_proba = np.asarray(probe.predict_proba(X[:1])).reshape(1, -1).shape[1] if want_probabilities else 0
+
+        lease = await core_budget.acquire(requested=self.max_workers, min_cores=2, wait=False)
+        if lease is None:
+            return await self._score_in_process(predictor, X, return_probabilities)
+        try:
+            # The compiled model describes the same ensemble without loading the original here
+            batch_size = batch_size or choose_batch_size(
+                predictor.compiled_model or predictor.model, X.shape[1], n_rows, lease.cores,
+                self.memory_budget_bytes
+            )
+            predictions, probabilities = await self._score_partitions(
+                X, artifact_path, batch_size, lease.cores, n_proba
+            )
+        except BrokenProcessPool as e:
+            print(f"[Prediction] Scoring pool failed ({e}); scoring in-process")
+            self.shutdown()
+            return await self._score_in_process(predictor, X, return_probabilities)
+        except FileNotFoundError as e:
+            # The disk cache evicted the artifact before a worker mapped it
+            print(f"[Prediction] Model artifact gone before scoring ({e}); scoring in-process")
+            return await self._score_in_process(predictor, X, return_probabilities)
+        finally:
+            await core_budget.release(lease)
+
+        details = {
+            "mode": "parallel",
+            "workers": lease.cores,
+            "batch_size": batch_size,
+            "partitions": math.ceil(n_rows / batch_size),
+        }
+        return predictions.astype(probe_predictions.dtype, copy=False), probabilities, details
+
+    async def _score_partitions(self, X: np.ndarray, artifact_path: str, batch_size: int, concurrency: int,
+                                n_proba: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        n_rows, n_features = X.shape
+        blocks = []
+        try:
+            input_block = shared_memory.SharedMemory(create=True, size=X.nbytes)
+            blocks.append(input_block)
+            np.ndarray(X.shape, dtype=np.float64, buffer=input_block.buf)[:] = X
+
+            output_block = shared_memory.SharedMemory(create=True, size=n_rows * 8)
+            blocks.append(output_block)
+            proba_block = None
+            if n_proba:
+                proba_block = shared_memory.SharedMemory(create=True, size=n_rows * n_proba * 8)
+                blocks.append(proba_block)
+
+            pool = self._pool()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def run(start: int) -> int:
+                task = _PartitionTask(
+                    artifact_path=artifact_path,
+                    input_name=input_block.name,
+                    n_rows=n_rows,
+                    n_features=n_features,
+                    start=start,
+                    end=min(start + batch_size, n_rows),
+                    output_name=output_block.name,
+                    proba_name=proba_block.name if proba_block else None,
+                    n_proba=n_proba,
+                )
+                async with semaphore:
+                    return await asyncio.wrap_future(pool.submit(_score_partition, task))
+
+            await asyncio.gather(*(run(start) for start in range(0, n_rows, batch_size)))
+
+            predictions = np.ndarray((n_rows,), dtype=np.float64, buffer=output_block.buf).copy()
+            probabilities = (
+                np.ndarray((n_rows, n_proba), dtype=np.float64, buffer=proba_block.buf).copy()
+                if proba_block else None
+            )
+            return predictions, probabilities
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    @staticmethod
+    async def _score_in_process(predictor, X: np.ndarray, return_probabilities: bool):
+        predictions, probabilities = await asyncio.to_thread(predictor.predict_arrays, X, return_probabilities)
+        return predictions, probabilities, {"mode": "in_process", "workers": 1, "batch_size": len(X), "partitions": 1}
+
+
+parallel_scorer = ParallelScorer(
+    max_workers=settings.parallel_scoring_workers,
+    memory_budget_bytes=settings.parallel_scoring_memory_budget_bytes,
+    min_rows=settings.parallel_scoring_min_rows,
+)
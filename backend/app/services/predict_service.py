@@ -2,10 +2,30 @@
 import joblib
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
+import hashlib
 import io
-from app.db.supabase_client import supabase
+import os
+import pickle
+import tempfile
+import asyncio
+from app.core.config import get_settings
+from app.core.artifact_cache import model_artifacts
+from app.core.model_events import model_events, MODEL_DELETED
+from app.core.model_cache import ModelCache
+from app.db import repositories
+from app.services.batching import BatcherRegistry
+from app.services.compiled_preprocessor import compile_preprocessor
+from app.services.compiled_model import compile_model
+from app.services.model_metadata import model_metadata
+from app.services.parallel_scoring import parallel_scorer
+from app.services.input_formats import columns_to_frame
+from app.services.prediction_log import prediction_log
+from app.services.prediction_memo import PredictionMemoRegistry, merge_outputs, row_keys
+from app.services.prediction_outputs import PredictionOutputError, read_page, store_outputs
+
+settings = get_settings()
 
 
 class PredictionError(Exception):
@@ -16,75 +36,409 @@ class PredictionError(Exception):
 class ModelStore:
     """Handles model loading and caching"""
 
-    def __init__(self):
-        self._cache = {}
-        self._cache_limit = 10  # Maximum models to keep in memory
+    def __init__(self, max_bytes: int, ttl: Optional[float] = None):
+        self._cache = ModelCache(max_bytes=max_bytes, ttl=ttl)
 
-    def load_model(self, model_url: str, model_id: int) -> Dict[str, Any]:
+    async def load_model(self, model_url: str, model_id: int, version: Optional[str] = None) -> Dict[str, Any]:
         """
         Load model from storage with caching
 
+        Memory misses fall through to the local disk tier, and only disk
+        misses download from Supabase storage.
+
         Args:
             model_url: URL of model in storage
             model_id: Model identifier for caching
+            version: Artifact version (e.g. the model's updated_at)
 
         Returns:
             Dict containing model, preprocessor, and metadata
         """
-        # Check cache first
-        if model_id in self._cache:
-            return self._cache[model_id]
-
-        try:
-            # Extract file path from URL
-            file_path = model_url.split('/')[-2:]
-            file_path = '/'.join(file_path)
-
-            # Download from Supabase storage
-            model_bytes = supabase.storage.from_('models').download(file_path)
-
-            # Load model bundle
-            model_bundle = joblib.load(io.BytesIO(model_bytes))
+        async def loader():
+            local_path = await self.local_artifact(model_url, version)
 
-            # Cache the model
-            self._cache[model_id] = model_bundle
-
-            # Implement simple LRU cache by removing oldest if limit exceeded
-            if len(self._cache) > self._cache_limit:
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
-
-            return model_bundle
+            # Load model bundle; memory-mapped arrays are page cache shared with other workers
+            model_bundle = await asyncio.to_thread(self._load_bundle, local_path)
+            shared = _mapped_nbytes(model_bundle)
+            private = max(0, os.path.getsize(local_path) - shared) + _lazy_estimator_nbytes(model_bundle)
+            return model_bundle, private, shared
 
+        try:
+            # The URL embeds the upload timestamp, so a retrained artifact never matches a stale entry
+            return await self._cache.get_or_load(str(model_id), loader, version=f"{model_url}@{version or ''}")
         except Exception as e:
             raise PredictionError(f"Failed to load model: {str(e)}")
 
+    @staticmethod
+    async def local_artifact(model_url: str, version: Optional[str] = None) -> str:
+        """Path of the model file in the local disk tier, downloading it on a miss"""
+        file_path = repositories.model_files.path_from_url(model_url)
+        return await model_artifacts.fetch(
+            file_path,
+            lambda: repositories.model_files.download(file_path),
+            version=version,
+        )
+
+    @staticmethod
+    def _load_bundle(local_path: str) -> Dict[str, Any]:
+        """
+        Load a bundle from the local disk tier
+
+        With ``model_mmap_enabled`` the large NumPy arrays (coefficients, KNN
+        training data, compiled tree node arrays) are mapped read-only from
+        the file, so every worker process on the host shares one copy of
+        them. Unpickling sklearn trees copies their nodes into private
+        memory whatever the mmap mode, so when a compiled model exists the
+        original estimator is kept out of the loaded bundle: it is stored as
+        its pickled bytes under ``model_pickle`` (mapped, not unpickled) and
+        only loaded by ``PredictionService.model`` for batches above the
+        compiled model's ``max_rows``. Bundles that gain compiled forms or
+        get their estimator split off on load are written back to the disk
+        tier so the next worker maps them too.
+        """
+        mmap_mode = "r" if settings.model_mmap_enabled else None
+        model_bundle = joblib.load(local_path, mmap_mode=mmap_mode)
+        missing_compiled = {"compiled_preprocessor", "compiled_model"} - set(model_bundle)
+
+        # Bundles saved before preprocessors were compiled at train time get compiled on load
+        if (
+                settings.compiled_preprocessor_enabled
+                and "compiled_preprocessor" not in model_bundle
+                and model_bundle.get("preprocessor") is not None
+        ):
+            model_bundle["compiled_preprocessor"] = compile_preprocessor(model_bundle["preprocessor"])
+
+        if settings.compiled_model_enabled and "compiled_model" not in model_bundle:
+            model_bundle["compiled_model"] = ModelStore._compile_model(model_bundle)
+
+        split_estimator = (
+                mmap_mode and "model" in model_bundle and model_bundle.get("compiled_model") is not None
+        )
+        if split_estimator:
+            model_bundle = dict(model_bundle)
+            model = model_bundle.pop("model")
+            model_bundle["model_pickle"] = np.frombuffer(pickle.dumps(model, protocol=4), dtype=np.uint8)
+
+        if mmap_mode and (
+                split_estimator
+                or missing_compiled - ({"compiled_preprocessor", "compiled_model"} - set(model_bundle))
+        ):
+            model_bundle = ModelStore._rewrite_artifact(local_path, model_bundle, mmap_mode)
+        return model_bundle
+
+    @staticmethod
+    def _rewrite_artifact(local_path: str, model_bundle: Dict[str, Any], mmap_mode: str) -> Dict[str, Any]:
+        """Atomically replace the cached file with the enriched bundle and map it again"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(local_path), prefix=".tmp-")
+        os.close(fd)
+        try:
+            joblib.dump(model_bundle, tmp_path)
+            os.replace(tmp_path, local_path)
+        except Exception as e:
+            print(f"[ModelStore] Could not write compiled bundle to {local_path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            return model_bundle
+        return joblib.load(local_path, mmap_mode=mmap_mode)
+
+    @staticmethod
+    def _compile_model(model_bundle: Dict[str, Any]):
+        """Compile an older bundle's model, verified on synthetic rows run through its preprocessor"""
+        model = model_bundle.get("model")
+        n_features = getattr(model, "n_features_in_", None)
+        compiled_preprocessor = model_bundle.get("compiled_preprocessor")
+        if compiled_preprocessor is not None:
+            sample = compiled_preprocessor.transform_frame(compiled_preprocessor.synthetic_sample(256))
+        elif n_features is not None:
+            sample = np.random.default_rng(0).normal(size=(256, n_features))
+        else:
+            return None
+        return compile_model(model, sample)
+
+    def invalidate(self, model_id: int) -> bool:
+        """Drop a model from the cache; call when it is retrained or deleted"""
+        return self._cache.invalidate(str(model_id))
+
+    async def prefetch(self, model_url: str, model_id: int, version: Optional[str] = None) -> bool:
+        """Warm the disk and memory tiers ahead of the first prediction"""
+        try:
+            await self.load_model(model_url, model_id, version=version)
+            return True
+        except PredictionError as e:
+            print(f"[ModelStore] Prefetch of model {model_id} failed: {e}")
+            return False
+
+    def forget(self, model_id: int, model_url: Optional[str] = None, version: Optional[str] = None) -> None:
+        """Drop a deleted model from memory and from the local disk tier"""
+        self.invalidate(model_id)
+        if model_url:
+            model_artifacts.invalidate(repositories.model_files.path_from_url(model_url), version)
+
+    def add_invalidation_listener(self, listener) -> None:
+        """Register ``listener(model_id, reason)`` for evictions and invalidations"""
+        self._cache.add_listener(listener)
+
     def clear_cache(self):
         """Clear all cached models"""
         self._cache.clear()
 
     def remove_from_cache(self, model_id: int):
         """Remove specific model from cache"""
-        if model_id in self._cache:
-            del self._cache[model_id]
+        self.invalidate(model_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+def _lazy_estimator_nbytes(model_bundle: Dict[str, Any]) -> int:
+    """
+    Private bytes the split-off estimator takes once unpickled (estimated by its pickle size)
+
+    Zero when the compiled model serves every batch size, because the
+    estimator is then never loaded.
+    """
+    blob = model_bundle.get("model_pickle")
+    compiled = model_bundle.get("compiled_model")
+    serves_all = settings.compiled_model_enabled and compiled is not None and compiled.max_rows is None
+    if blob is None or "model" in model_bundle or serves_all:
+        return 0
+    return int(blob.nbytes)
+
+
+def _mapped_nbytes(obj: Any) -> int:
+    """Bytes of the memory-mapped arrays reachable from a loaded bundle"""
+    total, seen, stack = 0, set(), [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.memmap):
+            total += item.nbytes
+        elif isinstance(item, np.ndarray):
+            if item.dtype == object:
+                stack.extend(item.ravel().tolist())
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.extend(vars(item).values())
+    return total
 
 
 # Global model store instance
-model_store = ModelStore()
+model_store = ModelStore(
+    max_bytes=settings.model_cache_max_bytes,
+    ttl=settings.model_cache_ttl_seconds,
+)
+
+# Per-model micro-batchers; dropped whenever their model leaves the cache
+batchers = BatcherRegistry(
+    max_batch_rows=settings.prediction_batch_max_rows,
+    max_wait_ms=settings.prediction_batch_max_wait_ms,
+)
+model_store.add_invalidation_listener(lambda model_id, reason: batchers.drop(model_id, reason))
+
+# Per-model memo of recent outputs, keyed by input row hash (prediction_memo_enabled)
+prediction_memos = PredictionMemoRegistry(
+    max_models=settings.prediction_memo_max_models,
+    max_entries=settings.prediction_memo_max_entries,
+)
+model_store.add_invalidation_listener(lambda model_id, reason: prediction_memos.drop(model_id, reason))
+
+# Background prefetches started by events from other workers
+_event_tasks = set()
+
+
+async def _apply_model_event(event: Dict[str, Any]) -> None:
+    """Invalidate, forget or prefetch the bundle a model lifecycle event refers to"""
+    model_id = event.get("model_id")
+    if model_id is None:
+        return
+    # Status, URL and ownership may all have changed, or the row may be gone
+    model_metadata.invalidate(model_id)
+    if event.get("type") == MODEL_DELETED:
+        model_store.forget(model_id, event.get("model_url"), event.get("version"))
+        return
+
+    # Created or updated: anything cached under this id is stale
+    model_store.invalidate(model_id)
+    if settings.model_prefetch_enabled and event.get("model_url"):
+        await model_store.prefetch(event["model_url"], model_id, event.get("version"))
+
+
+def _on_remote_model_event(event: Dict[str, Any]) -> None:
+    task = asyncio.get_running_loop().create_task(_apply_model_event(event))
+    _event_tasks.add(task)
+    task.add_done_callback(_event_tasks.discard)
+
+
+model_events.subscribe(_on_remote_model_event)
+
+
+async def announce_model_event(event_type: str, model_id: Any, **fields: Any) -> None:
+    """
+    Apply a model lifecycle event in this worker, then broadcast it to the others
+
+    The local prefetch finishes before the broadcast, so the other workers
+    on the host load the bundle from the shared disk tier instead of all
+    downloading it at once.
+    """
+    await _apply_model_event({"type": event_type, "model_id": model_id, **fields})
+    try:
+        model_events.publish(event_type, model_id, **fields)
+    except Exception as e:
+        print(f"[ModelEvents] Could not publish {event_type} for model {model_id}: {e}")
 
 
 class PredictionService:
     """Handles predictions with preprocessing"""
 
     def __init__(self, model_bundle: Dict[str, Any]):
-        self.model = model_bundle.get('model')
+        self._bundle = model_bundle
         self.preprocessor = model_bundle.get('preprocessor')
+        self.compiled_preprocessor = (
+            model_bundle.get('compiled_preprocessor') if settings.compiled_preprocessor_enabled else None
+        )
+        self.compiled_model = model_bundle.get('compiled_model') if settings.compiled_model_enabled else None
         self.model_type = model_bundle.get('model_type')
         self.problem_type = model_bundle.get('problem_type')
 
-        if self.model is None:
+        if model_bundle.get('model') is None and model_bundle.get('model_pickle') is None:
             raise PredictionError("Model not found in bundle")
 
+    @property
+    def model(self):
+        """
+        The original estimator
+
+        Bundles whose estimator was split off at load time unpickle it on
+        first use; it is kept in the cached bundle, so that happens once per
+        worker process.
+        """
+        model = self._bundle.get('model')
+        if model is None:
+            model = pickle.loads(self._bundle['model_pickle'])
+            self._bundle['model'] = model
+        return model
+
+    @property
+    def input_columns(self) -> Optional[List[str]]:
+        """Raw feature columns the bundle expects, in training order"""
+        names = getattr(self.preprocessor, "feature_names_in_", None)
+        if names is not None:
+            return [str(name) for name in names]
+        if self.compiled_preprocessor is not None:
+            return list(self.compiled_preprocessor.input_columns)
+        # Last resort: may unpickle a split-off estimator
+        names = getattr(self.model, "feature_names_in_", None)
+        return [str(name) for name in names] if names is not None else None
+
+    @staticmethod
+    def to_frame(input_data: Union[pd.DataFrame, Dict[str, Any], List[Dict[str, Any]]]) -> pd.DataFrame:
+        """Convert supported input formats to a DataFrame"""
+        if isinstance(input_data, dict):
+            if input_data and all(isinstance(v, (list, tuple, np.ndarray)) for v in input_data.values()):
+                # Columnar {column: values}; built column by column, no per-row objects
+                return columns_to_frame(input_data)
+            return pd.DataFrame([input_data])
+        elif isinstance(input_data, list):
+            return pd.DataFrame(input_data)
+        elif isinstance(input_data, pd.DataFrame):
+            return input_data.copy()
+        raise PredictionError("Invalid input format. Expected DataFrame, dict, or list of dicts")
+
+    def transform(self, input_data: Union[pd.DataFrame, Dict[str, Any], List[Dict[str, Any]]]) -> np.ndarray:
+        """
+        Preprocess input into the model's feature matrix
+
+        Uses the compiled NumPy preprocessor when the bundle has one, which
+        also accepts row dicts or ``{column: values}`` without building a
+        DataFrame; otherwise falls back to the fitted sklearn pipeline.
+        """
+        if self.compiled_preprocessor is not None:
+            if isinstance(input_data, dict) and not any(isinstance(v, (list, tuple, np.ndarray)) for v in input_data.values()):
+                input_data = [input_data]
+            return self.compiled_preprocessor.transform(input_data)
+
+        df = input_data if isinstance(input_data, pd.DataFrame) else self.to_frame(input_data)
+        if self.preprocessor is not None:
+            return self.preprocessor.transform(df)
+        return df.values
+
+    def estimator_for(self, n_rows: int):
+        """The compiled model when there is one and it is faster at this batch size, else the original"""
+        compiled = self.compiled_model
+        if compiled is not None and (compiled.max_rows is None or n_rows <= compiled.max_rows):
+            return compiled
+        return self.model
+
+    def predict_arrays(self, df: pd.DataFrame, return_probabilities: bool = False):
+        """
+        Run preprocessing and the model, returning raw arrays
+
+        Returns:
+            Tuple of (predictions, probabilities or None)
+        """
+        # An ndarray is an already preprocessed feature matrix
+        X_processed = df if isinstance(df, np.ndarray) else self.transform(df)
+        model = self.estimator_for(len(X_processed))
+
+        # Make predictions
+        predictions = model.predict(X_processed)
+
+        # Get probabilities for classification
+        probabilities = None
+        if self.problem_type == "classification" and return_probabilities:
+            if hasattr(model, 'predict_proba'):
+                probabilities = model.predict_proba(X_processed)
+            elif hasattr(model, 'decision_function'):
+                # For SVM without probability=True
+                probabilities = model.decision_function(X_processed)
+
+        return predictions, probabilities
+
+    def format_result(self, predictions: np.ndarray, probabilities: Optional[np.ndarray] = None,
+                      row_details: bool = False) -> Dict[str, Any]:
+        """
+        Build the prediction response payload from raw arrays
+
+        Arrays are returned as-is for ``NumpyJSONResponse`` to serialize;
+        confidence and argmax are computed column-wise. The per-row
+        ``predictions_with_confidence`` dicts are built in Python, so they are
+        only added when ``row_details`` is requested.
+        """
+        predictions = np.asarray(predictions)
+        result = {
+            "predictions": predictions,
+            "n_samples": len(predictions),
+            "model_type": self.model_type,
+            "problem_type": self.problem_type
+        }
+
+        if probabilities is not None:
+            probabilities = np.asarray(probabilities)
+            result["probabilities"] = probabilities
+
+            # Add predicted classes with confidence
+            if self.problem_type == "classification":
+                scores = probabilities if probabilities.ndim == 2 else probabilities[:, None]
+                confidence = scores.max(axis=1)
+                result["confidence"] = confidence
+                result["predicted_index"] = scores.argmax(axis=1)
+
+            if self.problem_type == "classification" and row_details:
+                class_index = list(range(scores.shape[1]))
+                result["predictions_with_confidence"] = [
+                    {"prediction": pred, "confidence": conf, "all_probabilities": dict(zip(class_index, probs))}
+                    for pred, conf, probs in zip(predictions.tolist(), confidence.tolist(), scores.tolist())
+                ]
+
+        return result
+
     def predict(
             self,
             input_data: Union[pd.DataFrame, Dict[str, Any], List[Dict[str, Any]]],
@@ -101,57 +455,9 @@ class PredictionService:
             Dict containing predictions and metadata
         """
         try:
-            # Convert input to DataFrame
-            if isinstance(input_data, dict):
-                df = pd.DataFrame([input_data])
-            elif isinstance(input_data, list):
-                df = pd.DataFrame(input_data)
-            elif isinstance(input_data, pd.DataFrame):
-                df = input_data.copy()
-            else:
-                raise PredictionError("Invalid input format. Expected DataFrame, dict, or list of dicts")
-
-            # Preprocess input
-            if self.preprocessor is not None:
-                X_processed = self.preprocessor.transform(df)
-            else:
-                X_processed = df.values
-
-            # Make predictions
-            predictions = self.model.predict(X_processed)
-
-            # Get probabilities for classification
-            probabilities = None
-            if self.problem_type == "classification" and return_probabilities:
-                if hasattr(self.model, 'predict_proba'):
-                    probabilities = self.model.predict_proba(X_processed)
-                elif hasattr(self.model, 'decision_function'):
-                    # For SVM without probability=True
-                    probabilities = self.model.decision_function(X_processed)
-
-            # Format results
-            result = {
-                "predictions": predictions.tolist(),
-                "n_samples": len(predictions),
-                "model_type": self.model_type,
-                "problem_type": self.problem_type
-            }
-
-            if probabilities is not None:
-                result["probabilities"] = probabilities.tolist()
-
-                # Add predicted classes with confidence
-                if self.problem_type == "classification":
-                    result["predictions_with_confidence"] = [
-                        {
-                            "prediction": int(pred) if isinstance(pred, (np.integer, int)) else pred,
-                            "confidence": float(max(probs)),
-                            "all_probabilities": dict(enumerate(probs.tolist()))
-                        }
-                        for pred, probs in zip(predictions, probabilities)
-                    ]
-
-            return result
+            df = self.to_frame(input_data)
+            predictions, probabilities = self.predict_arrays(df, return_probabilities)
+            return self.format_result(predictions, probabilities)
 
         except Exception as e:
             raise PredictionError(f"Prediction failed: {str(e)}")
@@ -165,6 +471,10 @@ class PredictionService:
         """
         Make predictions in batches for large datasets
 
+        The input is preprocessed once; batches are slices of the feature
+        matrix, so no per-batch DataFrame copies are made. See
+        ``parallel_scoring`` for the multi-core engine.
+
         Args:
             input_data: Input DataFrame
             batch_size: Number of samples per batch
@@ -174,102 +484,267 @@ class PredictionService:
             Dict containing all predictions
         """
         try:
-            all_predictions = []
-            all_probabilities = [] if return_probabilities else None
-
-            n_samples = len(input_data)
+            X_processed = self.transform(input_data)
+            n_samples = len(X_processed)
             n_batches = (n_samples + batch_size - 1) // batch_size
 
-            for i in range(n_batches):
-                start_idx = i * batch_size
-                end_idx = min((i + 1) * batch_size, n_samples)
-                batch_df = input_data.iloc[start_idx:end_idx]
-
-                # Process batch
-                result = self.predict(batch_df, return_probabilities=return_probabilities)
-                all_predictions.extend(result['predictions'])
+            prediction_parts, probability_parts = [], []
+            for start_idx in range(0, n_samples, batch_size):
+                predictions, probabilities = self.predict_arrays(
+                    X_processed[start_idx:start_idx + batch_size], return_probabilities
+                )
+                prediction_parts.append(predictions)
+                if probabilities is not None:
+                    probability_parts.append(probabilities)
 
-                if return_probabilities and 'probabilities' in result:
-                    all_probabilities.extend(result['probabilities'])
-
-            result = {
-                "predictions": all_predictions,
-                "n_samples": n_samples,
-                "n_batches": n_batches,
-                "model_type": self.model_type,
-                "problem_type": self.problem_type
-            }
-
-            if all_probabilities:
-                result["probabilities"] = all_probabilities
+            predictions = np.concatenate(prediction_parts) if prediction_parts else np.array([])
+            probabilities = np.concatenate(probability_parts) if probability_parts else None
 
+            result = self.format_result(predictions, probabilities)
+            result["n_batches"] = n_batches
             return result
 
         except Exception as e:
             raise PredictionError(f"Batch prediction failed: {str(e)}")
 
 
-async def predict(
+async def predict_arrays(
         model_id: int,
         user_id: str,
         input_data: Union[pd.DataFrame, Dict[str, Any], List[Dict[str, Any]]],
         return_probabilities: bool = False,
         save_predictions: bool = True
-) -> Dict[str, Any]:
+) -> Tuple[Dict[str, Any], "PredictionService", np.ndarray, Optional[np.ndarray], Dict[str, Any]]:
     """
-    Main service function for making predictions
+    Score input with a model and return the raw output arrays
+
+    Shared by the JSON and binary prediction endpoints; formatting the
+    response is left to the caller.
 
     Args:
         model_id: ID of model to use
         user_id: User identifier
-        input_data: Input features for prediction
+        input_data: Input features as a DataFrame, row dicts or ``{column: values}``
         return_probabilities: Return class probabilities
         save_predictions: Save predictions to database
 
     Returns:
-        Dict containing predictions and metadata
+        Tuple of (model metadata, predictor, predictions, probabilities or None,
+        details such as memo cache hits)
     """
-    try:
-        # Fetch model metadata
-        model_info = supabase.table('models').select("*").eq("id", model_id).eq("user_id", user_id).execute()
+    # Fetch model metadata
+    model_data = await model_metadata.get(model_id, user_id)
+
+    if not model_data:
+        raise PredictionError("Model not found or access denied")
+
+    # Check model status
+    if model_data.get('status') not in ['trained', 'evaluated']:
+        raise PredictionError(f"Model not ready for predictions. Status: {model_data.get('status')}")
+
+    # Load model
+    version = model_data.get('updated_at') or model_data.get('created_at')
+    model_bundle = await model_store.load_model(model_data['model_url'], model_id, version=version)
+
+    # Initialize prediction service
+    predictor = PredictionService(model_bundle)
+    df = predictor.to_frame(input_data)
+    artifact_version = f"{model_data['model_url']}@{version}"
+    details: Dict[str, Any] = {}
+
+    if settings.prediction_memo_enabled and len(df):
+        # Rows scored before by this model version are answered from the memo; only misses are scored
+        memo = prediction_memos.get(str(model_id), artifact_version)
+        keys = await asyncio.to_thread(row_keys, df, predictor.input_columns)
+        hit, cached = memo.lookup(keys, return_probabilities)
+        miss_rows = np.flatnonzero(~hit)
+
+        miss_predictions = miss_probabilities = None
+        if len(miss_rows):
+            misses = df if len(miss_rows) == len(df) else df.iloc[miss_rows]
+            miss_predictions, miss_probabilities = await _score_frame(
+                model_id, artifact_version, predictor, misses, return_probabilities
+            )
+            memo.store([keys[i] for i in miss_rows], miss_predictions, miss_probabilities)
+        predictions, probabilities = merge_outputs(
+            hit, cached, miss_predictions, miss_probabilities, return_probabilities
+        )
+        details["cache"] = {
+            "hits": len(df) - len(miss_rows),
+            "misses": len(miss_rows),
+            "hit_rate": round(1 - len(miss_rows) / len(df), 4),
+        }
+    else:
+        predictions, probabilities = await _score_frame(
+            model_id, artifact_version, predictor, df, return_probabilities
+        )
 
-        if not model_info.data:
-            raise PredictionError("Model not found or access denied")
+    # Save predictions if requested
+    if save_predictions:
+        await _save_predictions(model_id, user_id, predictions, probabilities)
+
+    return model_data, predictor, predictions, probabilities, details
+
+
+async def _save_predictions(model_id: Any, user_id: str, predictions: np.ndarray,
+                            probabilities: Optional[np.ndarray]) -> None:
+    prediction_data = {
+        "model_id": model_id,
+        "user_id": user_id,
+        "n_samples": len(predictions),
+        "predicted_at": datetime.utcnow().isoformat()
+    }
+
+    if len(predictions) >= settings.prediction_output_min_rows:
+        # Large outputs go to object storage; the row keeps a pointer and summary statistics
+        prediction_data.update(await store_outputs(model_id, user_id, predictions, probabilities))
+    else:
+        prediction_data['predictions'] = np.asarray(predictions).tolist()
+        if probabilities is not None:
+            prediction_data['probabilities'] = np.asarray(probabilities).tolist()
+
+    # Buffered; the row and the model's last_used_at are written by the next bulk flush
+    await prediction_log.record(prediction_data, model_id=model_id)
+
+
+async def _score_frame(model_id: Any, artifact_version: str, predictor: "PredictionService", df: pd.DataFrame,
+                       return_probabilities: bool) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # Small requests are coalesced with concurrent ones for the same model
+    if settings.prediction_batching_enabled and len(df) <= settings.prediction_batch_max_rows:
+        batcher = batchers.get(str(model_id), artifact_version, predictor)
+        return await batcher.submit(df, return_probabilities)
+    return await asyncio.to_thread(predictor.predict_arrays, df, return_probabilities)
+
+
+def preprocessor_fingerprint(model_bundle: Dict[str, Any]) -> str:
+    """
+    Digest of a bundle's fitted preprocessor
 
-        model_data = model_info.data[0]
+    Models trained on the same split with the same preprocessing options get
+    byte-identical pickles, so equal digests mean one transform serves them
+    all. Computed once and kept on the cached bundle.
+    """
+    fingerprint = model_bundle.get("preprocessor_fingerprint")
+    if fingerprint is None:
+        preprocessor = model_bundle.get("preprocessor")
+        if preprocessor is None:
+            fingerprint = "none"
+        else:
+            fingerprint = hashlib.sha256(pickle.dumps(preprocessor, protocol=4)).hexdigest()[:16]
+        model_bundle["preprocessor_fingerprint"] = fingerprint
+    return fingerprint
+
+
+async def predict_many(
+        model_ids: List[Any],
+        user_id: str,
+        input_data: Union[pd.DataFrame, Dict[str, Any], List[Dict[str, Any]]],
+        return_probabilities: bool = False,
+        save_predictions: bool = True,
+        row_details: bool = False
+) -> Dict[str, Any]:
+    """
+    Score the same rows with several models, transforming once per preprocessor
+
+    Models are grouped by ``preprocessor_fingerprint``; each group's first
+    predictor transforms the input and every model in the group predicts
+    from that feature matrix.
 
-        # Check model status
+    Args:
+        model_ids: IDs of the models to use (duplicates are ignored)
+        user_id: User identifier
+        input_data: Input features for prediction
+        return_probabilities: Return class probabilities
+        save_predictions: Save each model's predictions to database
+        row_details: Add the per-row ``predictions_with_confidence`` dicts
+
+    Returns:
+        Dict with per-model results keyed by model ID and the preprocessor groups
+    """
+    model_ids = list(dict.fromkeys(str(model_id) for model_id in model_ids))
+    if not model_ids:
+        raise PredictionError("At least one model_id is required")
+
+    async def load(model_id: str):
+        model_data = await model_metadata.get(model_id, user_id)
+        if not model_data:
+            raise PredictionError(f"Model {model_id} not found or access denied")
         if model_data.get('status') not in ['trained', 'evaluated']:
-            raise PredictionError(f"Model not ready for predictions. Status: {model_data.get('status')}")
+            raise PredictionError(f"Model {model_id} not ready for predictions. Status: {model_data.get('status')}")
+        version = model_data.get('updated_at') or model_data.get('created_at')
+        model_bundle = await model_store.load_model(model_data['model_url'], model_id, version=version)
+        return model_data, model_bundle
 
-        # Load model
-        model_bundle = model_store.load_model(model_data['model_url'], model_id)
+    loaded = dict(zip(model_ids, await asyncio.gather(*(load(model_id) for model_id in model_ids))))
 
-        # Initialize prediction service
-        predictor = PredictionService(model_bundle)
+    groups: Dict[str, List[str]] = {}
+    for model_id, (_, model_bundle) in loaded.items():
+        groups.setdefault(preprocessor_fingerprint(model_bundle), []).append(model_id)
 
-        # Make predictions
-        result = predictor.predict(input_data, return_probabilities=return_probabilities)
+    df = PredictionService.to_frame(input_data)
+
+    def score_group(group: List[str]):
+        predictors = [PredictionService(loaded[model_id][1]) for model_id in group]
+        X = predictors[0].transform(df)
+        return [predictor.predict_arrays(X, return_probabilities) + (predictor,) for predictor in predictors]
 
-        # Save predictions if requested
-        if save_predictions:
-            prediction_data = {
+    results: Dict[str, Any] = {}
+    for group in groups.values():
+        for model_id, (predictions, probabilities, predictor) in zip(group, await asyncio.to_thread(score_group, group)):
+            results[model_id] = {
                 "model_id": model_id,
-                "user_id": user_id,
-                "predictions": result['predictions'],
-                "n_samples": result['n_samples'],
-                "predicted_at": datetime.utcnow().isoformat()
+                **predictor.format_result(predictions, probabilities, row_details),
             }
+            if save_predictions:
+                await _save_predictions(loaded[model_id][0].get('id', model_id), user_id, predictions, probabilities)
 
-            if 'probabilities' in result:
-                prediction_data['probabilities'] = result['probabilities']
+    return {
+        "n_samples": len(df),
+        "models": [results[model_id] for model_id in model_ids],
+        "preprocessor_groups": [
+            {"fingerprint": fingerprint, "model_ids": group} for fingerprint, group in groups.items()
+        ],
+    }
 
-            supabase.table("predictions").insert(prediction_data).execute()
 
-            # Update model last_used timestamp
-            supabase.table("models").update({
-                "last_used_at": datetime.utcnow().isoformat()
-            }).eq("id", model_id).execute()
+async def input_columns(model_id: int, user_id: str) -> Optional[List[str]]:
+    """Raw feature columns a model was trained on, in order"""
+    model_data = await model_metadata.get(model_id, user_id)
+    if not model_data:
+        raise PredictionError("Model not found or access denied")
+    version = model_data.get('updated_at') or model_data.get('created_at')
+    model_bundle = await model_store.load_model(model_data['model_url'], model_id, version=version)
+    return PredictionService(model_bundle).input_columns
+
+
+async def predict(
+        model_id: int,
+        user_id: str,
+        input_data: Union[pd.DataFrame, Dict[str, Any], List[Dict[str, Any]]],
+        return_probabilities: bool = False,
+        save_predictions: bool = True,
+        row_details: bool = False
+) -> Dict[str, Any]:
+    """
+    Main service function for making predictions
+
+    Args:
+        model_id: ID of model to use
+        user_id: User identifier
+        input_data: Input features for prediction
+        return_probabilities: Return class probabilities
+        save_predictions: Save predictions to database
+        row_details: Add the per-row ``predictions_with_confidence`` dicts
+
+    Returns:
+        Dict containing predictions and metadata
+    """
+    try:
+        model_data, predictor, predictions, probabilities, details = await predict_arrays(
+            model_id, user_id, input_data, return_probabilities, save_predictions
+        )
+        result = predictor.format_result(predictions, probabilities, row_details)
+        result.update(details)
 
         return {
             "message": "Predictions generated successfully",
@@ -287,7 +762,7 @@ async def predict_from_file(
         user_id: str,
         file,
         return_probabilities: bool = False,
-        batch_size: int = 1000
+        batch_size: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Make predictions on uploaded CSV file
@@ -297,40 +772,44 @@ async def predict_from_file(
         user_id: User identifier
         file: Uploaded CSV file
         return_probabilities: Return class probabilities
-        batch_size: Batch size for processing
+        batch_size: Rows per scoring partition (default: chosen from model type and memory budget)
 
     Returns:
         Dict containing predictions
     """
     try:
         # Read CSV file
-        content = file.read()
-        df = pd.read_csv(io.BytesIO(content))
+        content = await file.read()
+        df = await asyncio.to_thread(pd.read_csv, io.BytesIO(content))
 
         if df.empty:
             raise PredictionError("Uploaded file is empty")
 
         # Fetch model metadata
-        model_info = supabase.table('models').select("*").eq("id", model_id).eq("user_id", user_id).execute()
+        model_data = await model_metadata.get(model_id, user_id)
 
-        if not model_info.data:
+        if not model_data:
             raise PredictionError("Model not found or access denied")
 
-        model_data = model_info.data[0]
-
         # Remove target column if present
         target_col = model_data.get('target_column')
         if target_col and target_col in df.columns:
             df = df.drop(columns=[target_col])
 
         # Load model
-        model_bundle = model_store.load_model(model_data['model_url'], model_id)
+        version = model_data.get('updated_at') or model_data.get('created_at')
+        model_bundle = await model_store.load_model(model_data['model_url'], model_id, version=version)
 
         # Initialize prediction service
         predictor = PredictionService(model_bundle)
 
-        # Make batch predictions
-        result = predictor.batch_predict(df, batch_size=batch_size, return_probabilities=return_probabilities)
+        # Score partitions on several cores; workers map the local artifact instead of receiving the model
+        artifact_path = await model_store.local_artifact(model_data['model_url'], version)
+        predictions, probabilities, scoring = await parallel_scorer.score(
+            predictor, df, artifact_path, return_probabilities, batch_size=batch_size
+        )
+        result = predictor.format_result(predictions, probabilities)
+        result["scoring"] = scoring
 
         # Save summary to database
         prediction_data = {
@@ -340,8 +819,10 @@ async def predict_from_file(
             "predicted_at": datetime.utcnow().isoformat(),
             "source_file": file.filename
         }
+        # Full results are kept in object storage, readable page by page
+        prediction_data.update(await store_outputs(model_id, user_id, predictions, probabilities))
 
-        supabase.table("predictions").insert(prediction_data).execute()
+        await prediction_log.record(prediction_data, model_id=model_id)
 
         return {
             "message": "Batch predictions completed successfully",
@@ -354,15 +835,49 @@ async def predict_from_file(
         raise PredictionError(f"File prediction failed: {str(e)}")
 
 
+# History listings leave out inline outputs; they are read page by page with get_prediction_results
+HISTORY_COLUMNS = "id,model_id,user_id,n_samples,predicted_at,source_file,output_url,output_format,output_bytes,summary"
+
+
 async def get_prediction_history(
         model_id: int,
         user_id: str,
-        limit: int = 50
+        limit: int = 50,
+        offset: int = 0
 ) -> List[Dict[str, Any]]:
     """Get prediction history for a model"""
     try:
-        res = supabase.table('predictions').select("*").eq("model_id", model_id).eq("user_id", user_id).order(
-            'predicted_at', desc=True).limit(limit).execute()
-        return res.data
+        return await repositories.predictions.select(
+            HISTORY_COLUMNS, model_id=model_id, user_id=user_id, order='predicted_at', desc=True,
+            limit=limit, offset=offset
+        )
     except Exception as e:
-        raise PredictionError(f"Failed to fetch prediction history: {str(e)}")
\ No newline at end of file
+        raise PredictionError(f"Failed to fetch prediction history: {str(e)}")
+
+
+async def get_prediction_results(
+        prediction_id: Any,
+        user_id: str,
+        offset: int = 0,
+        limit: int = 1000
+) -> Dict[str, Any]:
+    """
+    Page through the full outputs of a saved prediction
+
+    Args:
+        prediction_id: ID of the predictions row
+        user_id: User identifier
+        offset: First row of the page
+        limit: Maximum rows per page
+
+    Returns:
+        Dict with the page rows, total row count and next offset
+    """
+    record = await repositories.predictions.get(id=prediction_id, user_id=user_id)
+    if not record:
+        raise PredictionError("Prediction not found or access denied")
+    try:
+        page = await read_page(record, offset=offset, limit=limit)
+    except PredictionOutputError as e:
+        raise PredictionError(str(e))
+    return {"prediction_id": prediction_id, "model_id": record.get("model_id"), **page}
\ No newline at end of file
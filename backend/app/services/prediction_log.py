@@ -0,0 +1,234 @@
+# app/services/prediction_log.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.db import repositories
+
+settings = get_settings()
+
+
+class PredictionLog:
+    """
+    Write-behind buffer for prediction rows and model ``last_used_at`` updates.
+
+    Request handlers hand their rows over and return without waiting for the
+    database. A background task flushes every ``flush_interval`` seconds, or
+    as soon as ``batch_rows`` rows are waiting, with one bulk insert per
+    batch and a single ``last_used_at`` update for every model used since the
+    previous flush. Memory is bounded: once ``max_pending_rows`` rows or
+    ``max_pending_samples`` stored predictions are waiting, ``record`` blocks
+    until a flush makes room. Failed writes are retried on later flushes and
+    dropped, with a log line, after ``max_attempts``. ``close`` flushes
+    whatever is left, so nothing accepted is lost on a clean shutdown. When
+    the log is not started every call writes straight through.
+    """
+
+    def __init__(
+            self,
+            flush_interval: float = 1.0,
+            batch_rows: int = 500,
+            max_pending_rows: int = 10000,
+            max_pending_samples: int = 1_000_000,
+            max_attempts: int = 5,
+    ):
+        self.flush_interval = flush_interval
+        self.batch_rows = batch_rows
+        self.max_pending_rows = max_pending_rows
+        self.max_pending_samples = max_pending_samples
+        self.max_attempts = max_attempts
+
+        # (row, attempts) in arrival order; bulk inserts keep that order per column set
+        self._rows: List[Tuple[Dict[str, Any], int]] = []
+        self._pending_samples = 0
+        # model_id -> latest use, so a hot model costs one update per flush
+        self._last_used: Dict[str, Tuple[Any, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._room: Optional[asyncio.Condition] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+        self.backpressure_waits = 0
+        self.last_flush_ms: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._room = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flusher and write everything still pending"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await self.flush(final=True)
+        async with self._room:
+            self._room.notify_all()
+
+    async def record(self, row: Dict[str, Any], model_id: Any = None) -> None:
+        """
+        Queue one prediction row, and a ``last_used_at`` touch for ``model_id``
+
+        Args:
+            row: Row for the predictions table
+            model_id: Model whose ``last_used_at`` should be bumped
+        """
+        if self._task is None:
+            await repositories.predictions.insert(row, returning=False)
+            if model_id is not None:
+                await repositories.models.update(
+                    {"last_used_at": datetime.utcnow().isoformat()}, returning=False, id=model_id
+                )
+            return
+
+        samples = _stored_samples(row)
+        async with self._room:
+            if self._full(samples):
+                self.backpressure_waits += 1
+                self._wake.set()
+                await self._room.wait_for(lambda: not self._full(samples) or self._task is None)
+            self._rows.append((row, 0))
+            self._pending_samples += samples
+
+        if model_id is not None:
+            self.touch(model_id)
+        if len(self._rows) >= self.batch_rows:
+            self._wake.set()
+
+    def touch(self, model_id: Any) -> None:
+        """Bump ``last_used_at`` of a model on the next flush"""
+        if self._task is None:
+            # Nothing to coalesce with; keep the caller from waiting on it
+            asyncio.create_task(self._touch_now(model_id))
+            return
+        self._last_used[str(model_id)] = (model_id, datetime.utcnow().isoformat())
+
+    def _full(self, samples: int) -> bool:
+        # An empty buffer always takes the row, however large it is
+        if not self._rows:
+            return False
+        return (
+            len(self._rows) >= self.max_pending_rows
+            or self._pending_samples + samples > self.max_pending_samples
+        )
+
+    async def _touch_now(self, model_id: Any) -> None:
+        try:
+            await repositories.models.update(
+                {"last_used_at": datetime.utcnow().isoformat()}, returning=False, id=model_id
+            )
+        except Exception as e:
+            print(f"[PredictionLog] Could not update last_used_at of model {model_id}: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self, final: bool = False) -> None:
+        """Write pending rows and model touches; failures are requeued unless ``final``"""
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            rows, self._rows = self._rows, []
+            last_used, self._last_used = self._last_used, {}
+            if not rows and not last_used:
+                return
+
+            started = time.perf_counter()
+            failed: List[Tuple[Dict[str, Any], int]] = []
+            for batch in _batches(rows, self.batch_rows):
+                try:
+                    await repositories.predictions.insert([row for row, _ in batch], returning=False)
+                    self.flushed_rows += len(batch)
+                except Exception as e:
+                    self.failed_flushes += 1
+                    retry = [(row, attempts + 1) for row, attempts in batch if attempts + 1 < self.max_attempts]
+                    dropped = len(batch) - len(retry)
+                    if final or dropped:
+                        self.dropped_rows += len(batch) if final else dropped
+                        print(f"[PredictionLog] Dropped {len(batch) if final else dropped} prediction rows: {e}")
+                    if not final:
+                        failed.extend(retry)
+
+            if last_used:
+                # One update for every model used in this window; the newest timestamp stands for all
+                model_ids = [model_id for model_id, _ in last_used.values()]
+                timestamp = max(ts for _, ts in last_used.values())
+                try:
+                    await repositories.models.update(
+                        {"last_used_at": timestamp}, returning=False, id=model_ids
+                    )
+                except Exception as e:
+                    print(f"[PredictionLog] Could not update last_used_at of {len(model_ids)} models: {e}")
+                    if not final:
+                        for key, value in last_used.items():
+                            self._last_used.setdefault(key, value)
+
+            async with self._room:
+                # Retries go ahead of rows recorded during the flush
+                self._rows[:0] = failed
+                self._pending_samples = sum(_stored_samples(row) for row, _ in self._rows)
+                self._room.notify_all()
+
+            self.flushes += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.running,
+            "pending_rows": len(self._rows),
+            "pending_samples": self._pending_samples,
+            "pending_model_touches": len(self._last_used),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "dropped_rows": self.dropped_rows,
+            "backpressure_waits": self.backpressure_waits,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+def _stored_samples(row: Dict[str, Any]) -> int:
+    predictions = row.get("predictions")
+    return len(predictions) if isinstance(predictions, list) else 0
+
+
+def _batches(rows: List[Tuple[Dict[str, Any], int]], size: int):
+    """Bulk inserts need the same keys on every row, so rows are grouped by column set"""
+    groups: Dict[Tuple[str, ...], List[Tuple[Dict[str, Any], int]]] = {}
+    for item in rows:
+        groups.setdefault(tuple(sorted(item[0])), []).append(item)
+    for group in groups.values():
+        for start in range(0, len(group), size):
+            yield group[start:start + size]
+
+
+prediction_log = PredictionLog(
+    flush_interval=settings.prediction_log_flush_interval_seconds,
+    batch_rows=settings.prediction_log_batch_rows,
+    max_pending_rows=settings.prediction_log_max_pending_rows,
+    max_pending_samples=settings.prediction_log_max_pending_samples,
+)
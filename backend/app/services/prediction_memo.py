@@ -0,0 +1,137 @@
+# app/services/prediction_memo.py
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.cache import TTLCache
+
+# Two independent 64-bit row hashes make a 128-bit key (pandas hash keys are 16 characters)
+_HASH_KEYS = ("regresslab-memo1", "regresslab-memo2")
+
+
+def row_keys(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> List[Tuple[int, int]]:
+    """
+    Stable per-row keys of the canonicalized input
+
+    Rows are reduced to the model's input columns when they are all present,
+    columns are taken in sorted order so their order in the request does not
+    matter, and values are hashed column-wise with pandas. The column names
+    are folded into the key so the same values under other names do not
+    collide.
+    """
+    if columns is not None and all(column in df.columns for column in columns):
+        df = df[list(columns)]
+    df = df[sorted(df.columns, key=str)]
+    names = hashlib.blake2b("\x1f".join(str(column) for column in df.columns).encode(), digest_size=8).digest()
+    first = pd.util.hash_pandas_object(df, index=False, hash_key=_HASH_KEYS[0]).to_numpy()
+    second = pd.util.hash_pandas_object(df, index=False, hash_key=_HASH_KEYS[1]).to_numpy()
+    return list(zip((first ^ np.uint64(int.from_bytes(names, "little"))).tolist(), second.tolist()))
+
+
+class PredictionMemo:
+    """
+    LRU memo of one model version's outputs, keyed by ``row_keys``
+
+    Entries hold the prediction and, when it was computed, the row of class
+    probabilities; a request for probabilities only hits entries that have
+    them.
+    """
+
+    def __init__(self, version: str, max_entries: int = 100_000):
+        self.version = version
+        self._entries = TTLCache(maxsize=max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, keys: List[Tuple[int, int]], return_probabilities: bool) -> Tuple[np.ndarray, list]:
+        """
+        Returns:
+            Tuple of (boolean hit mask, cached (prediction, probabilities) per row or None)
+        """
+        found = [self._entries.get(key) for key in keys]
+        if return_probabilities:
+            found = [entry if entry is not None and entry[1] is not None else None for entry in found]
+        hit = np.fromiter((entry is not None for entry in found), dtype=bool, count=len(found))
+        n_hits = int(hit.sum())
+        self.hits += n_hits
+        self.misses += len(keys) - n_hits
+        return hit, found
+
+    def store(self, keys: List[Tuple[int, int]], predictions: np.ndarray,
+              probabilities: Optional[np.ndarray] = None) -> None:
+        for i, key in enumerate(keys):
+            self._entries.set(key, (predictions[i], probabilities[i] if probabilities is not None else None))
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+def merge_outputs(
+        hit: np.ndarray,
+        cached: list,
+        miss_predictions: Optional[np.ndarray],
+        miss_probabilities: Optional[np.ndarray],
+        return_probabilities: bool,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Reassemble full output arrays, in input order, from cached rows and freshly scored misses"""
+    hit_rows = np.flatnonzero(hit)
+    miss_rows = np.flatnonzero(~hit)
+    cached_predictions = np.asarray([cached[i][0] for i in hit_rows])
+
+    if miss_predictions is None or not len(miss_rows):
+        predictions = cached_predictions
+    else:
+        miss_predictions = np.asarray(miss_predictions)
+        dtype = np.result_type(cached_predictions, miss_predictions) if len(hit_rows) else miss_predictions.dtype
+        predictions = np.empty(len(hit), dtype=dtype)
+        predictions[miss_rows] = miss_predictions
+        if len(hit_rows):
+            predictions[hit_rows] = cached_predictions
+
+    probabilities = None
+    if return_probabilities and (len(hit_rows) or miss_probabilities is not None):
+        cached_probabilities = [cached[i][1] for i in hit_rows]
+        if miss_probabilities is None or not len(miss_rows):
+            probabilities = np.asarray(cached_probabilities)
+        else:
+            miss_probabilities = np.asarray(miss_probabilities)
+            probabilities = np.empty((len(hit),) + miss_probabilities.shape[1:], dtype=miss_probabilities.dtype)
+            probabilities[miss_rows] = miss_probabilities
+            if len(hit_rows):
+                probabilities[hit_rows] = np.asarray(cached_probabilities)
+    return predictions, probabilities
+
+
+class PredictionMemoRegistry:
+    """One PredictionMemo per model, replaced when the model version changes; least recently used models are dropped"""
+
+    def __init__(self, max_models: int = 64, max_entries: int = 100_000):
+        self.max_models = max_models
+        self.max_entries = max_entries
+        self._memos: "OrderedDict[Hashable, PredictionMemo]" = OrderedDict()
+
+    def get(self, model_id: Hashable, version: str) -> PredictionMemo:
+        memo = self._memos.get(model_id)
+        if memo is None or memo.version != version:
+            memo = PredictionMemo(version, self.max_entries)
+            self._memos[model_id] = memo
+        self._memos.move_to_end(model_id)
+        while len(self._memos) > self.max_models:
+            self._memos.popitem(last=False)
+        return memo
+
+    def drop(self, model_id: Hashable, reason: str = "invalidated") -> None:
+        self._memos.pop(model_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {str(model_id): memo.stats() for model_id, memo in self._memos.items()}
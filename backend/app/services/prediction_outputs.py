@@ -0,0 +1,204 @@
+# app/services/prediction_outputs.py
+import asyncio
+import io
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.db import repositories
+
+settings = get_settings()
+
+OUTPUT_FORMAT = "npz-blocks"
+
+
+class PredictionOutputError(Exception):
+    """Custom exception for stored prediction outputs"""
+    pass
+
+
+def _as_storable(values: np.ndarray) -> np.ndarray:
+    # Object arrays would need pickle to load; labels are stored as fixed-width strings
+    values = np.asarray(values)
+    return values.astype(str) if values.dtype == object else values
+
+
+def encode_outputs(
+        predictions: np.ndarray,
+        probabilities: Optional[np.ndarray] = None,
+        block_rows: int = 50000
+) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Encode predictions as a sequence of independently compressed NPZ blocks
+
+    Each block holds ``block_rows`` rows and is a complete NPZ file, so any
+    row range can be read with one HTTP range request over the blocks that
+    cover it and decoded without the rest of the object.
+
+    Returns:
+        Tuple of (object bytes, block index stored alongside the pointer)
+    """
+    predictions = _as_storable(predictions)
+    if probabilities is not None:
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        if probabilities.ndim == 1:
+            probabilities = probabilities[:, None]
+
+    buffer = io.BytesIO()
+    blocks = []
+    for start in range(0, len(predictions), block_rows):
+        arrays = {"predictions": predictions[start:start + block_rows]}
+        if probabilities is not None:
+            arrays["probabilities"] = probabilities[start:start + block_rows]
+        offset = buffer.tell()
+        np.savez_compressed(buffer, **arrays)
+        blocks.append([start, offset, buffer.tell() - offset])
+
+    index = {
+        "format": OUTPUT_FORMAT,
+        "n_rows": int(len(predictions)),
+        "block_rows": block_rows,
+        "has_probabilities": probabilities is not None,
+        "blocks": blocks,
+    }
+    return buffer.getvalue(), index
+
+
+def decode_block(content: bytes) -> Dict[str, np.ndarray]:
+    with np.load(io.BytesIO(content), allow_pickle=False) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+def summarize_outputs(predictions: np.ndarray, probabilities: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Summary statistics kept in the table row in place of the full outputs"""
+    predictions = np.asarray(predictions)
+    summary: Dict[str, Any] = {"n_rows": int(len(predictions))}
+    if len(predictions) == 0:
+        return summary
+
+    if np.issubdtype(predictions.dtype, np.floating):
+        summary.update({
+            "min": float(np.min(predictions)),
+            "max": float(np.max(predictions)),
+            "mean": float(np.mean(predictions)),
+            "std": float(np.std(predictions)),
+            "p50": float(np.percentile(predictions, 50)),
+        })
+    else:
+        labels, counts = np.unique(predictions.astype(str) if predictions.dtype == object else predictions,
+                                   return_counts=True)
+        top = np.argsort(counts)[::-1][:20]
+        summary["class_counts"] = {str(labels[i]): int(counts[i]) for i in top}
+
+    if probabilities is not None:
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        confidence = probabilities.max(axis=1) if probabilities.ndim == 2 else probabilities
+        summary["mean_confidence"] = float(confidence.mean())
+    return summary
+
+
+async def store_outputs(
+        model_id: Any,
+        user_id: str,
+        predictions: np.ndarray,
+        probabilities: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """
+    Upload prediction outputs to object storage
+
+    Returns:
+        Columns for the predictions table: pointer, block index and summary
+    """
+    content, index = await asyncio.to_thread(
+        encode_outputs, predictions, probabilities, settings.prediction_output_block_rows
+    )
+    summary = await asyncio.to_thread(summarize_outputs, predictions, probabilities)
+
+    path = f"{user_id}/{model_id}/{uuid.uuid4().hex}.npzb"
+    await repositories.prediction_files.upload(path, content)
+    return {
+        "output_url": repositories.prediction_files.public_url(path),
+        "output_format": OUTPUT_FORMAT,
+        "output_index": index,
+        "output_bytes": len(content),
+        "summary": summary,
+    }
+
+
+async def read_page(record: Dict[str, Any], offset: int = 0, limit: int = 1000) -> Dict[str, Any]:
+    """
+    Read rows [offset, offset + limit) of a saved prediction
+
+    Externally stored outputs are fetched with a single range request over
+    the blocks covering the page; rows saved inline are sliced directly.
+
+    Args:
+        record: Row of the predictions table
+        offset: First row of the page
+        limit: Maximum number of rows
+
+    Returns:
+        Dict with the page rows, total row count and next offset
+    """
+    if offset < 0 or limit <= 0:
+        raise PredictionOutputError("offset must be >= 0 and limit must be positive")
+
+    if record.get("output_url"):
+        index = record.get("output_index") or {}
+        if index.get("format") != OUTPUT_FORMAT:
+            raise PredictionOutputError(f"Unsupported output format '{index.get('format')}'")
+        n_rows = index["n_rows"]
+        predictions, probabilities = await _read_stored_rows(record["output_url"], index, offset, limit)
+    else:
+        predictions = record.get("predictions") or []
+        n_rows = record.get("n_samples") or len(predictions)
+        probabilities = record.get("probabilities")
+        predictions = predictions[offset:offset + limit]
+        if probabilities is not None:
+            probabilities = probabilities[offset:offset + limit]
+
+    rows: List[Dict[str, Any]] = []
+    for i, prediction in enumerate(predictions):
+        row = {"row": offset + i, "prediction": prediction}
+        if probabilities is not None:
+            row["probabilities"] = probabilities[i]
+        rows.append(row)
+
+    next_offset = offset + len(rows)
+    return {
+        "offset": offset,
+        "limit": limit,
+        "n_rows": n_rows,
+        "rows": rows,
+        "next_offset": next_offset if next_offset < n_rows else None,
+    }
+
+
+async def _read_stored_rows(output_url: str, index: Dict[str, Any], offset: int,
+                            limit: int) -> Tuple[list, Optional[list]]:
+    end = min(offset + limit, index["n_rows"])
+    covering = [block for block in index["blocks"] if block[0] < end and block[0] + index["block_rows"] > offset]
+    if not covering:
+        return [], [] if index.get("has_probabilities") else None
+
+    # Blocks are contiguous, so the covering ones are one byte range
+    first_byte = covering[0][1]
+    last_byte = covering[-1][1] + covering[-1][2] - 1
+    path = repositories.prediction_files.path_from_url(output_url)
+    content = await repositories.prediction_files.download(path, byte_range=(first_byte, last_byte))
+
+    def decode():
+        parts = [
+            decode_block(content[start - first_byte:start - first_byte + length])
+            for _, start, length in covering
+        ]
+        base = covering[0][0]
+        predictions = np.concatenate([part["predictions"] for part in parts])[offset - base:end - base]
+        probabilities = None
+        if index.get("has_probabilities"):
+            probabilities = np.concatenate([part["probabilities"] for part in parts])[offset - base:end - base]
+        return predictions.tolist(), probabilities.tolist() if probabilities is not None else None
+
+    return await asyncio.to_thread(decode)
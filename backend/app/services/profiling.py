@@ -0,0 +1,357 @@
+# app/services/profiling.py
+import os
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.utils.sketches import HyperLogLog, QuantileSketch
+
+settings = get_settings()
+
+NUMERIC = "numeric"
+CATEGORICAL = "categorical"
+BOOLEAN = "boolean"
+DATETIME = "datetime"
+
+# Quantiles reported for numeric columns
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def column_kind(dtype) -> str:
+    """Profile kind of a pandas dtype"""
+    if pd.api.types.is_bool_dtype(dtype):
+        return BOOLEAN
+    if pd.api.types.is_numeric_dtype(dtype):
+        return NUMERIC
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return DATETIME
+    return CATEGORICAL
+
+
+@dataclass
+class ColumnProfile:
+    """Statistics of one column; numeric statistics are None for other kinds"""
+    name: str
+    dtype: str
+    kind: str
+    count: int = 0
+    nulls: int = 0
+    unique: int = 0
+    # False when ``unique`` is a HyperLogLog estimate
+    unique_exact: bool = True
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    # QUANTILES of numeric columns from a KLL sketch, keyed "p5" ... "p95"
+    quantiles: Optional[Dict[str, float]] = None
+
+    @property
+    def constant(self) -> bool:
+        """All non-null values are equal"""
+        if self.kind == NUMERIC:
+            return self.count > 0 and self.min == self.max
+        return self.unique == 1
+
+    def null_fraction(self, rows: int) -> float:
+        return self.nulls / rows if rows else 0.0
+
+
+@dataclass
+class DatasetProfile:
+    """Per-column profile of a dataset, computed in one pass over the data"""
+    rows: int
+    columns: List[ColumnProfile] = field(default_factory=list)
+    memory_bytes: int = 0
+    # Largest parsed chunk when profiled in chunks, for memory reporting
+    peak_chunk_bytes: int = 0
+    # Distinct counts are HyperLogLog estimates
+    approximate: bool = False
+
+    def __post_init__(self):
+        self._by_name = {column.name: column for column in self.columns}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __getitem__(self, name: str) -> ColumnProfile:
+        return self._by_name[name]
+
+    @property
+    def names(self) -> List[str]:
+        return [column.name for column in self.columns]
+
+    def of_kind(self, kind: str) -> List[str]:
+        return [column.name for column in self.columns if column.kind == kind]
+
+    @property
+    def has_missing(self) -> bool:
+        return any(column.nulls for column in self.columns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "memory_bytes": self.memory_bytes,
+            "approximate": self.approximate,
+            "columns": [asdict(column) for column in self.columns],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DatasetProfile":
+        return cls(
+            rows=data["rows"],
+            columns=[ColumnProfile(**column) for column in data.get("columns", [])],
+            memory_bytes=data.get("memory_bytes", 0),
+            approximate=data.get("approximate", False),
+        )
+
+
+class _ColumnAccumulator:
+    """Running statistics of one column, merged chunk by chunk"""
+
+    def __init__(self, name: str, max_exact_uniques: Optional[int], approximate: bool,
+                 hll_precision: int, quantile_k: int):
+        self.name = name
+        self.max_exact_uniques = max_exact_uniques
+        self.hll_precision = hll_precision
+        self.dtype = None
+        self.kind = None
+        self.count = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.uniques: Optional[Set[Any]] = set()
+        self.hll: Optional[HyperLogLog] = None
+        self.quantiles = QuantileSketch(quantile_k)
+        if approximate:
+            self.to_sketch()
+
+    def merge_kind(self, kind: str, dtype) -> None:
+        if self.kind is None or self.count == 0:
+            self.kind, self.dtype = kind, dtype
+        elif kind != self.kind:
+            # e.g. text in a column that looked numeric so far
+            self.kind, self.dtype = CATEGORICAL, np.dtype(object)
+
+    def merge_moments(self, count: int, minimum: float, maximum: float, mean: float, m2: float) -> None:
+        """Chan et al. parallel update of count, mean and sum of squared deviations"""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+
+    def to_sketch(self) -> None:
+        """Replace the exact set of distinct values by a HyperLogLog seeded with it"""
+        if self.hll is not None:
+            return
+        self.hll = HyperLogLog(self.hll_precision)
+        if self.uniques:
+            self.hll.add(np.asarray(list(self.uniques), dtype=np.float64 if self.kind == NUMERIC else object))
+        self.uniques = None
+
+    def merge_uniques(self, values, skipna: bool = True) -> None:
+        if self.hll is not None:
+            self.hll.add(values, skipna)
+            return
+        self.uniques.update(values)
+        if self.max_exact_uniques is not None and len(self.uniques) > self.max_exact_uniques:
+            self.to_sketch()
+
+    def merge(self, other: "_ColumnAccumulator") -> None:
+        nulls = self.nulls + other.nulls
+        if other.kind is not None:
+            self.merge_kind(other.kind, other.dtype)
+        if other.kind == NUMERIC and self.kind == NUMERIC:
+            self.merge_moments(other.count, other.min, other.max, other.mean, other.m2)
+        else:
+            self.count += other.count
+        self.nulls = nulls
+        self.quantiles.merge(other.quantiles)
+        if other.hll is not None or self.hll is not None:
+            self.to_sketch()
+            if other.hll is not None:
+                self.hll.merge(other.hll)
+            else:
+                self.merge_uniques(list(other.uniques))
+        else:
+            self.merge_uniques(other.uniques)
+
+    def build(self) -> ColumnProfile:
+        profile = ColumnProfile(
+            name=self.name,
+            dtype=str(self.dtype),
+            kind=self.kind or CATEGORICAL,
+            count=self.count,
+            nulls=self.nulls,
+            unique=self.hll.estimate() if self.hll is not None else len(self.uniques),
+            unique_exact=self.hll is None,
+        )
+        if profile.kind == NUMERIC and self.count:
+            profile.min = float(self.min)
+            profile.max = float(self.max)
+            profile.mean = float(self.mean)
+            profile.std = float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+            profile.quantiles = self.quantiles.quantile_dict(QUANTILES)
+        return profile
+
+
+class ProfileBuilder:
+    """
+    Builds a DatasetProfile from one DataFrame or a sequence of chunks.
+
+    Each chunk is profiled with whole-frame operations: one ``isna`` for
+    null counts, and one float matrix for the count, min, max, mean and
+    variance of every numeric column. Chunk moments are merged exactly, so a
+    chunked profile matches a single pass over the whole file.
+
+    Distinct values are counted exactly with hash sets until the profile
+    turns approximate, then with HyperLogLog sketches; quantiles always come
+    from a KLL sketch. ``approximate=None`` switches once the rows or parsed
+    bytes seen reach the configured thresholds, and a single column switches
+    on its own once it holds more than ``max_exact_uniques`` distinct values.
+    Builders over disjoint chunks can be combined with ``merge``.
+    """
+
+    def __init__(
+            self,
+            max_exact_uniques: Optional[int] = 100_000,
+            approximate: Optional[bool] = None,
+            approximate_min_rows: Optional[int] = None,
+            approximate_min_bytes: Optional[int] = None,
+    ):
+        self.max_exact_uniques = max_exact_uniques
+        self.approximate = bool(approximate)
+        self._auto = approximate is None
+        self.approximate_min_rows = (
+            settings.profile_approximate_min_rows if approximate_min_rows is None else approximate_min_rows
+        )
+        self.approximate_min_bytes = (
+            settings.profile_approximate_min_memory_mb * 1024 ** 2
+            if approximate_min_bytes is None else approximate_min_bytes
+        )
+        self.rows = 0
+        self.memory_bytes = 0
+        self.peak_chunk_bytes = 0
+        self._columns: Dict[str, _ColumnAccumulator] = {}
+
+    def _accumulator(self, name: str) -> _ColumnAccumulator:
+        return _ColumnAccumulator(
+            name, self.max_exact_uniques, self.approximate,
+            settings.profile_hll_precision, settings.profile_quantile_k,
+        )
+
+    def _maybe_approximate(self) -> None:
+        if self.approximate or not self._auto:
+            return
+        if self.rows >= self.approximate_min_rows or self.memory_bytes >= self.approximate_min_bytes:
+            self.approximate = True
+            for accumulator in self._columns.values():
+                accumulator.to_sketch()
+
+    def update(self, chunk: pd.DataFrame, memory: bool = True) -> "ProfileBuilder":
+        if not self._columns:
+            self._columns = {str(c): self._accumulator(str(c)) for c in chunk.columns}
+        names = list(self._columns)
+        if len(names) != len(chunk.columns):
+            raise ValueError("Chunk columns do not match the first chunk")
+
+        self.rows += len(chunk)
+        if memory:
+            chunk_bytes = int(chunk.memory_usage(deep=True, index=False).sum())
+            self.memory_bytes += chunk_bytes
+            self.peak_chunk_bytes = max(self.peak_chunk_bytes, chunk_bytes)
+        self._maybe_approximate()
+
+        nulls = chunk.isna().sum().to_numpy()
+        for i, name in enumerate(names):
+            accumulator = self._columns[name]
+            accumulator.merge_kind(column_kind(chunk.dtypes.iloc[i]), chunk.dtypes.iloc[i])
+            accumulator.nulls += int(nulls[i])
+
+        numeric = [i for i, name in enumerate(names) if self._columns[name].kind == NUMERIC]
+        if numeric:
+            self._update_numeric(chunk, names, numeric)
+        for i, name in enumerate(names):
+            accumulator = self._columns[name]
+            values = chunk.iloc[:, i]
+            if accumulator.kind != NUMERIC:
+                accumulator.count += len(chunk) - int(nulls[i])
+            if accumulator.hll is not None:
+                # Null counts are known, so columns without nulls are hashed as they are
+                accumulator.merge_uniques(values.to_numpy(), skipna=bool(nulls[i]))
+            else:
+                accumulator.merge_uniques(pd.unique(values.dropna()))
+        return self
+
+    def _update_numeric(self, chunk: pd.DataFrame, names: List[str], positions: List[int]) -> None:
+        values = chunk.iloc[:, positions].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+            warnings.simplefilter("ignore", RuntimeWarning)
+            minimums = np.nanmin(values, axis=0)
+            maximums = np.nanmax(values, axis=0)
+            means = np.nanmean(values, axis=0)
+            m2s = np.nansum((values - means) ** 2, axis=0)
+        for j, i in enumerate(positions):
+            accumulator = self._columns[names[i]]
+            accumulator.merge_moments(int(counts[j]), minimums[j], maximums[j], means[j], m2s[j])
+            accumulator.quantiles.update(values[:, j])
+
+    def merge(self, other: "ProfileBuilder") -> "ProfileBuilder":
+        """Fold in a builder that profiled other rows of the same columns"""
+        if not other._columns:
+            return self
+        if not self._columns:
+            self._columns = {name: self._accumulator(name) for name in other._columns}
+        if list(self._columns) != list(other._columns):
+            raise ValueError("Cannot merge profiles of different columns")
+        self.rows += other.rows
+        self.memory_bytes += other.memory_bytes
+        self.peak_chunk_bytes = max(self.peak_chunk_bytes, other.peak_chunk_bytes)
+        if other.approximate and not self.approximate:
+            self.approximate = True
+            for accumulator in self._columns.values():
+                accumulator.to_sketch()
+        for name, accumulator in self._columns.items():
+            accumulator.merge(other._columns[name])
+        self._maybe_approximate()
+        return self
+
+    def build(self) -> DatasetProfile:
+        return DatasetProfile(
+            rows=self.rows,
+            columns=[accumulator.build() for accumulator in self._columns.values()],
+            memory_bytes=self.memory_bytes,
+            peak_chunk_bytes=self.peak_chunk_bytes,
+            approximate=self.approximate,
+        )
+
+
+def profile_frame(df: pd.DataFrame, memory: bool = True, approximate: Optional[bool] = None) -> DatasetProfile:
+    """Profile an in-memory DataFrame in one pass"""
+    return ProfileBuilder(max_exact_uniques=None, approximate=approximate).update(df, memory=memory).build()
+
+
+def profile_csv(path: str, chunk_rows: int = 100_000, max_exact_uniques: Optional[int] = 100_000,
+                approximate: Optional[bool] = None, **read_csv_kwargs) -> DatasetProfile:
+    """Profile a CSV file ``chunk_rows`` rows at a time, in bounded memory"""
+    builder = ProfileBuilder(max_exact_uniques=max_exact_uniques, approximate=approximate)
+    if approximate is None and os.path.getsize(path) >= builder.approximate_min_bytes:
+        # Parsed frames are larger than the file, so a large file is approximate from the first chunk
+        builder.approximate = True
+    with pd.read_csv(path, chunksize=chunk_rows, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            builder.update(chunk)
+    return builder.build()
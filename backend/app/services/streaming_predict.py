@@ -0,0 +1,259 @@
+# app/services/streaming_predict.py
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.db import repositories
+from app.services.model_metadata import model_metadata
+from app.services.parallel_scoring import parallel_scorer
+from app.services.prediction_log import prediction_log
+from app.services.predict_service import PredictionError, PredictionService, model_store
+
+settings = get_settings()
+
+OUTPUT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# First line of the terminal record of a failed CSV stream; data lines always start with the row number
+CSV_ERROR_MARKER = "#error:"
+
+
+@dataclass
+class ScoringJob:
+    """Progress of one streamed file-scoring request"""
+    id: str
+    user_id: str
+    model_id: Any
+    source_file: Optional[str]
+    output_format: str
+    total_bytes: Optional[int] = None
+    status: str = "running"
+    rows_processed: int = 0
+    chunks: int = 0
+    bytes_read: int = 0
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "job_id": self.id,
+            "model_id": self.model_id,
+            "source_file": self.source_file,
+            "format": self.output_format,
+            "status": self.status,
+            "rows_processed": self.rows_processed,
+            "chunks": self.chunks,
+            "bytes_read": self.bytes_read,
+            "total_bytes": self.total_bytes,
+            "progress": (
+                round(min(self.bytes_read / self.total_bytes, 1.0), 4) if self.total_bytes else None
+            ),
+            "rows_per_second": round(self.rows_processed / elapsed, 1) if elapsed > 0 else None,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class ScoringProgress:
+    """In-memory progress of streamed scoring jobs; finished jobs are kept for ``retention_seconds``"""
+
+    def __init__(self, retention_seconds: int = 3600):
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, ScoringJob] = {}
+
+    def start(self, user_id: str, model_id: Any, source_file: Optional[str], output_format: str,
+              total_bytes: Optional[int] = None) -> ScoringJob:
+        self._prune()
+        job = ScoringJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            model_id=model_id,
+            source_file=source_file,
+            output_format=output_format,
+            total_bytes=total_bytes,
+        )
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str, user_id: str) -> Optional[ScoringJob]:
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def finish(self, job: ScoringJob, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+scoring_progress = ScoringProgress()
+
+
+def _chunk_frame(
+        predictions: np.ndarray,
+        probabilities: Optional[np.ndarray],
+        first_row: int
+) -> pd.DataFrame:
+    """Output rows for one chunk: input row number, prediction and optional class probabilities"""
+    frame = pd.DataFrame({
+        "row": np.arange(first_row, first_row + len(predictions)),
+        "prediction": predictions,
+    })
+    if probabilities is not None:
+        probabilities = np.asarray(probabilities)
+        if probabilities.ndim == 1:
+            probabilities = probabilities[:, None]
+        for i in range(probabilities.shape[1]):
+            frame[f"probability_{i}"] = probabilities[:, i]
+    return frame
+
+
+def _encode_chunk(frame: pd.DataFrame, output_format: str, header: bool) -> bytes:
+    if output_format == "csv":
+        return frame.to_csv(index=False, header=header).encode()
+    return (frame.to_json(orient="records", lines=True, double_precision=15).rstrip("\n") + "\n").encode()
+
+
+async def open_scoring_stream(
+        model_id: Any,
+        user_id: str,
+        source: BinaryIO,
+        source_file: Optional[str] = None,
+        total_bytes: Optional[int] = None,
+        output_format: str = "ndjson",
+        chunk_rows: Optional[int] = None,
+        return_probabilities: bool = False,
+        save_summary: bool = True,
+) -> Tuple[ScoringJob, AsyncIterator[bytes]]:
+    """
+    Prepare streamed scoring of a CSV file
+
+    The model is looked up and loaded before anything is streamed, so
+    missing models or bad parameters still fail the request normally.
+
+    Args:
+        model_id: ID of model to use
+        user_id: User identifier
+        source: Binary file object positioned at the start of the CSV
+        source_file: Original filename, recorded in the summary
+        total_bytes: Size of the upload, for progress reporting
+        output_format: "ndjson" or "csv"
+        chunk_rows: Rows parsed, transformed and predicted per chunk
+        return_probabilities: Add class probability columns
+        save_summary: Record a prediction summary row when done
+
+    Returns:
+        Tuple of (progress job, async iterator of encoded output chunks)
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise PredictionError(f"Unsupported output format '{output_format}'. Use one of {list(OUTPUT_FORMATS)}")
+    chunk_rows = chunk_rows or settings.prediction_stream_chunk_rows
+    if chunk_rows <= 0:
+        raise PredictionError("chunk_rows must be positive")
+
+    model_data = await model_metadata.get(model_id, user_id)
+    if not model_data:
+        raise PredictionError("Model not found or access denied")
+    if model_data.get('status') not in ['trained', 'evaluated']:
+        raise PredictionError(f"Model not ready for predictions. Status: {model_data.get('status')}")
+
+    version = model_data.get('updated_at') or model_data.get('created_at')
+    model_bundle = await model_store.load_model(model_data['model_url'], model_id, version=version)
+    predictor = PredictionService(model_bundle)
+    target_col = model_data.get('target_column')
+    artifact_path = await model_store.local_artifact(model_data['model_url'], version)
+
+    job = scoring_progress.start(user_id, model_id, source_file, output_format, total_bytes)
+    return job, _score_chunks(job, predictor, artifact_path, source, target_col, output_format, chunk_rows,
+                              return_probabilities, save_summary)
+
+
+async def _score_chunks(
+        job: ScoringJob,
+        predictor: PredictionService,
+        artifact_path: Optional[str],
+        source: BinaryIO,
+        target_col: Optional[str],
+        output_format: str,
+        chunk_rows: int,
+        return_probabilities: bool,
+        save_summary: bool,
+) -> AsyncIterator[bytes]:
+    # Only one parsed chunk and its encoded output are alive at any time
+    try:
+        reader = await asyncio.to_thread(pd.read_csv, source, chunksize=chunk_rows)
+        with reader:
+            while True:
+                chunk = await asyncio.to_thread(next, reader, None)
+                if chunk is None:
+                    break
+                if target_col and target_col in chunk.columns:
+                    chunk = chunk.drop(columns=[target_col])
+
+                # Large chunks are partitioned across the scoring workers
+                predictions, probabilities, _ = await parallel_scorer.score(
+                    predictor, chunk, artifact_path, return_probabilities
+                )
+                frame = _chunk_frame(predictions, probabilities, job.rows_processed)
+                payload = await asyncio.to_thread(_encode_chunk, frame, output_format, job.chunks == 0)
+                job.rows_processed += len(chunk)
+                job.chunks += 1
+                job.bytes_read = source.tell()
+                yield payload
+
+        if job.rows_processed == 0:
+            raise PredictionError("Uploaded file is empty")
+
+        scoring_progress.finish(job, "succeeded")
+        if job.total_bytes:
+            job.bytes_read = job.total_bytes
+
+        if save_summary:
+            try:
+                await prediction_log.record({
+                    "model_id": job.model_id,
+                    "user_id": job.user_id,
+                    "n_samples": job.rows_processed,
+                    "predicted_at": datetime.utcnow().isoformat(),
+                    "source_file": job.source_file,
+                }, model_id=job.model_id)
+            except Exception as e:
+                print(f"[Prediction] Could not save summary for scoring job {job.id}: {e}")
+
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client went away mid-stream
+        scoring_progress.finish(job, "cancelled")
+        raise
+    except Exception as e:
+        scoring_progress.finish(job, "failed", str(e))
+        print(f"[Prediction] Streamed scoring {job.id} failed after {job.rows_processed} rows: {e}")
+        # Headers are already sent; clients get a final error record instead of a status code
+        if output_format == "ndjson":
+            yield (json.dumps({"error": str(e), "rows_processed": job.rows_processed}) + "\n").encode()
+        else:
+            # A comment line no data row can produce; pandas skips it with comment="#"
+            message = " ".join(str(e).split())
+            yield f"{CSV_ERROR_MARKER} {message} (rows_processed={job.rows_processed})\n".encode()
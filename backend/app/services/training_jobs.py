@@ -0,0 +1,465 @@
+# app/services/training_jobs.py
+import asyncio
+import fcntl
+import multiprocessing
+import glob
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import orjson
+
+from app.core.config import get_settings
+from app.core.resources import core_budget
+from app.utils.serialization import dumps
+
+settings = get_settings()
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+@dataclass
+class TrainingJob:
+    """A single training run submitted through the queue"""
+    id: str
+    user_id: str
+    dataset_id: str
+    params: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    stage: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    resources: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "dataset_id": self.dataset_id,
+            "status": self.status.value,
+            "stage": self.stage,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "resources": self.resources,
+            "model_id": (self.result or {}).get("id"),
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """Full state of the job as stored in the shared job store"""
+        record = {f.name: getattr(self, f.name) for f in fields(self)}
+        record["status"] = self.status.value
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "TrainingJob":
+        return cls(**{**record, "status": JobStatus(record["status"])})
+
+
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def _run_training_job(kwargs: Dict[str, Any], conn) -> None:
+    """Entry point of a training worker process: runs the full pipeline and reports back."""
+    # Size native thread pools to the core lease before numpy/sklearn are imported
+    n_jobs = kwargs.get("n_jobs") or 1
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(n_jobs)
+
+    from threadpoolctl import threadpool_limits
+    from app.services.training_service import train_model
+
+    def on_progress(stage: str) -> None:
+        conn.send(("stage", stage))
+
+    try:
+        with threadpool_limits(limits=n_jobs):
+            result = asyncio.run(train_model(**kwargs, on_progress=on_progress))
+        conn.send(("result", result))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class TrainingJobStore:
+    """
+    Training job records shared by every API worker process on the host.
+
+    Each job is one JSON file in ``directory``, replaced atomically on every
+    write, so any worker can answer status, result and cancel requests for a
+    job submitted or run by another. Read-modify-write updates hold an
+    exclusive lock on ``directory/.lock`` so concurrent updates never
+    interleave.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock_path = os.path.join(directory, ".lock")
+
+    def open(self) -> None:
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    @contextmanager
+    def _locked(self):
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, job: TrainingJob) -> None:
+        tmp_path = f"{self._path(job.id)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(dumps(job.to_record()))
+        os.replace(tmp_path, self._path(job.id))
+
+    def _read(self, path: str) -> Optional[TrainingJob]:
+        try:
+            with open(path, "rb") as f:
+                return TrainingJob.from_record(orjson.loads(f.read()))
+        except FileNotFoundError:
+            return None
+
+    def save(self, job: TrainingJob) -> None:
+        with self._locked():
+            self._write(job)
+
+    def load(self, job_id: str) -> Optional[TrainingJob]:
+        # Job ids come from request paths; anything but our own ids never touches the filesystem
+        if not _JOB_ID.fullmatch(job_id):
+            return None
+        return self._read(self._path(job_id))
+
+    def list(self) -> List[TrainingJob]:
+        jobs = (self._read(path) for path in glob.glob(os.path.join(self.directory, "*.json")))
+        return [job for job in jobs if job is not None]
+
+    def update(self, job_id: str, unless_finished: bool = True, **changes: Any) -> Optional[TrainingJob]:
+        """
+        Apply ``changes`` to a stored job and return the job as stored afterwards.
+
+        With ``unless_finished`` a job that already succeeded, failed or was
+        cancelled is left untouched, so late progress from a worker never
+        overwrites a cancellation.
+        """
+        with self._locked():
+            job = self.load(job_id)
+            if job is None or (unless_finished and job.status in FINISHED_STATUSES):
+                return job
+            for name, value in changes.items():
+                setattr(job, name, value)
+            self._write(job)
+            return job
+
+    def delete(self, job_id: str) -> None:
+        try:
+            os.unlink(self._path(job_id))
+        except FileNotFoundError:
+            pass
+
+
+class TrainingJobManager:
+    """
+    Queue of training jobs executed by a fixed number of worker slots.
+
+    Job records live in a ``TrainingJobStore`` shared by all API worker
+    processes: every process serves submit, status, result and cancel
+    requests from it. Only the process holding the exclusive lock on
+    ``directory/owner.lock`` runs the worker pool; the others retry the lock
+    every ``poll_interval`` seconds, so a new owner takes over when the
+    current one exits. The owner polls the store for jobs submitted by other
+    processes and for cancellations of the jobs it is running.
+
+    Each job runs ``train_model`` (preprocess → fit/AutoML → upload) in its
+    own spawned process, so fits never hold the API's event loop or GIL and a
+    running job can be cancelled by terminating its process. Before starting,
+    a job leases cores from the process-wide ``core_budget`` and the worker
+    process sizes all of its parallelism to that lease. Finished jobs are
+    kept for ``training_job_retention_seconds``.
+    """
+
+    def __init__(self, directory: str, max_workers: int = 2, retention_seconds: int = 3600,
+                 poll_interval: float = 1.0, target: Callable = _run_training_job):
+        self.store = TrainingJobStore(directory)
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self.poll_interval = poll_interval
+        self._target = target
+        self._owner_lock_path = os.path.join(directory, "owner.lock")
+        self._owner_file = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._enqueued: Set[str] = set()
+        self._processes: Dict[str, Any] = {}
+        self._workers: List[asyncio.Task] = []
+        self._poller: Optional[asyncio.Task] = None
+        self._mp = multiprocessing.get_context("spawn")
+
+    @property
+    def is_owner(self) -> bool:
+        return self._owner_file is not None
+
+    async def start(self) -> None:
+        if self._poller is not None:
+            return
+        self.store.open()
+        self._try_own()
+        self._poller = asyncio.create_task(self._poll_loop(), name="training-job-poller")
+
+    async def shutdown(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+        for job_id in list(self._processes):
+            self._terminate(job_id)
+            self.store.update(
+                job_id, status=JobStatus.FAILED, error="Training worker shut down", finished_at=time.time()
+            )
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._enqueued.clear()
+        if self._owner_file is not None:
+            fcntl.flock(self._owner_file, fcntl.LOCK_UN)
+            self._owner_file.close()
+            self._owner_file = None
+
+    def _try_own(self) -> bool:
+        """Take the owner lock if it is free and start the worker pool"""
+        if self._owner_file is not None:
+            return True
+        owner_file = open(self._owner_lock_path, "a")
+        try:
+            fcntl.flock(owner_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            owner_file.close()
+            return False
+
+        self._owner_file = owner_file
+        self._queue = asyncio.Queue()
+        self._recover()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(), name=f"training-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+        print(f"[Training] Process {os.getpid()} runs the training queue")
+        return True
+
+    def _recover(self) -> None:
+        # The lock was free, so no live process is running the jobs still marked as running
+        for job in sorted(self.store.list(), key=lambda j: j.created_at):
+            if job.status == JobStatus.RUNNING:
+                self.store.update(
+                    job.id,
+                    status=JobStatus.FAILED,
+                    error="Training worker exited before the job finished",
+                    finished_at=time.time(),
+                )
+            elif job.status == JobStatus.QUEUED:
+                self._enqueue(job.id)
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if self._try_own():
+                    self._sync()
+            except Exception as e:
+                print(f"[Training] Job store sync failed: {e}")
+
+    def _sync(self) -> None:
+        """Pick up jobs queued by other processes and stop jobs cancelled there"""
+        jobs = self.store.list()
+        for job in sorted(jobs, key=lambda j: j.created_at):
+            if job.status == JobStatus.QUEUED:
+                self._enqueue(job.id)
+            elif job.status == JobStatus.CANCELLED:
+                self._terminate(job.id)
+        self._prune(jobs)
+
+    def _enqueue(self, job_id: str) -> None:
+        if job_id not in self._enqueued:
+            self._enqueued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    def _terminate(self, job_id: str) -> None:
+        process = self._processes.get(job_id)
+        if process is not None and process.is_alive():
+            process.terminate()
+
+    def submit(self, user_id: str, dataset_id: str, params: Dict[str, Any]) -> TrainingJob:
+        if self._poller is None:
+            raise RuntimeError("Training job manager is not running")
+        job = TrainingJob(id=uuid.uuid4().hex, user_id=user_id, dataset_id=dataset_id, params=params)
+        self.store.save(job)
+        # Other processes leave the job to the owner's next poll
+        if self.is_owner:
+            self._enqueue(job.id)
+        return job
+
+    def get(self, job_id: str, user_id: str) -> Optional[TrainingJob]:
+        job = self.store.load(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def list(self, user_id: str) -> List[TrainingJob]:
+        return [job for job in self.store.list() if job.user_id == user_id]
+
+    def cancel(self, job_id: str, user_id: str) -> Optional[TrainingJob]:
+        job = self.get(job_id, user_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+
+        # Queued jobs are skipped by the worker; running ones lose their process,
+        # here if this process owns it, otherwise on the owner's next poll
+        job = self.store.update(job_id, status=JobStatus.CANCELLED, finished_at=time.time())
+        self._terminate(job_id)
+        return job
+
+    def queue_position(self, job: TrainingJob) -> Optional[int]:
+        if job.status != JobStatus.QUEUED:
+            return None
+        queued = sorted(
+            (j for j in self.store.list() if j.status == JobStatus.QUEUED),
+            key=lambda j: j.created_at,
+        )
+        ids = [j.id for j in queued]
+        return ids.index(job.id) if job.id in ids else None
+
+    def _prune(self, jobs: List[TrainingJob]) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for job in jobs:
+            if job.status in FINISHED_STATUSES and (job.finished_at or 0) < cutoff:
+                self.store.delete(job.id)
+
+    async def _worker_loop(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.store.load(job_id)
+                if job is None or job.status != JobStatus.QUEUED:
+                    continue
+                await self._run(job)
+            except Exception as e:
+                self.store.update(
+                    job_id, status=JobStatus.FAILED, error=f"Worker error: {str(e)}", finished_at=time.time()
+                )
+            finally:
+                self._enqueued.discard(job_id)
+                self._queue.task_done()
+
+    async def _run(self, job: TrainingJob) -> None:
+        self.store.update(job.id, stage="waiting_for_cores")
+        lease = await core_budget.acquire()
+        try:
+            await self._run_with_lease(job, lease)
+        finally:
+            await core_budget.release(lease)
+
+    async def _run_with_lease(self, job: TrainingJob, lease) -> None:
+        job = self.store.update(
+            job.id, status=JobStatus.RUNNING, started_at=time.time(), resources=lease.to_dict()
+        )
+        # Cancelled while waiting for cores
+        if job is None or job.status != JobStatus.RUNNING:
+            return
+
+        parent_conn, child_conn = self._mp.Pipe(duplex=False)
+        kwargs = {
+            "dataset_id": job.dataset_id,
+            "user_id": job.user_id,
+            **job.params,
+            "n_jobs": lease.cores,
+            "resource_usage": lease.to_dict(),
+        }
+        process = self._mp.Process(
+            target=self._target, args=(kwargs, child_conn), name=f"training-{job.id}", daemon=True
+        )
+        self._processes[job.id] = process
+        try:
+            process.start()
+            child_conn.close()
+            outcome = await asyncio.to_thread(self._collect, job.id, process, parent_conn)
+            await asyncio.to_thread(process.join)
+        finally:
+            self._processes.pop(job.id, None)
+
+        # A cancelled job stays cancelled whatever its process reported
+        kind, payload = outcome
+        if kind == "result":
+            job = self.store.update(job.id, status=JobStatus.SUCCEEDED, result=payload, finished_at=time.time())
+            if job is not None and job.status == JobStatus.SUCCEEDED:
+                await self._on_model_trained(job.user_id, payload)
+        else:
+            self.store.update(job.id, status=JobStatus.FAILED, error=payload, finished_at=time.time())
+
+    @staticmethod
+    async def _on_model_trained(user_id: str, result: Dict[str, Any]) -> None:
+        # Imported lazily: worker processes must not load numpy before their thread limits are set
+        from app.core.model_events import MODEL_CREATED
+        from app.services.predict_service import announce_model_event
+
+        if result.get("id") is None:
+            return
+        try:
+            await announce_model_event(
+                MODEL_CREATED,
+                result["id"],
+                user_id=user_id,
+                model_url=result.get("model_url"),
+                version=result.get("version"),
+            )
+        except Exception as e:
+            print(f"[Training] Could not announce model {result['id']}: {e}")
+
+    def _collect(self, job_id: str, process, conn):
+        """Relay stage updates to the store until the worker sends its outcome or dies."""
+        try:
+            while True:
+                try:
+                    kind, payload = conn.recv()
+                except EOFError:
+                    return "error", f"Training process exited unexpectedly (exit code {process.exitcode})"
+                if kind == "stage":
+                    self.store.update(job_id, stage=payload)
+                else:
+                    return kind, payload
+        finally:
+            conn.close()
+
+
+job_manager = TrainingJobManager(
+    settings.training_jobs_dir or os.path.join(settings.artifact_cache_dir, "training-jobs"),
+    max_workers=settings.training_workers,
+    retention_seconds=settings.training_job_retention_seconds,
+    poll_interval=settings.training_job_poll_seconds,
+)
@@ -1,9 +1,10 @@
 # app/services/training_service.py
 import numpy as np
 import pandas as pd
-import joblib, os, io, time, tempfile
+import joblib, os, io, time, tempfile, uuid
+import asyncio
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 
 from sklearn.utils.validation import check_is_fitted
 from sklearn.exceptions import NotFittedError
@@ -13,10 +14,12 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import PolynomialFeatures, LabelEncoder
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 
-from app.db.supabase_client import supabase
+from app.db import repositories
 from app.services.data_preprocessing import preprocess_dataset, DataPreprocessingError
+from app.services.dataset_columnar import ColumnarDatasetError, load_dataset
 from app.core.model_registry import get_model
 from app.core.model_selector import AutoModelSelector
+from app.services.compiled_model import compile_model
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 warnings.filterwarnings("ignore", category=RuntimeWarning)
@@ -30,10 +33,11 @@ class ModelTrainingError(Exception):
 class ModelTrainer:
     """Encapsulates model initialization, training, and metrics computation."""
 
-    def __init__(self, model=None, model_type=None, problem_type=None):
+    def __init__(self, model=None, model_type=None, problem_type=None, n_jobs: int = 1):
         self.model = model
         self.model_type = model_type
         self.problem_type = problem_type
+        self.n_jobs = n_jobs
         self.label_encoder = None
 
     def initialize_model(
@@ -49,7 +53,11 @@ class ModelTrainer:
         self.problem_type = problem_type
 
         ModelClass = get_model(problem_type, model_type)
-        params = model_params or self._get_default_params(model_type)
+        params = dict(model_params or self._get_default_params(model_type))
+
+        # Parallelism comes from the core lease, never from defaults or user params
+        if "n_jobs" in ModelClass().get_params():
+            params["n_jobs"] = self.n_jobs
         base_model = ModelClass(**params)
 
         if use_polynomial and problem_type == "regression":
@@ -65,7 +73,7 @@ class ModelTrainer:
     def _get_default_params(self, model_type: str):
         """Default hyperparameters for common models."""
         defaults = {
-            "random_forest": {"n_estimators": 100, "max_depth": 10, "random_state": 42, "n_jobs": -1},
+            "random_forest": {"n_estimators": 100, "max_depth": 10, "random_state": 42},
             "ridge": {"alpha": 1.0, "random_state": 42},
             "lasso": {"alpha": 1.0, "random_state": 42},
             "svr": {"kernel": "rbf", "C": 1.0},
@@ -172,7 +180,7 @@ class ModelTrainer:
         return {
             "training_time": train_time,
             "metrics": metrics,
-            "predictions": y_pred.tolist()[:100],
+            "predictions": y_pred[:100],
             "label_mapping": (
                 {str(label): int(idx) for idx, label in enumerate(self.label_encoder.classes_)}
                 if self.label_encoder else None
@@ -253,23 +261,26 @@ class ModelTrainer:
             return details
 
         if hasattr(model, "coef_"):
-            details["coefficients"] = model.coef_.ravel().tolist()[:100]
+            details["coefficients"] = model.coef_.ravel()[:100]
         if hasattr(model, "intercept_"):
             details["intercept"] = float(np.ravel(model.intercept_)[0])
         if hasattr(model, "feature_importances_"):
-            details["feature_importances"] = model.feature_importances_.tolist()[:100]
+            details["feature_importances"] = model.feature_importances_[:100]
 
         return details
 
 
-    def save_model(self, path, preprocessor=None):
+    def save_model(self, path, preprocessor=None, compiled_preprocessor=None, compiled_model=None):
         bundle = {
             "model": self.model,
+            "compiled_model": compiled_model,
             "preprocessor": preprocessor,
+            "compiled_preprocessor": compiled_preprocessor,
             "label_encoder": self.label_encoder,
             "model_type": self.model_type,
             "problem_type": self.problem_type,
         }
+        # Uncompressed, so serving workers can memory-map the arrays instead of copying them
         joblib.dump(bundle, path)
 
 
@@ -286,14 +297,30 @@ async def train_model(
         use_polynomial: bool = False,
         polynomial_degree: int = 2,
         use_target_encoder: bool = False,
-        model_params: Optional[Dict[str, Any]] = None
+        model_params: Optional[Dict[str, Any]] = None,
+        n_jobs: int = 1,
+        resource_usage: Optional[Dict[str, Any]] = None,
+        on_progress: Optional[Callable[[str], None]] = None
 ):
-    """End-to-end training service."""
+    """
+    End-to-end training service.
+
+    Args:
+        n_jobs: Cores this training may use (estimators and AutoML trials)
+        resource_usage: Core lease details recorded in the training metadata
+        on_progress: Optional callback receiving the current pipeline stage
+            ('preprocessing', 'initializing', 'training', 'saving')
+    """
+    def report(stage: str, message: str):
+        print(f"[Training] {message}")
+        if on_progress:
+            on_progress(stage)
+
     try:
         print(f"[Training] Starting training for dataset {dataset_id}")
 
         # Step 1: preprocess data
-        print("[Training] Step 1/4: Preprocessing data...")
+        report("preprocessing", "Step 1/4: Preprocessing data...")
         preprocess_result = await preprocess_dataset(
             dataset_id=dataset_id,
             user_id=user_id,
@@ -325,13 +352,13 @@ async def train_model(
                 print(f"[Training] Proceeding with user-specified: {problem_type}")
 
         # Initialize trainer with problem type
-        trainer = ModelTrainer(problem_type=problem_type)
+        trainer = ModelTrainer(problem_type=problem_type, n_jobs=n_jobs)
 
         # Step 2: Model selection or initialization
-        print("[Training] Step 2/4: Initializing model...")
+        report("initializing", "Step 2/4: Initializing model...")
 
         if model_type == "auto":
-            # import time
+            report("training", "Step 3/4: Running AutoML model selection...")
             start_time = time.time()
 
             # Encode labels BEFORE passing to AutoML
@@ -349,7 +376,7 @@ async def train_model(
             selector = AutoModelSelector(
                 task=flaml_task,
                 time_budget=60,
-                n_jobs=-1,
+                n_jobs=n_jobs,
                 estimator_list=["lgbm", "xgboost", "rf"],
                 metric="r2" if flaml_task == "regression" else "accuracy",
                 verbose=1
@@ -378,7 +405,7 @@ async def train_model(
                 results = {
                     "training_time": training_time,
                     "metrics": metrics,
-                    "predictions": y_pred.tolist()[:100],
+                    "predictions": y_pred[:100],
                     "label_mapping": (
                         {str(label): int(idx) for idx, label in enumerate(trainer.label_encoder.classes_)}
                         if trainer.label_encoder else None
@@ -397,20 +424,30 @@ async def train_model(
                 model_params=model_params,
             )
 
-            print("[Training] Step 3/4: Training model...")
+            report("training", "Step 3/4: Training model...")
             results = trainer.train(X_train, y_train, X_test, y_test)
 
         # Step 4: save model
-        print("[Training] Step 4/4: Saving model...")
-        tmp_path = os.path.join(tempfile.gettempdir(), f"model_{dataset_id}.pkl")
-        trainer.save_model(tmp_path, preprocessor)
+        report("saving", "Step 4/4: Saving model...")
 
-        with open(tmp_path, "rb") as f:
-            model_bytes = f.read()
+        # Flattened trees / single GEMV for serving, proven equivalent on the holdout set
+        compiled_model = compile_model(trainer.model, X_test)
+
+        # Concurrent jobs on the same dataset must not share a temp file or storage key
+        fd, tmp_path = tempfile.mkstemp(prefix=f"model_{dataset_id}_", suffix=".pkl")
+        os.close(fd)
+        try:
+            trainer.save_model(
+                tmp_path, preprocessor, preprocess_result.get("compiled_preprocessor"), compiled_model
+            )
+            with open(tmp_path, "rb") as f:
+                model_bytes = f.read()
+        finally:
+            os.remove(tmp_path)
 
-        filename = f"{user_id}/models/model_{dataset_id}_{int(time.time())}.pkl"
-        supabase.storage.from_("models").upload(filename, model_bytes, {"upsert": "true"})
-        model_url = supabase.storage.from_("models").get_public_url(filename)
+        filename = f"{user_id}/models/model_{dataset_id}_{uuid.uuid4().hex}.pkl"
+        await repositories.model_files.upload(filename, model_bytes)
+        model_url = repositories.model_files.public_url(filename)
 
         # Store metadata
         db_data = {
@@ -422,11 +459,18 @@ async def train_model(
             "target_column": target_col,
             "metrics": results["metrics"],
             "training_time": results["training_time"],
+            "training_metadata": {
+                "resources": {**(resource_usage or {}), "n_jobs": n_jobs},
+                "compiled": {
+                    "preprocessor": preprocess_result.get("compiled_preprocessor") is not None,
+                    "model": compiled_model.kind if compiled_model is not None else None,
+                },
+            },
             "created_at": datetime.utcnow().isoformat(),
         }
 
-        db_res = supabase.table("models").insert(db_data).execute()
-        model_id = db_res.data[0]["id"]
+        inserted = await repositories.models.insert(db_data)
+        model_id = inserted[0]["id"]
 
         print(f"[Training] Complete! Model ID: {model_id}")
 
@@ -434,7 +478,11 @@ async def train_model(
             "id": model_id,
             "message": "Model trained successfully",
             **results,
-            "preprocessing_metadata": metadata
+            "preprocessing_metadata": metadata,
+            "resources": db_data["training_metadata"]["resources"],
+            # Artifact identity as stored, used by serving workers to prefetch the bundle
+            "model_url": inserted[0].get("model_url", model_url),
+            "version": inserted[0].get("updated_at") or inserted[0].get("created_at") or db_data["created_at"],
         }
 
     except DataPreprocessingError as e:
@@ -444,6 +492,27 @@ async def train_model(
         traceback.print_exc()
         raise ModelTrainingError(f"Training failed: {str(e)}")
 
+async def delete_model(model_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Delete a model row and its stored artifact
+
+    Returns:
+        The deleted model's metadata, or None if it does not exist
+    """
+    model = await repositories.models.get(id=model_id, user_id=user_id)
+    if not model:
+        return None
+
+    if model.get("model_url"):
+        try:
+            await repositories.model_files.remove([repositories.model_files.path_from_url(model["model_url"])])
+        except Exception as e:
+            print(f"[Training] Could not remove artifact of model {model_id}: {e}")
+
+    await repositories.models.delete(id=model_id, user_id=user_id)
+    return model
+
+
 async def analyze_target_column(
             dataset_id: str,
             user_id: str,
@@ -455,16 +524,14 @@ async def analyze_target_column(
         """
         try:
             # Fetch dataset
-            dataset = supabase.table("datasets").select("*").eq("id", dataset_id).execute()
-            if not dataset.data:
+            dataset = await repositories.datasets.get("id, file_url, uploaded_at, metadata", id=dataset_id, user_id=user_id)
+            if not dataset:
                 raise ValueError("Dataset not found")
 
-            # Download and load CSV
-            file_url = dataset.data[0]["file_url"]
-            response = supabase.storage.from_("datasets").download(file_url.split("/datasets/")[-1])
-            df = pd.read_csv(io.BytesIO(response))
-
-            if target_col not in df.columns:
+            # Load only the target column
+            try:
+                df, load_report = await load_dataset(dataset, columns=[target_col])
+            except ColumnarDatasetError:
                 raise ValueError(f"Target column '{target_col}' not found in dataset")
 
             y = df[target_col].dropna()
@@ -529,6 +596,7 @@ async def analyze_target_column(
                     "sample_values": sample_values,
                 },
                 "warnings": warnings,
+                "load": load_report,
                 "recommendations": {
                     "regression": detected_type == "regression",
                     "classification": detected_type == "classification",
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU mapping with a per-entry expiry time.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is reached,
+    and are dropped lazily on access once their expiry has passed. ``on_evict``
+    is called (outside the lock) with the key of every entry dropped either way.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 on_evict: Optional[Callable[[Hashable], None]] = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            expired = expires_at is not None and expires_at <= self._clock()
+            if expired:
+                del self._data[key]
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if expired:
+            self._evicted([key])
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        """
+        Store a value. ``expires_at`` is an absolute time on this cache's clock
+        and wins over ``ttl``; with neither, the cache-wide ttl applies.
+        """
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = self._clock() + ttl if ttl is not None else None
+
+        evicted = []
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[0])
+                self.evictions += 1
+        self._evicted(evicted)
+
+    def _evicted(self, keys) -> None:
+        if self._on_evict is not None:
+            for key in keys:
+                self._on_evict(key)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not handle natively: non-numeric arrays, NumPy scalars, pandas values"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize to JSON bytes, writing NumPy arrays and scalars directly.
+
+    Numeric arrays are encoded from their buffers without ``tolist()``;
+    NaN and infinity become ``null``.
+    """
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+
+class NumpyJSONResponse(JSONResponse):
+    """JSON response that serializes NumPy arrays without converting them to lists first"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
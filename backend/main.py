@@ -1,4 +1,6 @@
 # main-py - root file
+from contextlib import asynccontextmanager
+
 from fastapi.middleware.cors import CORSMiddleware
 
 # from app.core import auth as auth_routes
@@ -9,13 +11,37 @@ from app.api.routes import history as history_routes
 # from app.api.routes import evaluate as evalaute_routes
 from app.core.cors import get_cors_kwargs
 from app.api.errors import register_exception_handlers
+from app.db.database import http as supabase_http
+from app.services.training_jobs import job_manager
+from app.services.parallel_scoring import parallel_scorer
+from app.core.model_events import model_events
+from app.services.prediction_log import prediction_log
+from app.core.config import get_settings
 
 from fastapi import FastAPI
 from app.api.routes import test_supabase
 
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_manager.start()
+    await model_events.start()
+    if settings.prediction_log_write_behind:
+        await prediction_log.start()
+    yield
+    await model_events.close()
+    # Flush buffered prediction rows before the connection pool goes away
+    await prediction_log.close()
+    await job_manager.shutdown()
+    parallel_scorer.shutdown()
+    # Drain the shared Supabase connection pool
+    await supabase_http.aclose()
+
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="RegressLab API", version="0.1.0")
+    app = FastAPI(title="RegressLab API", version="0.1.0", lifespan=lifespan)
 
     # CORS
     app.add_middleware(CORSMiddleware, **get_cors_kwargs())
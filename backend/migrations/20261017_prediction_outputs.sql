@@ -0,0 +1,21 @@
+-- Saved prediction outputs in object storage (app/services/prediction_outputs.py)
+--
+-- Rows of large or file predictions keep a pointer to an NPZ block file in the
+-- `predictions` storage bucket instead of inline `predictions`/`probabilities`.
+-- Safe to run more than once.
+
+alter table public.predictions
+    add column if not exists source_file   text,
+    add column if not exists output_url    text,
+    add column if not exists output_format text,
+    add column if not exists output_index  jsonb,
+    add column if not exists output_bytes  bigint,
+    add column if not exists summary       jsonb;
+
+-- Pointer rows carry no inline outputs
+alter table public.predictions alter column predictions drop not null;
+
+-- Objects are read with the service role key, so the bucket stays private
+insert into storage.buckets (id, name, public)
+values ('predictions', 'predictions', false)
+on conflict (id) do nothing;
@@ -0,0 +1,76 @@
+"""
+Compare loading a dataset from its CSV and from its columnar copy, in-process.
+
+Timings cover turning downloaded bytes into a typed DataFrame; bytes are
+what the loader would download from storage. Run from backend/:
+
+    python -m scripts.benchmark_dataset_loading --rows 200000
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_columnar import assemble_frame, plan_reads, write_columnar
+from app.services.profiling import CATEGORICAL, profile_csv
+
+
+def build_csv(path: str, rows: int, n_numeric: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.normal(size=(rows, n_numeric)), columns=[f"x{i}" for i in range(n_numeric)])
+    frame["city"] = rng.choice(["paris", "rome", "oslo", "lima"], size=rows)
+    frame["target"] = rng.integers(0, 2, size=rows)
+    frame.to_csv(path, index=False)
+
+
+def timed(fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--numeric", type=int, default=20)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "data.csv")
+        columnar_path = os.path.join(tmp, "data.npzc")
+        build_csv(csv_path, args.rows, args.numeric)
+        profile = profile_csv(csv_path, args.chunk_rows)
+        index = write_columnar(csv_path, columnar_path, args.chunk_rows, profile.of_kind(CATEGORICAL))
+        with open(csv_path, "rb") as f:
+            csv_bytes = f.read()
+        with open(columnar_path, "rb") as f:
+            columnar_bytes = f.read()
+
+        def columnar(columns=None):
+            selected, ranges = plan_reads(index, columns)
+            parts = {(first, last): columnar_bytes[first:last + 1] for first, last in ranges}
+            return assemble_frame(selected, parts), sum(last - first + 1 for first, last in ranges)
+
+        cases = [
+            ("csv, all columns", lambda: (pd.read_csv(io.BytesIO(csv_bytes)), len(csv_bytes))),
+            ("columnar, all columns", lambda: columnar()),
+            ("csv, target only", lambda: (pd.read_csv(io.BytesIO(csv_bytes), usecols=["target"]), len(csv_bytes))),
+            ("columnar, target only", lambda: columnar(["target"])),
+        ]
+        print(f"{args.rows} rows x {args.numeric + 2} columns")
+        print(f"{'load':<24}{'ms':>10}{'MB read':>10}")
+        for name, fn in cases:
+            seconds, (_, n_bytes) = timed(fn)
+            print(f"{name:<24}{seconds * 1000:>10.1f}{n_bytes / 1024 ** 2:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
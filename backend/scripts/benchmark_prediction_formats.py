@@ -0,0 +1,111 @@
+"""
+Compare prediction input/output formats end to end, in-process.
+
+For each format the timing covers decoding the request body, preprocessing,
+predicting and encoding the response, i.e. everything the API does per
+request except the network. Run from backend/:
+
+    python -m scripts.benchmark_prediction_formats --rows 10000
+"""
+import argparse
+import io
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from app.services.compiled_preprocessor import compile_preprocessor
+from app.services.input_formats import decode_body, encode_body
+from app.services.predict_service import PredictionService
+from app.utils.serialization import dumps
+
+
+def build_predictor(n_numeric: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n_train = 2000
+    frame = pd.DataFrame(rng.normal(size=(n_train, n_numeric)), columns=[f"x{i}" for i in range(n_numeric)])
+    frame["city"] = rng.choice(["paris", "rome", "oslo", "lima"], size=n_train)
+    target = (frame["x0"] + (frame["city"] == "rome") > 0.5).astype(int)
+
+    numeric = [c for c in frame.columns if c != "city"]
+    preprocessor = ColumnTransformer([
+        ("num", Pipeline([("impute", SimpleImputer()), ("scale", StandardScaler())]), numeric),
+        ("cat", Pipeline([("impute", SimpleImputer(strategy="constant", fill_value="missing")),
+                          ("onehot", OneHotEncoder(handle_unknown="ignore"))]), ["city"]),
+    ])
+    X = preprocessor.fit_transform(frame)
+    model = LogisticRegression(max_iter=500).fit(X, target)
+    bundle = {
+        "model": model,
+        "preprocessor": preprocessor,
+        "compiled_preprocessor": compile_preprocessor(preprocessor, frame.head(256)),
+        "problem_type": "classification",
+        "model_type": "logistic_regression",
+    }
+    return PredictionService(bundle), frame
+
+
+def request_bodies(frame: pd.DataFrame):
+    bodies = {
+        "json rows": json.dumps(frame.to_dict(orient="records")).encode(),
+        "json columns": json.dumps(frame.to_dict(orient="list")).encode(),
+    }
+    records = frame.to_records(index=False)
+    records = records.astype([(name, "U8" if records.dtype[name] == object else records.dtype[name])
+                              for name in records.dtype.names])
+    buffer = io.BytesIO()
+    np.save(buffer, records)
+    bodies["npy"] = buffer.getvalue()
+    try:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        bodies["arrow"] = sink.getvalue().to_pybytes()
+    except ImportError:
+        pass
+    return bodies
+
+
+def score(predictor: PredictionService, name: str, body: bytes) -> bytes:
+    if name.startswith("json"):
+        predictions, probabilities = predictor.predict_arrays(predictor.to_frame(json.loads(body)), True)
+        return dumps(predictor.format_result(predictions, probabilities))
+    predictions, probabilities = predictor.predict_arrays(decode_body(body, name), True)
+    return encode_body(name, predictions, probabilities)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    predictor, frame = build_predictor(args.features)
+    sample = frame.sample(args.rows, replace=True, random_state=1).reset_index(drop=True)
+    bodies = request_bodies(sample)
+
+    print(f"{args.rows} rows x {args.features + 1} columns, best of {args.repeat}")
+    print(f"{'format':<14}{'request':>12}{'response':>12}{'ms':>10}{'rows/s':>14}")
+    for name, body in bodies.items():
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            response = score(predictor, name, body)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        print(f"{name:<14}{len(body):>12,}{len(response):>12,}{best * 1000:>10.1f}{args.rows / best:>14,.0f}")
+    if "arrow" not in bodies:
+        print("arrow         skipped (pyarrow is not installed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import asyncio
+import os
+
+from app.core.artifact_cache import DiskArtifactCache
+
+
+def test_fetch_downloads_once_and_survives_new_instance(tmp_path):
+    downloads = []
+
+    async def download():
+        downloads.append(1)
+        return b"model-bytes"
+
+    cache = DiskArtifactCache(str(tmp_path), max_bytes=1024)
+    path = asyncio.run(cache.fetch("u1/models/m.pkl", download, version="v1"))
+    assert open(path, "rb").read() == b"model-bytes"
+
+    # A restarted worker sees the same file without downloading again
+    restarted = DiskArtifactCache(str(tmp_path), max_bytes=1024)
+    assert asyncio.run(restarted.fetch("u1/models/m.pkl", download, version="v1")) == path
+    assert len(downloads) == 1
+
+    # A new version is a different artifact
+    asyncio.run(restarted.fetch("u1/models/m.pkl", download, version="v2"))
+    assert len(downloads) == 2
+
+
+def test_evicts_least_recently_used_files(tmp_path):
+    cache = DiskArtifactCache(str(tmp_path), max_bytes=250)
+    a = cache.put_bytes(cache.key("a"), b"x" * 100)
+    b = cache.put_bytes(cache.key("b"), b"x" * 100)
+    os.utime(a, (1, 1))
+    os.utime(b, (2, 2))
+
+    cache.put_bytes(cache.key("c"), b"x" * 100)
+    assert not os.path.exists(a)
+    assert os.path.exists(b)
+    assert cache.stats()["bytes"] == 200
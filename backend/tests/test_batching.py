@@ -0,0 +1,86 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from app.services.batching import MicroBatcher
+
+
+class _DoublingPredictor:
+    def __init__(self):
+        self.calls = []
+
+    def predict_arrays(self, df, return_probabilities=False):
+        self.calls.append(len(df))
+        if (df["x"] < 0).any():
+            raise ValueError("negative input")
+        values = df["x"].to_numpy() * 2
+        return values, (np.column_stack([values, -values]) if return_probabilities else None)
+
+
+def test_concurrent_requests_share_one_call_and_get_their_own_rows():
+    predictor = _DoublingPredictor()
+
+    async def scenario():
+        batcher = MicroBatcher(predictor, max_batch_rows=100, max_wait_ms=20)
+        frames = [pd.DataFrame({"x": [i, i + 0.5]}) for i in range(5)]
+        results = await asyncio.gather(*(batcher.submit(f, return_probabilities=(i == 0)) for i, f in enumerate(frames)))
+        batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert predictor.calls == [10]
+    for i, (predictions, probabilities) in enumerate(results):
+        np.testing.assert_array_equal(predictions, [2 * i, 2 * i + 1])
+        assert (probabilities is not None) == (i == 0)
+    assert results[0][1].shape == (2, 2)
+
+
+def test_bad_request_does_not_fail_its_batch_neighbours():
+    predictor = _DoublingPredictor()
+
+    async def scenario():
+        batcher = MicroBatcher(predictor, max_batch_rows=100, max_wait_ms=20)
+        good = batcher.submit(pd.DataFrame({"x": [1.0]}))
+        bad = batcher.submit(pd.DataFrame({"x": [-1.0]}))
+        return await asyncio.gather(good, bad, return_exceptions=True)
+
+    good, bad = asyncio.run(scenario())
+    np.testing.assert_array_equal(good[0], [2.0])
+    assert isinstance(bad, ValueError)
+
+
+def test_failures_outside_predict_resolve_callers_and_keep_the_batcher_alive():
+    class _ScalarOnceFirst(_DoublingPredictor):
+        def predict_arrays(self, df, return_probabilities=False):
+            predictions, probabilities = super().predict_arrays(df, return_probabilities)
+            # A 0-d result cannot be sliced back into per-request rows
+            return (predictions[0] if len(self.calls) == 1 else predictions), probabilities
+
+    async def scenario():
+        batcher = MicroBatcher(_ScalarOnceFirst(), max_batch_rows=100, max_wait_ms=5)
+        failed = await asyncio.wait_for(
+            asyncio.gather(batcher.submit(pd.DataFrame({"x": [1.0]})), return_exceptions=True), timeout=1
+        )
+
+        # The loop itself dying is restarted for the requests still queued
+        collect = batcher._collect
+        calls = []
+
+        async def flaky_collect():
+            if not calls:
+                calls.append(1)
+                raise RuntimeError("collect failed")
+            return await collect()
+
+        batcher._collect = flaky_collect
+        batcher._task.cancel()
+        await asyncio.sleep(0)
+        batcher._start()
+        served = await asyncio.wait_for(batcher.submit(pd.DataFrame({"x": [3.0]})), timeout=1)
+        batcher.close()
+        return failed[0], served
+
+    failed, served = asyncio.run(scenario())
+    assert isinstance(failed, IndexError)
+    np.testing.assert_array_equal(served[0], [6.0])
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification, make_regression
+
+from app.core.model_registry import MODEL_REGISTRY
+from app.services.compiled_model import compile_model
+from app.services.predict_service import PredictionService
+
+COMPILED_TYPES = ["linear_regression", "ridge", "lasso", "logistic_regression",
+                  "random_forest", "gradient_boosting", "decision_tree"]
+
+
+def _data(problem_type, n_classes=2):
+    if problem_type == "regression":
+        return make_regression(n_samples=600, n_features=8, noise=5.0, random_state=0)
+    return make_classification(n_samples=600, n_features=8, n_informative=5,
+                               n_classes=n_classes, random_state=0)
+
+
+@pytest.mark.parametrize("problem_type,n_classes", [("regression", 1), ("classification", 2), ("classification", 3)])
+@pytest.mark.parametrize("model_type", COMPILED_TYPES)
+def test_compiled_model_matches_estimator_on_holdout(problem_type, n_classes, model_type):
+    if model_type not in MODEL_REGISTRY[problem_type]:
+        pytest.skip(f"{model_type} is not a {problem_type} model")
+    X, y = _data(problem_type, n_classes)
+    model = MODEL_REGISTRY[problem_type][model_type]().fit(X[:480], y[:480])
+
+    compiled = compile_model(model, X[480:])
+    assert compiled is not None
+
+    np.testing.assert_allclose(compiled.predict(X[480:]), model.predict(X[480:]), rtol=1e-7)
+    if problem_type == "classification":
+        np.testing.assert_allclose(compiled.predict_proba(X[480:]), model.predict_proba(X[480:]), rtol=1e-7)
+
+
+def test_unsupported_models_are_not_compiled():
+    X, y = _data("regression")
+    model = MODEL_REGISTRY["regression"]["knn"]().fit(X, y)
+    assert compile_model(model, X) is None
+
+
+def test_prediction_service_falls_back_above_compiled_batch_limit():
+    X, y = _data("regression")
+    model = MODEL_REGISTRY["regression"]["gradient_boosting"]().fit(X, y)
+    compiled = compile_model(model, X)
+    predictor = PredictionService({"model": model, "compiled_model": compiled, "problem_type": "regression"})
+
+    assert predictor.estimator_for(1) is compiled
+    assert predictor.estimator_for(compiled.max_rows + 1) is model
+
+
+def test_boosting_without_private_init_api_is_served_uncompiled():
+    X, y = _data("regression")
+    model = MODEL_REGISTRY["regression"]["gradient_boosting"]().fit(X[:480], y[:480])
+    # Stand-in for a scikit-learn release without BaseGradientBoosting._raw_predict_init
+    model._raw_predict_init = None
+
+    assert compile_model(model, X[480:]) is None
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.compiled_preprocessor import CompiledPreprocessor, compile_preprocessor
+from app.services.data_preprocessing import DataPreprocessing
+
+
+def _dataset(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "age": rng.normal(40, 10, n),
+        "rooms": rng.integers(1, 6, n).astype(float),
+        "city": rng.choice(["lagos", "abuja", "kano"], n).astype(object),
+        "street": np.array([f"s{i}" for i in rng.integers(0, 80, n)], dtype=object),
+        "price": rng.normal(100, 20, n),
+    })
+    df.loc[::9, "age"] = np.nan
+    df.loc[::13, "city"] = None
+    return df
+
+
+@pytest.mark.parametrize("use_target_encoder", [False, True])
+def test_compiled_transform_matches_sklearn(use_target_encoder):
+    df = _dataset()
+    processing = DataPreprocessing()
+    _, _, _, _, preprocessor, metadata = processing.preprocess_data(
+        df, "price", use_target_encoder=use_target_encoder
+    )
+    assert metadata["compiled_preprocessor"]
+
+    compiled = processing.compiled_preprocessor
+    X = _dataset(n=100, seed=1).drop(columns=["price"])
+    X.loc[0, "street"] = "never-seen"
+    expected = preprocessor.transform(X)
+
+    np.testing.assert_allclose(compiled.transform_frame(X), expected)
+    np.testing.assert_allclose(compiled.transform_records(X.to_dict("records")), expected)
+    np.testing.assert_allclose(
+        compiled.transform_columns({c: X[c].tolist() for c in X.columns}), expected
+    )
+
+
+def test_compile_on_load_verifies_against_synthetic_sample():
+    df = _dataset()
+    _, _, _, _, preprocessor, _ = DataPreprocessing().preprocess_data(df, "price")
+    compiled = compile_preprocessor(preprocessor)
+    assert isinstance(compiled, CompiledPreprocessor)
+    assert compiled.verify(preprocessor)
+
+
+def test_missing_columns_are_reported():
+    df = _dataset()
+    _, _, _, _, preprocessor, _ = DataPreprocessing().preprocess_data(df, "price")
+    compiled = CompiledPreprocessor.compile(preprocessor)
+    with pytest.raises(ValueError, match="columns are missing"):
+        compiled.transform_records([{"age": 30.0}])
@@ -0,0 +1,194 @@
+import asyncio
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.artifact_cache import DiskArtifactCache
+from app.services import dataset_columnar, dataset_service
+from app.services.dataset_columnar import ColumnarDatasetError, load_dataset
+
+
+class _Upload:
+    def __init__(self, content: bytes, filename: str = "data.csv"):
+        self._buffer = io.BytesIO(content)
+        self.filename = filename
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+@pytest.fixture
+def bucket(monkeypatch, tmp_path):
+    files = {}
+    state = {"requests": []}
+    storage = dataset_service.repositories.dataset_files
+
+    async def upload_file(path, local_path, upsert=False, content_type="application/octet-stream"):
+        with open(local_path, "rb") as f:
+            files[path] = f.read()
+        return {}
+
+    async def download(path, byte_range=None):
+        state["requests"].append((path, byte_range))
+        content = files[path]
+        return content if byte_range is None else content[byte_range[0]:byte_range[1] + 1]
+
+    async def remove(paths):
+        state["removed"] = list(paths)
+        return []
+
+    async def insert(data, returning=True):
+        state["row"] = data
+        return [{"id": "d1"}]
+
+    async def get(columns="*", **filters):
+        return state["row"]
+
+    monkeypatch.setattr(storage, "upload_file", upload_file)
+    monkeypatch.setattr(storage, "download", download)
+    monkeypatch.setattr(storage, "remove", remove)
+    monkeypatch.setattr(dataset_service.repositories.datasets, "insert", insert)
+    monkeypatch.setattr(dataset_service.repositories.datasets, "get", get)
+    monkeypatch.setattr(dataset_service.repositories.datasets, "delete", lambda **filters: asyncio.sleep(0))
+    monkeypatch.setattr(dataset_service.settings, "dataset_upload_chunk_rows", 16)
+    monkeypatch.setattr(dataset_columnar, "dataset_artifacts", DiskArtifactCache(str(tmp_path / "cache"), 1024 ** 2))
+    state["files"] = files
+    return state
+
+
+def _frame(n=100):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "x": rng.normal(size=n),
+        "k": np.arange(n),
+        "city": rng.choice(["paris", "rome", "são paulo"], n),
+        "gaps": [None if i % 7 == 0 else i for i in range(n)],
+        # Numeric in the first row groups, text later
+        "code": [str(i) for i in range(n - 10)] + ["x"] * 10,
+    })
+
+
+def test_upload_stores_columnar_copy_that_loads_like_the_csv(bucket):
+    df = _frame()
+    content = df.to_csv(index=False).encode()
+    result = asyncio.run(dataset_service.upload_dataset(_Upload(content), "user"))
+
+    assert "user/data.csv.npzc" in bucket["files"]
+    assert result["columnar"]["csv_bytes"] == len(content)
+
+    loaded, report = asyncio.run(load_dataset(bucket["row"]))
+    expected = pd.read_csv(io.BytesIO(content))
+    assert report["source"] == "columnar" and len(bucket["requests"]) == 1
+    pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+    assert (loaded.dtypes == expected.dtypes).all()
+
+
+def test_projected_load_reads_one_column_and_needed_row_groups(bucket):
+    content = _frame().to_csv(index=False).encode()
+    asyncio.run(dataset_service.upload_dataset(_Upload(content), "user"))
+    full = len(bucket["files"]["user/data.csv.npzc"])
+
+    target, report = asyncio.run(load_dataset(bucket["row"], columns=["city"]))
+    head, head_report = asyncio.run(load_dataset(bucket["row"], columns=["k", "x"], max_rows=20))
+
+    assert list(target.columns) == ["city"] and len(target) == 100
+    assert report["bytes_read"] < full / 3
+    assert head["k"].tolist() == list(range(20))
+    assert head_report["bytes_read"] < report["bytes_read"]
+    with pytest.raises(ColumnarDatasetError):
+        asyncio.run(load_dataset(bucket["row"], columns=["missing"]))
+
+
+def test_datasets_without_copy_fall_back_to_csv(bucket):
+    content = _frame().to_csv(index=False).encode()
+    bucket["files"]["user/old.csv"] = content
+    row = {"file_url": dataset_service.repositories.dataset_files.public_url("user/old.csv"), "metadata": {}}
+
+    loaded, report = asyncio.run(load_dataset(row, columns=["x", "k"], max_rows=30))
+
+    assert report["source"] == "csv" and report["bytes_read"] == len(content)
+    assert list(loaded.columns) == ["x", "k"] and len(loaded) == 30
+
+
+def test_delete_removes_columnar_copy(bucket):
+    asyncio.run(dataset_service.upload_dataset(_Upload(_frame().to_csv(index=False).encode()), "user"))
+
+    asyncio.run(load_dataset(bucket["row"]))
+    assert dataset_columnar.dataset_artifacts.stats()["files"] == 1
+
+    assert asyncio.run(dataset_service.delete_dataset("d1", "user"))
+    assert sorted(bucket["removed"]) == ["user/data.csv", "user/data.csv.npzc"]
+    assert dataset_columnar.dataset_artifacts.stats()["files"] == 0
+
+
+def test_repeated_loads_are_served_from_disk_cache(bucket):
+    content = _frame().to_csv(index=False).encode()
+    asyncio.run(dataset_service.upload_dataset(_Upload(content), "user"))
+    row = {**bucket["row"], "id": "d1"}
+
+    first, first_report = asyncio.run(load_dataset(row))
+    again, again_report = asyncio.run(load_dataset(row))
+    target, target_report = asyncio.run(load_dataset(row, columns=["city"]))
+
+    assert first_report["cache"] == "miss" and first_report["bytes_read"] > 0
+    assert again_report["cache"] == "hit" and again_report["bytes_read"] == 0
+    assert target_report["cache"] == "hit" and target_report["bytes_read"] == 0
+    assert len(bucket["requests"]) == 1
+    pd.testing.assert_frame_equal(first, again)
+    assert target["city"].tolist() == first["city"].tolist()
+
+    # Other content under the same id is a different cache entry
+    changed = {**row, "metadata": {**row["metadata"], "content_sha256": "other"}}
+    assert asyncio.run(load_dataset(changed))[1]["cache"] == "miss"
+
+
+def test_csv_datasets_are_cached_too(bucket):
+    content = _frame().to_csv(index=False).encode()
+    bucket["files"]["user/old.csv"] = content
+    row = {"id": "d0", "uploaded_at": "2024-01-01", "metadata": {},
+           "file_url": dataset_service.repositories.dataset_files.public_url("user/old.csv")}
+
+    reports = [asyncio.run(load_dataset(row, columns=["x"]))[1] for _ in range(2)]
+
+    assert [report["cache"] for report in reports] == ["miss", "hit"]
+    assert reports[1]["bytes_read"] == 0 and reports[1]["csv_bytes"] == len(content)
+    assert len(bucket["requests"]) == 1
+
+
+def test_plan_reads_coalesces_adjacent_columns():
+    index = {
+        "format": dataset_columnar.COLUMNAR_FORMAT,
+        "columns": [
+            {"name": "a", "offset": 0, "blocks": [[0, 0, 10], [5, 10, 10]]},
+            {"name": "b", "offset": 20, "blocks": [[0, 0, 4], [5, 4, 4]]},
+            {"name": "c", "offset": 28, "blocks": [[0, 0, 3], [5, 3, 3]]},
+        ],
+    }
+    assert dataset_columnar.plan_reads(index)[1] == [(0, 33)]
+    assert dataset_columnar.plan_reads(index, ["c", "a"], max_rows=5)[1] == [(0, 9), (28, 30)]
+
+
+def test_long_text_and_nullable_bools_round_trip_compactly(bucket):
+    n = 200
+    df = pd.DataFrame({
+        "k": np.arange(n),
+        "note": ["x" * 5000 if i == 3 else f"note {i} é" for i in range(n)],
+        "city": [None if i % 9 == 0 else ["paris", "rome"][i % 2] for i in range(n)],
+        "flag": [None if i % 5 == 0 else ["True", "False"][i % 2] for i in range(n)],
+        "ok": ["true" if i % 3 else "false" for i in range(n)],
+    })
+    content = df.to_csv(index=False).encode()
+    asyncio.run(dataset_service.upload_dataset(_Upload(content), "user"))
+
+    # One long cell must not widen every row of its row group: arrays hold about the text's own bytes
+    block, _ = dataset_columnar._encode_column(df["note"])
+    with np.load(io.BytesIO(block)) as npz:
+        assert sum(npz[name].nbytes for name in npz.files) < 2 * df["note"].str.len().sum()
+
+    loaded, _ = asyncio.run(load_dataset(bucket["row"]))
+    expected = pd.read_csv(io.BytesIO(content))
+    pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+    assert loaded["ok"].dtype == bool
+    assert loaded["flag"].dropna().map(type).eq(bool).all() and loaded["flag"].isna().sum() == 40
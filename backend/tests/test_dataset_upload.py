@@ -0,0 +1,65 @@
+import asyncio
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import dataset_service
+from app.services.dataset_service import DatasetValidationError
+
+
+class _Upload:
+    def __init__(self, content: bytes, filename: str = "data.csv"):
+        self._buffer = io.BytesIO(content)
+        self.filename = filename
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    saved = {}
+
+    async def upload_file(path, local_path, upsert=False, content_type="application/octet-stream"):
+        with open(local_path, "rb") as f:
+            saved.setdefault("files", {})[path] = f.read()
+        return {}
+
+    async def insert(data, returning=True):
+        saved["row"] = data
+        return [{"id": "d1"}]
+
+    monkeypatch.setattr(dataset_service.repositories.dataset_files, "upload_file", upload_file)
+    monkeypatch.setattr(dataset_service.repositories.datasets, "insert", insert)
+    monkeypatch.setattr(dataset_service.settings, "dataset_upload_chunk_rows", 7)
+    monkeypatch.setattr(dataset_service.settings, "dataset_upload_chunk_bytes", 64)
+    return saved
+
+
+def test_chunked_upload_matches_in_memory_analysis(storage):
+    df = pd.DataFrame({
+        "x": np.arange(50.0),
+        "city": ["paris", "rome"] * 25,
+        "constant": 1,
+        "sparse": [None] * 10 + list(range(40)),
+    })
+    content = df.to_csv(index=False).encode()
+
+    result = asyncio.run(dataset_service.upload_dataset(_Upload(content), "user"))
+
+    assert storage["files"]["user/data.csv"] == content
+    assert storage["row"]["rows"] == 50 and storage["row"]["has_missing"]
+    expected = dataset_service.analyze_dataset(df)
+    for key in ("numeric_features", "categorical_features", "missing_percentages",
+                "cardinality_info", "zero_variance_columns"):
+        assert result["summary"][key] == expected[key]
+    assert result["memory"]["file_bytes"] == len(content)
+
+
+def test_duplicate_header_is_rejected(storage):
+    content = b"a,b,a\n" + b"1,2,3\n" * 20
+    with pytest.raises(DatasetValidationError, match="duplicate"):
+        asyncio.run(dataset_service.upload_dataset(_Upload(content), "user"))
+    assert "files" not in storage
@@ -0,0 +1,56 @@
+import io
+
+import numpy as np
+import pytest
+
+from app.services.input_formats import (
+    InputFormatError,
+    columns_to_frame,
+    decode_npy,
+    encode_npy,
+    format_for_media_type,
+)
+
+
+def _npy(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def test_plain_npy_is_named_by_position_without_copying():
+    array = np.arange(6, dtype=float).reshape(3, 2)
+    df = decode_npy(_npy(array), ["a", "b"])
+    assert list(df.columns) == ["a", "b"]
+    np.testing.assert_array_equal(df["b"].to_numpy(), [1.0, 3.0, 5.0])
+
+    with pytest.raises(InputFormatError):
+        decode_npy(_npy(array), ["a"])
+
+
+def test_structured_npy_carries_its_columns():
+    array = np.zeros(2, dtype=[("x", float), ("city", "U8")])
+    array["city"] = ["paris", "rome"]
+    df = decode_npy(_npy(array))
+    assert list(df.columns) == ["x", "city"]
+    assert df["city"].tolist() == ["paris", "rome"]
+
+
+def test_npy_output_round_trips_predictions_and_probabilities():
+    labels = np.array(["no", "yes"], dtype=object)
+    probabilities = np.array([[0.7, 0.3], [0.1, 0.9]])
+    array = np.load(io.BytesIO(encode_npy(labels, probabilities)), allow_pickle=False)
+    assert array.dtype.names == ("prediction", "probability_0", "probability_1")
+    assert array["prediction"].tolist() == ["no", "yes"]
+    np.testing.assert_array_equal(array["probability_1"], [0.3, 0.9])
+
+
+def test_columnar_json_and_media_types():
+    df = columns_to_frame({"a": [1, 2], "b": ["x", "y"]})
+    assert df.shape == (2, 2)
+    with pytest.raises(InputFormatError):
+        columns_to_frame({"a": [1, 2], "b": ["x"]})
+
+    assert format_for_media_type("application/x-npy") == "npy"
+    assert format_for_media_type("application/vnd.apache.arrow.stream; q=1") == "arrow"
+    assert format_for_media_type("*/*", default="npy") == "npy"
@@ -0,0 +1,86 @@
+import asyncio
+
+from app.core.model_cache import ModelCache
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ModelCache(max_bytes=100)
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    assert cache.get("a") == "A"  # touch a, so b is now the LRU entry
+
+    cache.put("c", "C", 40)
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.stats()["bytes"] == 80
+
+    cache.put("huge", "H", 500)  # larger than the budget: never cached
+    assert cache.get("huge") is None and len(cache) == 2
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ModelCache(max_bytes=1000)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "bundle", 10
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("m1", loader) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["bundle"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced_loads"] == 4
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_load():
+    cache = ModelCache(max_bytes=1000)
+
+    async def loader():
+        await asyncio.sleep(0.05)
+        return "bundle", 10
+
+    async def scenario():
+        owner = asyncio.ensure_future(cache.get_or_load("m1", loader))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(cache.get_or_load("m1", loader))
+        waiter = asyncio.ensure_future(cache.get_or_load("m1", loader))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        return await owner, await waiter, cancelled.cancelled()
+
+    assert asyncio.run(scenario()) == ("bundle", "bundle", True)
+    assert cache.get("m1") == "bundle"
+
+
+def test_version_change_and_invalidation_force_reload():
+    cache = ModelCache(max_bytes=1000)
+    removed = []
+    cache.add_listener(lambda key, reason: removed.append((key, reason)))
+
+    async def load(value):
+        return value, 1
+
+    assert asyncio.run(cache.get_or_load("m1", lambda: load("v1"), version="url-1")) == "v1"
+    assert asyncio.run(cache.get_or_load("m1", lambda: load("v2"), version="url-2")) == "v2"
+    assert cache.invalidate("m1")
+    assert cache.get("m1") is None
+    assert removed == [("m1", "expired"), ("m1", "invalidated")]
+
+
+def test_shared_bytes_do_not_count_against_the_budget():
+    cache = ModelCache(max_bytes=100)
+
+    async def loader():
+        return "mapped-bundle", 30, 900
+
+    asyncio.run(cache.get_or_load("m1", loader))
+    cache.put("m2", "B", 60)
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 90 and stats["shared_bytes"] == 900
+
+    cache.invalidate("m1")
+    assert cache.stats()["shared_bytes"] == 0
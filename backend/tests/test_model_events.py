@@ -0,0 +1,47 @@
+import asyncio
+
+from app.core.model_events import ModelEventBus, MODEL_CREATED, MODEL_DELETED
+
+
+def test_events_reach_other_workers_but_not_the_publisher(tmp_path):
+    directory = str(tmp_path / "events")
+
+    async def scenario():
+        publisher, worker_a, worker_b = ModelEventBus(directory), ModelEventBus(directory), ModelEventBus(directory)
+        received = {"publisher": [], "a": [], "b": []}
+        publisher.subscribe(received["publisher"].append)
+        worker_a.subscribe(received["a"].append)
+        worker_b.subscribe(received["b"].append)
+        for bus in (publisher, worker_a, worker_b):
+            await bus.start()
+
+        delivered = publisher.publish(MODEL_CREATED, 7, model_url="https://x/models/m.pkl", version="v1")
+        await asyncio.sleep(0.05)
+        await worker_b.close()
+        publisher.publish(MODEL_DELETED, 7)
+        await asyncio.sleep(0.05)
+
+        await publisher.close()
+        await worker_a.close()
+        return delivered, received
+
+    delivered, received = asyncio.run(scenario())
+    assert delivered == 2
+    assert received["publisher"] == []
+    assert [e["type"] for e in received["a"]] == [MODEL_CREATED, MODEL_DELETED]
+    assert received["a"][0]["model_url"] == "https://x/models/m.pkl"
+    assert [e["type"] for e in received["b"]] == [MODEL_CREATED]
+
+
+def test_sockets_of_dead_workers_are_cleaned_up(tmp_path):
+    import socket
+
+    directory = tmp_path / "events"
+    directory.mkdir()
+    stale = directory / "999999-dead.sock"
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead.bind(str(stale))
+    dead.close()
+
+    assert ModelEventBus(str(directory)).publish(MODEL_CREATED, 1) == 0
+    assert not stale.exists()
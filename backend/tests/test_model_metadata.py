@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.services import model_metadata as model_metadata_module
+from app.services.model_metadata import ModelMetadataCache
+
+
+@pytest.fixture
+def models_table(monkeypatch):
+    rows = {("1", "alice"): {"id": 1, "user_id": "alice", "status": "trained", "model_url": "u",
+                             "target_column": "y", "metrics": {"r2": 0.9}}}
+    queries = []
+
+    async def get(columns="*", **filters):
+        queries.append(filters)
+        assert columns == model_metadata_module.SERVING_COLUMNS
+        await asyncio.sleep(0)
+        return rows.get((str(filters["id"]), filters["user_id"]))
+
+    monkeypatch.setattr(model_metadata_module.repositories.models, "get", get)
+    return rows, queries
+
+
+def test_warm_lookups_skip_the_database(models_table):
+    _, queries = models_table
+    cache = ModelMetadataCache()
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get(1, "alice") for _ in range(5))), await cache.get("1", "alice")
+
+    results, again = asyncio.run(scenario())
+    assert len(queries) == 1
+    assert again == results[0] and again["model_url"] == "u"
+    # Only serving fields are kept
+    assert "metrics" not in again
+
+
+def test_missing_models_are_cached_briefly(models_table):
+    _, queries = models_table
+    clock = [0.0]
+    cache = ModelMetadataCache(ttl=30, negative_ttl=5)
+    cache._cache._clock = lambda: clock[0]
+
+    async def lookup():
+        return await cache.get(1, "mallory")
+
+    assert asyncio.run(lookup()) is None
+    assert asyncio.run(lookup()) is None
+    assert len(queries) == 1
+    clock[0] = 6.0
+    asyncio.run(lookup())
+    assert len(queries) == 2
+
+
+def test_invalidation_drops_every_user_entry(models_table):
+    rows, queries = models_table
+    cache = ModelMetadataCache()
+
+    asyncio.run(cache.get(1, "alice"))
+    asyncio.run(cache.get(1, "mallory"))
+    assert cache.invalidate(1) == 2
+
+    rows[("1", "alice")]["status"] = "deleted"
+    assert asyncio.run(cache.get(1, "alice"))["status"] == "deleted"
+    assert len(queries) == 3
+
+
+def test_user_index_follows_evictions(models_table):
+    clock = [0.0]
+    cache = ModelMetadataCache(maxsize=2, ttl=30, negative_ttl=5)
+    cache._cache._clock = lambda: clock[0]
+
+    for model_id in range(5):
+        cache.put(model_id, "alice", {"id": model_id})
+    assert set(cache._users) == {"3", "4"}
+
+    # Expired entries leave the index when they are dropped on access
+    clock[0] = 31.0
+    assert asyncio.run(cache.get(9, "mallory")) is None
+    assert cache._cache.get(("3", "alice")) is None
+    assert set(cache._users) == {"4", "9"}
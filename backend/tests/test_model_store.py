@@ -0,0 +1,72 @@
+import joblib
+import numpy as np
+from sklearn.datasets import make_classification, make_regression
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import Ridge
+
+from app.services.predict_service import ModelStore, PredictionService, _lazy_estimator_nbytes, _mapped_nbytes
+
+
+def test_bundles_are_memory_mapped_and_compiled_forms_written_back(tmp_path):
+    X, y = make_regression(n_samples=200, n_features=2000, random_state=0)
+    model = Ridge().fit(X, y)
+    path = str(tmp_path / "bundle.pkl")
+    joblib.dump({"model": model, "problem_type": "regression"}, path)
+
+    bundle = ModelStore._load_bundle(path)
+    assert bundle["compiled_model"] is not None
+    # The compiled coefficients were persisted, so other workers map them instead of recompiling
+    assert isinstance(bundle["compiled_model"].coef, np.memmap)
+    assert "compiled_model" in joblib.load(path)
+    # The original estimator stays pickled and mapped; the compiled model serves every batch size
+    assert "model" not in bundle and isinstance(bundle["model_pickle"], np.memmap)
+    assert _mapped_nbytes(bundle) >= 2 * model.coef_.nbytes
+    assert _lazy_estimator_nbytes(bundle) == 0
+
+    predictions = PredictionService(bundle).predict_arrays(X[:5])[0]
+    np.testing.assert_allclose(predictions, model.predict(X[:5]))
+
+
+def test_model_events_prefetch_created_and_forget_deleted_models(monkeypatch):
+    import asyncio
+    from app.core.model_events import MODEL_CREATED, MODEL_DELETED
+    from app.services import predict_service
+
+    calls = []
+
+    async def load_model(model_url, model_id, version=None):
+        calls.append(("load", model_url, model_id, version))
+
+    monkeypatch.setattr(predict_service.model_store, "load_model", load_model)
+    monkeypatch.setattr(predict_service.model_store, "forget",
+                        lambda model_id, model_url=None, version=None: calls.append(("forget", model_id)))
+    monkeypatch.setattr(predict_service.model_events, "publish", lambda *a, **k: calls.append(("publish", a[0])))
+
+    asyncio.run(predict_service.announce_model_event(MODEL_CREATED, 3, model_url="u", version="v"))
+    asyncio.run(predict_service.announce_model_event(MODEL_DELETED, 3, model_url="u"))
+
+    assert calls == [
+        ("load", "u", 3, "v"), ("publish", MODEL_CREATED),
+        ("forget", 3), ("publish", MODEL_DELETED),
+    ]
+
+
+def test_forest_estimator_is_only_unpickled_for_large_batches(tmp_path):
+    X, y = make_classification(n_samples=2000, n_features=6, random_state=0)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    path = str(tmp_path / "bundle.pkl")
+    joblib.dump({"model": model, "problem_type": "classification"}, path)
+
+    ModelStore._load_bundle(path)
+    # Another worker loading the rewritten artifact gets no private copy of the trees
+    bundle = ModelStore._load_bundle(path)
+    assert "model" not in bundle
+    # Counted as private: batches above max_rows will unpickle it
+    assert _lazy_estimator_nbytes(bundle) == bundle["model_pickle"].nbytes > 0
+
+    predictor = PredictionService(bundle)
+    np.testing.assert_array_equal(predictor.predict_arrays(X[:10])[0], model.predict(X[:10]))
+    assert "model" not in bundle
+
+    np.testing.assert_array_equal(predictor.predict_arrays(X)[0], model.predict(X))
+    assert "model" in bundle
@@ -0,0 +1,50 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.preprocessing import StandardScaler
+
+from app.services import predict_service
+
+
+def _preprocessor(scale):
+    frame = pd.DataFrame({"x": np.arange(10, dtype=float) * scale})
+    return ColumnTransformer([("num", StandardScaler(), ["x"])]).fit(frame)
+
+
+def test_models_sharing_a_preprocessor_are_transformed_once(monkeypatch):
+    shared = _preprocessor(1.0)
+    X = shared.transform(pd.DataFrame({"x": np.arange(10, dtype=float)}))
+    bundles = {
+        "1": {"model": LinearRegression().fit(X, np.arange(10.0)), "preprocessor": shared, "problem_type": "regression"},
+        "2": {"model": Ridge().fit(X, np.arange(10.0)), "preprocessor": _preprocessor(1.0), "problem_type": "regression"},
+        "3": {"model": LinearRegression().fit(X, np.arange(10.0)), "preprocessor": _preprocessor(2.0),
+              "problem_type": "regression"},
+    }
+    transforms = []
+    original_transform = predict_service.PredictionService.transform
+
+    def counting_transform(self, input_data):
+        transforms.append(1)
+        return original_transform(self, input_data)
+
+    async def get_metadata(model_id, user_id):
+        return {"id": int(model_id), "status": "trained", "model_url": f"u{model_id}", "created_at": "t"}
+
+    async def load_model(model_url, model_id, version=None):
+        return bundles[str(model_id)]
+
+    monkeypatch.setattr(predict_service.model_metadata, "get", get_metadata)
+    monkeypatch.setattr(predict_service.model_store, "load_model", load_model)
+    monkeypatch.setattr(predict_service.PredictionService, "transform", counting_transform)
+
+    result = asyncio.run(predict_service.predict_many(
+        ["1", "2", "3", "1"], "user", {"x": [1.0, 2.0]}, save_predictions=False
+    ))
+
+    assert [model["model_id"] for model in result["models"]] == ["1", "2", "3"]
+    assert sorted(group["model_ids"] for group in result["preprocessor_groups"]) == [["1", "2"], ["3"]]
+    assert len(transforms) == 2
+    np.testing.assert_allclose(result["models"][0]["predictions"], [1.0, 2.0])
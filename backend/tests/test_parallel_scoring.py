@@ -0,0 +1,102 @@
+import asyncio
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import KNeighborsRegressor
+
+from app.core.resources import CoreBudget
+from app.services import parallel_scoring
+from app.services.parallel_scoring import ParallelScorer, choose_batch_size
+from app.services.predict_service import PredictionService
+
+
+def test_parallel_scoring_matches_in_process_and_keeps_order(monkeypatch, tmp_path):
+    # Free cores must not depend on the test host
+    monkeypatch.setattr(parallel_scoring, "core_budget", CoreBudget(total_cores=4, reserve_cores=0))
+    monkeypatch.setattr("app.core.resources._load_average", lambda: None)
+    X, y = make_classification(n_samples=3000, n_features=6, random_state=0)
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X[:1000], y[:1000])
+    bundle = {"model": model, "preprocessor": None, "problem_type": "classification"}
+    path = str(tmp_path / "model.pkl")
+    joblib.dump(bundle, path)
+
+    predictor = PredictionService(bundle)
+    df = pd.DataFrame(X)
+    scorer = ParallelScorer(max_workers=2, min_rows=100)
+    try:
+        predictions, probabilities, details = asyncio.run(
+            scorer.score(predictor, df, path, return_probabilities=True, batch_size=256)
+        )
+    finally:
+        scorer.shutdown()
+
+    assert details["mode"] == "parallel" and details["partitions"] == 12
+    np.testing.assert_array_equal(predictions, model.predict(X))
+    assert predictions.dtype == model.predict(X[:1]).dtype
+    np.testing.assert_allclose(probabilities, model.predict_proba(X))
+
+
+def test_small_inputs_are_scored_in_process():
+    X, y = make_classification(n_samples=50, n_features=4, random_state=0)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    predictor = PredictionService({"model": model, "problem_type": "classification"})
+
+    predictions, _, details = asyncio.run(ParallelScorer(max_workers=4).score(predictor, pd.DataFrame(X), "unused"))
+    assert details["mode"] == "in_process"
+    np.testing.assert_array_equal(predictions, model.predict(X))
+
+
+def test_batch_size_shrinks_for_memory_hungry_models():
+    rng = np.random.default_rng(0)
+    knn = KNeighborsRegressor().fit(rng.normal(size=(50000, 4)), rng.normal(size=50000))
+    budget = 64 * 1024 ** 2
+    knn_batch = choose_batch_size(knn, 4, 1_000_000, 4, budget)
+    assert knn_batch * 16 * 50000 * 4 <= budget
+    assert choose_batch_size(None, 4, 1_000_000, 4, budget) > knn_batch
+
+
+def _forest_bundle(tmp_path):
+    X, y = make_classification(n_samples=400, n_features=4, random_state=0)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    bundle = {"model": model, "preprocessor": None, "problem_type": "classification"}
+    path = str(tmp_path / "model.pkl")
+    joblib.dump(bundle, path)
+    return X, model, PredictionService(bundle), path
+
+
+def test_busy_core_budget_scores_in_process_without_waiting(monkeypatch, tmp_path):
+    X, model, predictor, path = _forest_bundle(tmp_path)
+    budget = CoreBudget(total_cores=4, reserve_cores=0)
+    monkeypatch.setattr(parallel_scoring, "core_budget", budget)
+    monkeypatch.setattr("app.core.resources._load_average", lambda: None)
+
+    async def scenario():
+        # A training run holds every core
+        training = await budget.acquire(requested=4)
+        result = await asyncio.wait_for(ParallelScorer(max_workers=2, min_rows=10).score(
+            predictor, pd.DataFrame(X), path), timeout=5)
+        await budget.release(training)
+        return result
+
+    predictions, _, details = asyncio.run(scenario())
+    assert details["mode"] == "in_process"
+    np.testing.assert_array_equal(predictions, model.predict(X))
+
+
+def test_evicted_artifact_falls_back_to_in_process(monkeypatch, tmp_path):
+    X, model, predictor, _ = _forest_bundle(tmp_path)
+    monkeypatch.setattr(parallel_scoring, "core_budget", CoreBudget(total_cores=4, reserve_cores=0))
+    monkeypatch.setattr("app.core.resources._load_average", lambda: None)
+    scorer = ParallelScorer(max_workers=2, min_rows=10)
+    try:
+        predictions, _, details = asyncio.run(
+            scorer.score(predictor, pd.DataFrame(X), str(tmp_path / "evicted.pkl"))
+        )
+    finally:
+        scorer.shutdown()
+
+    assert details["mode"] == "in_process"
+    np.testing.assert_array_equal(predictions, model.predict(X))
@@ -0,0 +1,80 @@
+import asyncio
+
+from app.services import prediction_log as prediction_log_module
+from app.services.prediction_log import PredictionLog
+
+
+def _fake_tables(monkeypatch, fail_inserts=0):
+    calls = {"inserts": [], "updates": [], "failures": fail_inserts}
+
+    async def insert(data, returning=True):
+        if calls["failures"]:
+            calls["failures"] -= 1
+            raise RuntimeError("database unavailable")
+        calls["inserts"].append(data)
+        return []
+
+    async def update(values, returning=True, **filters):
+        calls["updates"].append((values, filters))
+        return []
+
+    monkeypatch.setattr(prediction_log_module.repositories.predictions, "insert", insert)
+    monkeypatch.setattr(prediction_log_module.repositories.models, "update", update)
+    return calls
+
+
+def test_rows_are_bulk_inserted_and_model_touches_deduplicated(monkeypatch):
+    calls = _fake_tables(monkeypatch)
+
+    async def scenario():
+        log = PredictionLog(flush_interval=60, batch_rows=100)
+        await log.start()
+        for i in range(5):
+            await log.record({"model_id": 1, "n_samples": 1, "predictions": [i]}, model_id=1)
+        await log.record({"model_id": 2, "n_samples": 3, "source_file": "f.csv"}, model_id=2)
+        assert not calls["inserts"]
+        await log.close()
+        return log
+
+    log = asyncio.run(scenario())
+
+    # Rows with different columns go in separate bulk inserts
+    assert sorted(len(batch) for batch in calls["inserts"]) == [1, 5]
+    assert len(calls["updates"]) == 1
+    assert calls["updates"][0][1] == {"id": [1, 2]}
+    assert log.stats()["flushed_rows"] == 6
+
+
+def test_record_blocks_when_buffer_is_full(monkeypatch):
+    calls = _fake_tables(monkeypatch)
+
+    async def scenario():
+        log = PredictionLog(flush_interval=60, batch_rows=1000, max_pending_rows=2)
+        await log.start()
+        await log.record({"n_samples": 1})
+        await log.record({"n_samples": 1})
+        # The third row waits for a flush instead of growing the buffer
+        await asyncio.wait_for(log.record({"n_samples": 1}), timeout=5)
+        await log.close()
+        return log
+
+    log = asyncio.run(scenario())
+    assert log.stats()["backpressure_waits"] == 1
+    assert sum(len(batch) for batch in calls["inserts"]) == 3
+
+
+def test_failed_flush_is_retried(monkeypatch):
+    calls = _fake_tables(monkeypatch, fail_inserts=1)
+
+    async def scenario():
+        log = PredictionLog(flush_interval=60)
+        await log.start()
+        await log.record({"n_samples": 1})
+        await log.flush()
+        assert log.stats()["pending_rows"] == 1
+        await log.close()
+        return log
+
+    log = asyncio.run(scenario())
+    assert log.stats()["failed_flushes"] == 1 and log.stats()["dropped_rows"] == 0
+    assert calls["inserts"] == [[{"n_samples": 1}]]
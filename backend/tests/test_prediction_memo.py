@@ -0,0 +1,74 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from app.services import predict_service
+from app.services.prediction_memo import PredictionMemoRegistry, row_keys
+
+
+def test_row_keys_ignore_column_order_and_extra_columns():
+    a = pd.DataFrame({"x": [1.0, 2.0], "city": ["paris", "rome"], "id": [10, 11]})
+    b = pd.DataFrame({"city": ["paris", "oslo"], "x": [1.0, 2.0]})
+
+    keys_a = row_keys(a, ["x", "city"])
+    keys_b = row_keys(b, ["x", "city"])
+    assert keys_a[0] == keys_b[0]
+    assert keys_a[1] != keys_b[1]
+    # Same values under other column names are different inputs
+    assert row_keys(a.rename(columns={"x": "y"}), ["y", "city"])[0] != keys_a[0]
+
+
+def test_memo_is_replaced_when_the_version_changes():
+    registry = PredictionMemoRegistry(max_models=2)
+    memo = registry.get("1", "v1")
+    assert registry.get("1", "v1") is memo
+    assert registry.get("1", "v2") is not memo
+    registry.get("2", "v1")
+    registry.get("3", "v1")
+    assert set(registry.stats()) == {"2", "3"}
+
+
+def test_only_misses_are_scored(monkeypatch):
+    X = np.array([[0.0], [1.0], [2.0], [3.0]])
+    model = LogisticRegression().fit(X, [0, 0, 1, 1])
+    scored_rows = []
+
+    class CountingModel:
+        classes_ = model.classes_
+
+        def predict(self, rows):
+            scored_rows.append(len(rows))
+            return model.predict(rows)
+
+        def predict_proba(self, rows):
+            return model.predict_proba(rows)
+
+    async def get_metadata(model_id, user_id):
+        return {"id": 1, "status": "trained", "model_url": "u", "created_at": "t"}
+
+    async def load_model(*args, **kwargs):
+        return {"model": CountingModel(), "preprocessor": None, "problem_type": "classification"}
+
+    monkeypatch.setattr(predict_service.model_metadata, "get", get_metadata)
+    monkeypatch.setattr(predict_service.model_store, "load_model", load_model)
+    monkeypatch.setattr(predict_service.settings, "prediction_memo_enabled", True)
+    monkeypatch.setattr(predict_service.settings, "prediction_batching_enabled", False)
+    predict_service.prediction_memos.drop("memo-model")
+
+    async def scenario():
+        first = await predict_service.predict_arrays(
+            "memo-model", "u", {"x": [0.0, 3.0]}, return_probabilities=True, save_predictions=False
+        )
+        second = await predict_service.predict_arrays(
+            "memo-model", "u", {"x": [3.0, 1.0, 0.0]}, return_probabilities=True, save_predictions=False
+        )
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert scored_rows == [2, 1]
+    assert second[4]["cache"] == {"hits": 2, "misses": 1, "hit_rate": 0.6667}
+    np.testing.assert_array_equal(second[2], model.predict([[3.0], [1.0], [0.0]]))
+    np.testing.assert_allclose(second[3], model.predict_proba([[3.0], [1.0], [0.0]]))
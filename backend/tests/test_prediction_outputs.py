@@ -0,0 +1,63 @@
+import asyncio
+
+import numpy as np
+
+from app.services import prediction_outputs
+from app.services.prediction_outputs import encode_outputs, read_page, summarize_outputs
+
+
+def _stored(monkeypatch, predictions, probabilities=None, block_rows=10):
+    content, index = encode_outputs(predictions, probabilities, block_rows=block_rows)
+    ranges = []
+
+    async def download(path, byte_range=None):
+        ranges.append(byte_range)
+        first, last = byte_range
+        return content[first:last + 1]
+
+    monkeypatch.setattr(prediction_outputs.repositories.prediction_files, "download", download)
+    record = {
+        "output_url": prediction_outputs.repositories.prediction_files.public_url("u/1/out.npzb"),
+        "output_index": index,
+    }
+    return record, ranges, len(content)
+
+
+def test_page_is_read_with_one_range_request(monkeypatch):
+    predictions = np.arange(35, dtype=float)
+    probabilities = np.column_stack([1 - predictions / 35, predictions / 35])
+    record, ranges, total = _stored(monkeypatch, predictions, probabilities)
+
+    page = asyncio.run(read_page(record, offset=8, limit=5))
+
+    assert [row["row"] for row in page["rows"]] == [8, 9, 10, 11, 12]
+    assert [row["prediction"] for row in page["rows"]] == [8.0, 9.0, 10.0, 11.0, 12.0]
+    np.testing.assert_allclose(page["rows"][0]["probabilities"], probabilities[8])
+    assert page["next_offset"] == 13 and page["n_rows"] == 35
+    # Only the two blocks covering rows 8-12 are fetched
+    assert len(ranges) == 1 and ranges[0][0] == 0 and ranges[0][1] < total - 1
+
+
+def test_last_page_and_string_labels(monkeypatch):
+    labels = np.array(["cat", "dog"] * 6, dtype=object)
+    record, _, _ = _stored(monkeypatch, labels)
+
+    page = asyncio.run(read_page(record, offset=10, limit=50))
+    assert [row["prediction"] for row in page["rows"]] == ["cat", "dog"]
+    assert page["next_offset"] is None
+
+
+def test_inline_rows_are_sliced():
+    record = {"predictions": [1.0, 2.0, 3.0], "n_samples": 3}
+    page = asyncio.run(read_page(record, offset=1, limit=1))
+    assert page["rows"] == [{"row": 1, "prediction": 2.0}]
+    assert page["next_offset"] == 2
+
+
+def test_summary_statistics():
+    summary = summarize_outputs(np.array([1.0, 2.0, 3.0]))
+    assert summary["n_rows"] == 3 and summary["mean"] == 2.0
+
+    summary = summarize_outputs(np.array([0, 1, 1]), np.array([[0.9, 0.1], [0.2, 0.8], [0.4, 0.6]]))
+    assert summary["class_counts"] == {"1": 2, "0": 1}
+    assert abs(summary["mean_confidence"] - (0.9 + 0.8 + 0.6) / 3) < 1e-12
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_preprocessing import DataPreprocessing
+from app.services.profiling import (
+    CATEGORICAL, NUMERIC, DatasetProfile, ProfileBuilder, profile_csv, profile_frame,
+)
+
+
+def _frame(n=200):
+    rng = np.random.default_rng(0)
+    x = rng.normal(10, 3, n)
+    x[::17] = np.nan
+    return pd.DataFrame({
+        "x": x,
+        "k": rng.integers(0, 5, n),
+        "city": rng.choice(["paris", "rome", "oslo"], n),
+        "constant": 7,
+        "empty": [None] * n,
+    })
+
+
+def test_frame_profile_matches_pandas():
+    df = _frame()
+    profile = profile_frame(df)
+
+    assert profile.rows == len(df)
+    assert profile.of_kind(NUMERIC) == ["x", "k", "constant"]
+    assert profile.of_kind(CATEGORICAL) == ["city", "empty"]
+    for col in ("x", "k"):
+        column = profile[col]
+        assert column.nulls == df[col].isna().sum()
+        assert column.unique == df[col].nunique()
+        assert column.min == pytest.approx(df[col].min())
+        assert column.max == pytest.approx(df[col].max())
+        assert column.mean == pytest.approx(df[col].mean())
+        assert column.std == pytest.approx(df[col].std())
+    assert profile["city"].unique == 3 and profile["city"].min is None
+    assert profile["constant"].constant and not profile["x"].constant
+    assert profile["empty"].nulls == len(df) and not profile["empty"].constant
+
+
+def test_chunked_profile_matches_single_pass(tmp_path):
+    df = _frame(1000)
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+
+    whole = profile_frame(pd.read_csv(path))
+    chunked = profile_csv(str(path), chunk_rows=64)
+
+    assert chunked.rows == whole.rows
+    for expected in whole.columns:
+        column = chunked[expected.name]
+        assert (column.kind, column.nulls, column.count, column.unique) == \
+               (expected.kind, expected.nulls, expected.count, expected.unique)
+        for stat in ("min", "max", "mean", "std"):
+            assert getattr(column, stat) == pytest.approx(getattr(expected, stat))
+    assert 0 < chunked.peak_chunk_bytes < chunked.memory_bytes
+
+
+def test_column_turning_textual_becomes_categorical_and_caps_uniques():
+    builder = ProfileBuilder(max_exact_uniques=3)
+    builder.update(pd.DataFrame({"v": [1, 2, 3]}))
+    builder.update(pd.DataFrame({"v": ["a", "b", None]}))
+    column = builder.build()["v"]
+
+    assert column.kind == CATEGORICAL and column.mean is None
+    assert column.nulls == 1 and column.count == 5
+    assert not column.unique_exact
+
+
+def test_profile_round_trips_through_dict():
+    profile = profile_frame(_frame())
+    restored = DatasetProfile.from_dict(profile.to_dict())
+
+    assert restored.columns == profile.columns
+    assert "city" in restored and restored.rows == profile.rows
+
+
+def test_build_pipeline_uses_profile_cardinality():
+    X = pd.DataFrame({"x": np.arange(60.0), "code": [f"c{i % 3}" for i in range(60)]})
+    profile = profile_frame(X)
+    profile["code"].unique = 500
+
+    pipeline = DataPreprocessing().build_pipeline(X, profile=profile)
+
+    assert [name for name, _, _ in pipeline.transformers] == ["num", "cat_high"]
+
+
+def test_profile_turns_approximate_above_row_threshold():
+    df = pd.DataFrame({"id": [f"u{i}" for i in range(5000)], "x": np.arange(5000.0)})
+    builder = ProfileBuilder(approximate_min_rows=2000)
+    for start in range(0, len(df), 1000):
+        builder.update(df.iloc[start:start + 1000])
+    profile = builder.build()
+
+    assert profile.approximate and not profile["id"].unique_exact
+    assert profile["id"].unique == pytest.approx(5000, rel=0.03)
+    assert profile["x"].mean == pytest.approx(df["x"].mean())
+    assert profile["x"].quantiles["p50"] == pytest.approx(df["x"].median(), rel=0.03)
+    assert not profile_frame(df.head(100)).approximate
+
+
+def test_merged_builders_match_one_builder():
+    df = _frame(3000)
+    whole = ProfileBuilder(approximate=True).update(df).build()
+    merged = ProfileBuilder(approximate=True)
+    for part in np.array_split(np.arange(len(df)), 3):
+        merged.merge(ProfileBuilder(approximate=True).update(df.iloc[part]))
+    merged = merged.build()
+
+    assert merged.rows == whole.rows
+    for expected in whole.columns:
+        column = merged[expected.name]
+        assert (column.kind, column.nulls, column.count, column.unique) == \
+               (expected.kind, expected.nulls, expected.count, expected.unique)
+        assert column.std == pytest.approx(expected.std)
+
+
+def test_pipeline_decisions_are_profiled_on_the_training_split(monkeypatch):
+    from app.services import data_preprocessing
+
+    profiled = []
+
+    def recording_profile_frame(X, **kwargs):
+        profiled.append(len(X))
+        return profile_frame(X, **kwargs)
+
+    monkeypatch.setattr(data_preprocessing, "profile_frame", recording_profile_frame)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.normal(size=100), "code": [f"c{i % 3}" for i in range(100)],
+                       "y": rng.normal(size=100)})
+
+    X_train, _, _, _, _, _ = DataPreprocessing().preprocess_data(df, "y", test_size=0.2)
+
+    assert profiled == [len(X_train)] == [80]
@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+
+from app.db.database import SupabaseHTTP
+from app.db.repositories import StorageRepository, TableRepository
+
+
+def _client(handler):
+    return SupabaseHTTP("https://test.supabase.co", "key", transport=httpx.MockTransport(handler))
+
+
+def test_select_translates_filters_to_postgrest_params():
+    seen = {}
+
+    def handler(request: httpx.Request):
+        seen["params"] = dict(request.url.params)
+        seen["apikey"] = request.headers["apikey"]
+        return httpx.Response(200, json=[{"id": "m1"}])
+
+    repo = TableRepository("models", client=_client(handler))
+    rows = asyncio.run(repo.select(id=["m1", "m2"], user_id="u1", order="created_at", desc=True, limit=5))
+
+    assert rows == [{"id": "m1"}]
+    assert seen["params"] == {
+        "select": "*",
+        "id": "in.(m1,m2)",
+        "user_id": "eq.u1",
+        "order": "created_at.desc",
+        "limit": "5",
+    }
+    assert seen["apikey"] == "key"
+
+
+def test_storage_path_round_trips_through_public_url():
+    repo = StorageRepository("models", client=_client(lambda r: httpx.Response(200)))
+    path = "user-1/models/model_42 final.pkl"
+    assert repo.path_from_url(repo.public_url(path)) == path
+
+
+def test_insert_serializes_numpy_values():
+    import json
+
+    import numpy as np
+
+    seen = {}
+
+    def handler(request: httpx.Request):
+        seen["body"] = json.loads(request.content)
+        seen["prefer"] = request.headers["prefer"]
+        return httpx.Response(201)
+
+    repo = TableRepository("evaluations", client=_client(handler))
+    rows = asyncio.run(repo.insert(
+        {"metrics": {"R2": np.float64(0.5), "Confusion_Matrix": np.array([[1, 0], [0, 2]])}}, returning=False
+    ))
+
+    assert rows == []
+    assert seen["prefer"] == "return=minimal"
+    assert seen["body"] == {"metrics": {"R2": 0.5, "Confusion_Matrix": [[1, 0], [0, 2]]}}
@@ -0,0 +1,71 @@
+import asyncio
+
+from app.core import resources
+from app.core.resources import CoreBudget
+
+
+def test_leases_are_capped_and_queue_until_released(monkeypatch):
+    monkeypatch.setattr(resources, "_load_average", lambda: None)
+    budget = CoreBudget(total_cores=8, reserve_cores=2, max_cores_per_lease=4, poll_interval=0.05)
+
+    async def scenario():
+        first = await budget.acquire()
+        second = await budget.acquire()
+        assert (first.cores, second.cores) == (4, 2)
+
+        # Budget exhausted: the next lease waits for a release
+        waiter = asyncio.create_task(budget.acquire())
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+
+        await budget.release(first)
+        third = await asyncio.wait_for(waiter, timeout=1)
+        assert third.cores == 4
+        assert third.waited_seconds > 0
+
+    asyncio.run(scenario())
+
+
+def test_external_load_shrinks_the_budget(monkeypatch):
+    monkeypatch.setattr(resources, "_load_average", lambda: 5.0)
+    budget = CoreBudget(total_cores=8, reserve_cores=1)
+    assert budget.free_cores() == 2
+
+    # With nothing leased a training still gets the minimum instead of starving
+    lease = asyncio.run(CoreBudget(total_cores=2, reserve_cores=1).acquire(requested=4))
+    assert lease.cores == 1
+
+
+def test_acquire_right_after_release_ignores_the_previous_lease_in_the_load(monkeypatch):
+    now = [100.0]
+    budget = CoreBudget(total_cores=8, reserve_cores=1, clock=lambda: now[0])
+    monkeypatch.setattr(resources, "_load_average", lambda: 0.0)
+
+    async def scenario():
+        first = await budget.acquire(requested=6)
+        await budget.release(first)
+        # The finished training still shows up in the 1-minute load average
+        monkeypatch.setattr(resources, "_load_average", lambda: 6.0)
+        second = await budget.acquire(requested=6)
+        await budget.release(second)
+
+        # Minutes later, the same load is someone else's
+        now[0] += 600
+        return second.cores, budget.free_cores()
+
+    assert asyncio.run(scenario()) == (6, 1)
+
+
+def test_acquire_without_wait_returns_none_when_cores_are_taken(monkeypatch):
+    monkeypatch.setattr(resources, "_load_average", lambda: None)
+    budget = CoreBudget(total_cores=4, reserve_cores=0)
+
+    async def scenario():
+        training = await budget.acquire(requested=3)
+        assert await budget.acquire(requested=2, min_cores=2, wait=False) is None
+        partial = await budget.acquire(requested=2, wait=False)
+        assert partial.cores == 1
+        await budget.release(partial)
+        await budget.release(training)
+
+    asyncio.run(scenario())
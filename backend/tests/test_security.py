@@ -0,0 +1,130 @@
+import base64
+import json
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from app.core import security
+
+
+def _token(**claims):
+    payload = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 3600, **claims}
+    return jwt.encode(payload, "test-jwt-secret", algorithm="HS256")
+
+
+def test_verifies_signature_and_caches_claims(monkeypatch):
+    token = _token()
+    decoded = security.verify_supabase_token(f"Bearer {token}")
+    assert decoded["sub"] == "user-1"
+
+    # Second call must be served from the verified-token cache
+    monkeypatch.setattr(security, "_decode_token", lambda t: pytest.fail("token decoded twice"))
+    assert security.verify_supabase_token(f"Bearer {token}")["sub"] == "user-1"
+
+
+def test_rejects_bad_signature():
+    forged = jwt.encode({"sub": "user-1", "aud": "authenticated"}, "wrong-secret", algorithm="HS256")
+    with pytest.raises(HTTPException) as exc:
+        security.verify_supabase_token(f"Bearer {forged}")
+    assert exc.value.status_code == 401
+
+
+def test_rejects_expired_token():
+    with pytest.raises(HTTPException):
+        security.verify_supabase_token(f"Bearer {_token(exp=int(time.time()) - 10)}")
+
+
+class _Response:
+    def __init__(self, keys):
+        self._keys = keys
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"keys": self._keys}
+
+
+def test_cold_start_fetches_jwks_once(monkeypatch):
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(url)
+        time.sleep(0.05)
+        return _Response([{"kid": "k1", "kty": "oct"}])
+
+    monkeypatch.setattr(security.httpx, "get", get)
+    cache = security.JWKSCache("https://jwks", ttl=60, min_refresh_interval=30)
+
+    threads = [threading.Thread(target=cache.get_key, args=("k1",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1 and cache.get_key("k1")["kty"] == "oct"
+
+
+def test_failed_fetch_backs_off(monkeypatch):
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(url)
+        raise security.httpx.ConnectError("down")
+
+    monkeypatch.setattr(security.httpx, "get", get)
+    cache = security.JWKSCache("https://jwks", ttl=60, min_refresh_interval=0)
+
+    with pytest.raises(security.httpx.HTTPError):
+        cache.get_key("k1")
+    for _ in range(5):
+        assert cache.get_key("k1") is None
+    assert len(calls) == 1
+
+
+def test_malformed_jwk_is_rejected_with_401(monkeypatch):
+    monkeypatch.setattr(security.httpx, "get",
+                        lambda url, **kwargs: _Response([{"kid": "k1", "kty": "RSA", "n": "bad", "e": "bad"}]))
+    monkeypatch.setattr(security, "jwks_cache", security.JWKSCache("https://jwks", ttl=60, min_refresh_interval=30))
+    header = base64.urlsafe_b64encode(json.dumps({"alg": "RS256", "kid": "k1"}).encode()).rstrip(b"=").decode()
+
+    with pytest.raises(HTTPException) as exc:
+        security.verify_supabase_token(f"Bearer {header}.e30.c2ln")
+    assert exc.value.status_code == 401
+
+
+def _rsa_jwk_and_pem():
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jose import jwk
+
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public = jwk.construct(private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ), "RS256").to_dict()
+    public.pop("alg", None)
+    return {**public, "kid": "k1"}, pem
+
+
+def test_jwk_algorithm_comes_from_the_key_not_the_token(monkeypatch):
+    key, pem = _rsa_jwk_and_pem()
+    monkeypatch.setattr(security.httpx, "get", lambda url, **kwargs: _Response([key]))
+    monkeypatch.setattr(security, "jwks_cache", security.JWKSCache("https://jwks", ttl=60, min_refresh_interval=30))
+    claims = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 3600}
+
+    token = jwt.encode(claims, pem, algorithm="RS256", headers={"kid": "k1"})
+    assert security.verify_supabase_token(f"Bearer {token}")["sub"] == "user-1"
+
+    # Same RSA key, but the token asks for a different algorithm than the key type implies
+    other = jwt.encode(claims, pem, algorithm="RS512", headers={"kid": "k1"})
+    with pytest.raises(HTTPException) as exc:
+        security.verify_supabase_token(f"Bearer {other}")
+    assert exc.value.status_code == 401
+    with pytest.raises(security.JWTError):
+        security._key_algorithm({"kty": "RSA", "alg": "HS256"}, "HS256")
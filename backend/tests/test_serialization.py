@@ -0,0 +1,34 @@
+import json
+
+import numpy as np
+
+from app.services.predict_service import PredictionService
+from app.utils.serialization import dumps
+
+
+def test_numpy_values_are_serialized_directly():
+    payload = {
+        "floats": np.array([0.5, np.nan]),
+        "ints": np.arange(3, dtype=np.int64),
+        "labels": np.array(["a", "b"], dtype=object),
+        "scalar": np.int64(7),
+        1: "non-string key",
+    }
+    assert json.loads(dumps(payload)) == {
+        "floats": [0.5, None], "ints": [0, 1, 2], "labels": ["a", "b"], "scalar": 7, "1": "non-string key",
+    }
+
+
+def test_format_result_builds_confidence_columns():
+    predictor = PredictionService({"model": object(), "problem_type": "classification", "model_type": "m"})
+    probabilities = np.array([[0.2, 0.8], [0.9, 0.1]])
+    result = predictor.format_result(np.array([1, 0]), probabilities)
+
+    np.testing.assert_array_equal(result["confidence"], [0.8, 0.9])
+    np.testing.assert_array_equal(result["predicted_index"], [1, 0])
+    # Per-row dicts are opt-in
+    assert "predictions_with_confidence" not in result
+    body = json.loads(dumps(predictor.format_result(np.array([1, 0]), probabilities, row_details=True)))
+    assert body["predictions_with_confidence"][0] == {
+        "prediction": 1, "confidence": 0.8, "all_probabilities": {"0": 0.2, "1": 0.8},
+    }
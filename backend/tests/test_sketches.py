@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from app.utils.sketches import HyperLogLog, QuantileSketch
+
+
+@pytest.mark.parametrize("n", [0, 1, 100, 5_000, 300_000])
+def test_hyperloglog_estimate_is_within_error(n):
+    sketch = HyperLogLog(precision=14)
+    sketch.add(np.arange(n))
+    sketch.add(np.arange(n))  # duplicates do not count
+
+    assert sketch.estimate() == pytest.approx(n, rel=0.03, abs=1)
+
+
+def test_hyperloglog_merges_chunks_and_ignores_nulls():
+    values = np.array([f"user-{i}" for i in range(20_000)], dtype=object)
+    whole, merged = HyperLogLog(), HyperLogLog()
+    whole.add(values)
+    for chunk in np.array_split(values, 7):
+        part = HyperLogLog()
+        part.add(np.append(chunk, None))
+        merged.merge(part)
+
+    assert np.array_equal(whole.registers, merged.registers)
+    with pytest.raises(ValueError):
+        merged.merge(HyperLogLog(precision=10))
+
+
+def test_hyperloglog_counts_ints_and_floats_alike():
+    ints, floats = HyperLogLog(), HyperLogLog()
+    ints.add(np.arange(1000))
+    floats.add(np.append(np.arange(1000.0), np.nan))
+
+    assert np.array_equal(ints.registers, floats.registers)
+
+
+def test_quantile_sketch_is_exact_while_small():
+    sketch = QuantileSketch(k=200)
+    sketch.update([5.0, 1.0, np.nan, 3.0])
+
+    assert sketch.quantiles([0.0, 0.5, 1.0]) == [1.0, 3.0, 5.0]
+    assert QuantileSketch().quantiles([0.5]) == [None]
+
+
+def test_quantile_sketch_rank_error_is_bounded_when_merged():
+    values = np.random.default_rng(3).lognormal(size=200_000)
+    sketch = QuantileSketch(k=200)
+    for chunk in np.array_split(values, 8):
+        part = QuantileSketch(k=200, seed=None)
+        part.update(chunk)
+        sketch.merge(part)
+
+    ordered = np.sort(values)
+    assert sketch.count == len(values)
+    assert sum(len(level) for level in sketch.levels) < 2_000
+    for q, estimate in zip((0.05, 0.5, 0.95), sketch.quantiles([0.05, 0.5, 0.95])):
+        rank = np.searchsorted(ordered, estimate) / len(values)
+        assert abs(rank - q) < 0.02
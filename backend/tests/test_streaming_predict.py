@@ -0,0 +1,90 @@
+import asyncio
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from app.services import streaming_predict
+from app.services.predict_service import PredictionError
+
+
+@pytest.fixture
+def scoring_model(monkeypatch):
+    model = LinearRegression().fit(np.array([[0.0], [1.0], [2.0]]), np.array([1.0, 3.0, 5.0]))
+    inserted = []
+
+    async def get_model(**filters):
+        return {"id": 1, "status": "trained", "model_url": "u", "target_column": "y", "created_at": "t"}
+
+    async def load_model(*args, **kwargs):
+        return {"model": model, "preprocessor": None, "problem_type": "regression"}
+
+    async def local_artifact(*args, **kwargs):
+        return None
+
+    async def insert(data, returning=True):
+        inserted.append(data)
+        return [data]
+
+    async def update(values, returning=True, **filters):
+        return []
+
+    monkeypatch.setattr(streaming_predict.repositories.models, "get", get_model)
+    streaming_predict.model_metadata.clear()
+    monkeypatch.setattr(streaming_predict.repositories.predictions, "insert", insert)
+    monkeypatch.setattr(streaming_predict.repositories.models, "update", update)
+    monkeypatch.setattr(streaming_predict.model_store, "load_model", load_model)
+    monkeypatch.setattr(streaming_predict.model_store, "local_artifact", local_artifact)
+    return inserted
+
+
+def _collect(source, **kwargs):
+    async def scenario():
+        job, chunks = await streaming_predict.open_scoring_stream(1, "user", source, **kwargs)
+        return job, [chunk async for chunk in chunks]
+
+    return asyncio.run(scenario())
+
+
+def test_ndjson_output_is_streamed_chunk_by_chunk(scoring_model):
+    csv = pd.DataFrame({"x": np.arange(25, dtype=float), "y": 0.0}).to_csv(index=False).encode()
+    job, chunks = _collect(io.BytesIO(csv), source_file="f.csv", total_bytes=len(csv), chunk_rows=10)
+
+    assert len(chunks) == 3
+    rows = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+    assert [r["row"] for r in rows] == list(range(25))
+    np.testing.assert_allclose([r["prediction"] for r in rows], 2 * np.arange(25) + 1)
+
+    progress = job.to_dict()
+    assert progress["status"] == "succeeded"
+    assert progress["rows_processed"] == 25 and progress["progress"] == 1.0
+    assert scoring_model[0]["n_samples"] == 25
+
+
+def test_csv_output_has_a_single_header(scoring_model):
+    csv = pd.DataFrame({"x": np.arange(7, dtype=float)}).to_csv(index=False).encode()
+    _, chunks = _collect(io.BytesIO(csv), output_format="csv", chunk_rows=3, save_summary=False)
+
+    frame = pd.read_csv(io.BytesIO(b"".join(chunks)))
+    assert list(frame.columns) == ["row", "prediction"]
+    assert len(frame) == 7
+    assert not scoring_model
+
+
+def test_unknown_output_format_is_rejected_before_streaming(scoring_model):
+    with pytest.raises(PredictionError):
+        _collect(io.BytesIO(b"x\n1\n"), output_format="xml")
+
+
+def test_csv_stream_failing_mid_way_ends_with_error_marker(scoring_model):
+    csv = b"x\n" + b"".join(f"{i}\n".encode() for i in range(3)) + b"oops\n1\n2\n"
+    job, chunks = _collect(io.BytesIO(csv), output_format="csv", chunk_rows=3, save_summary=False)
+
+    body = b"".join(chunks).decode()
+    assert body.splitlines()[-1].startswith(streaming_predict.CSV_ERROR_MARKER)
+    assert "rows_processed=3" in body
+    assert len(pd.read_csv(io.StringIO(body), comment="#")) == 3
+    assert job.status == "failed"
@@ -0,0 +1,214 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.resources import CoreBudget
+from app.services import training_jobs
+from app.services.training_jobs import JobStatus, TrainingJobManager
+
+
+def _stub_training(kwargs, conn):
+    """Stands in for ``_run_training_job``: reports stages, then a model row or an error."""
+    try:
+        for stage in kwargs.get("stages", []):
+            conn.send(("stage", stage))
+            time.sleep(kwargs.get("stage_seconds", 0))
+        if kwargs.get("fail"):
+            conn.send(("error", kwargs["fail"]))
+            return
+        # The real pipeline inserts the models row as its last step
+        if kwargs.get("model_row"):
+            with open(kwargs["model_row"], "w") as f:
+                f.write(kwargs["dataset_id"])
+        conn.send(("result", {"id": 7, "metrics": {"r2": 0.9}, "model_url": "models/7.pkl"}))
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def manager_factory(tmp_path, monkeypatch):
+    monkeypatch.setattr(training_jobs, "core_budget", CoreBudget(total_cores=4, reserve_cores=0))
+    monkeypatch.setattr("app.core.resources._load_average", lambda: None)
+    announced = []
+
+    async def record_announcement(user_id, result):
+        announced.append((user_id, result["id"]))
+
+    monkeypatch.setattr(TrainingJobManager, "_on_model_trained", staticmethod(record_announcement))
+
+    def make(max_workers=1):
+        manager = TrainingJobManager(
+            str(tmp_path / "jobs"), max_workers=max_workers, poll_interval=0.05, target=_stub_training
+        )
+        manager.announced = announced
+        return manager
+
+    return make
+
+
+async def _wait_for(manager, job_id, condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id, "user-1")
+        if condition(job):
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"Job {job_id} never reached the expected state: {manager.get(job_id, 'user-1')}")
+
+
+def test_job_reports_stages_and_result(manager_factory):
+    manager = manager_factory()
+
+    async def scenario():
+        await manager.start()
+        job = manager.submit("user-1", "ds-1", {"stages": ["preprocessing", "training"], "stage_seconds": 0.5})
+        assert manager.get(job.id, "user-1").status == JobStatus.QUEUED
+        assert manager.get(job.id, "someone-else") is None
+
+        running = await _wait_for(manager, job.id, lambda j: j.stage == "training")
+        assert running.status == JobStatus.RUNNING
+        assert running.started_at is not None
+        assert running.resources["cores"] >= 1
+
+        done = await _wait_for(manager, job.id, lambda j: j.status == JobStatus.SUCCEEDED)
+        await manager.shutdown()
+        return done
+
+    done = asyncio.run(scenario())
+    assert done.result == {"id": 7, "metrics": {"r2": 0.9}, "model_url": "models/7.pkl"}
+    assert done.to_dict()["model_id"] == 7
+    assert done.error is None
+    assert manager.announced == [("user-1", 7)]
+
+
+def test_process_error_marks_the_job_failed(manager_factory):
+    manager = manager_factory()
+
+    async def scenario():
+        await manager.start()
+        job = manager.submit("user-1", "ds-1", {"fail": "Target column not found"})
+        done = await _wait_for(manager, job.id, lambda j: j.status in training_jobs.FINISHED_STATUSES)
+        await manager.shutdown()
+        return done
+
+    done = asyncio.run(scenario())
+    assert done.status == JobStatus.FAILED
+    assert done.error == "Target column not found"
+    assert manager.announced == []
+
+
+def test_worker_loop_marks_unexpected_errors_failed(manager_factory, monkeypatch):
+    manager = manager_factory()
+
+    async def broken_run(job, lease):
+        raise RuntimeError("lease bookkeeping broke")
+
+    monkeypatch.setattr(manager, "_run_with_lease", broken_run)
+
+    async def scenario():
+        await manager.start()
+        job = manager.submit("user-1", "ds-1", {})
+        done = await _wait_for(manager, job.id, lambda j: j.status in training_jobs.FINISHED_STATUSES)
+        # The worker slot survives and keeps serving the queue
+        assert not manager._workers[0].done()
+        await manager.shutdown()
+        return done
+
+    done = asyncio.run(scenario())
+    assert done.status == JobStatus.FAILED
+    assert done.error == "Worker error: lease bookkeeping broke"
+    assert done.finished_at is not None
+
+
+def test_cancelled_queued_job_is_skipped(manager_factory, tmp_path):
+    manager = manager_factory(max_workers=1)
+    marker = tmp_path / "queued-model-row"
+
+    async def scenario():
+        await manager.start()
+        first = manager.submit("user-1", "ds-1", {"stages": ["training"], "stage_seconds": 1.0})
+        second = manager.submit("user-1", "ds-2", {"model_row": str(marker)})
+        assert manager.queue_position(manager.get(second.id, "user-1")) == 1
+
+        cancelled = manager.cancel(second.id, "user-1")
+        assert cancelled.status == JobStatus.CANCELLED
+
+        await _wait_for(manager, first.id, lambda j: j.status == JobStatus.SUCCEEDED)
+        await manager._queue.join()
+        skipped = manager.get(second.id, "user-1")
+        await manager.shutdown()
+        return skipped
+
+    skipped = asyncio.run(scenario())
+    assert skipped.status == JobStatus.CANCELLED
+    assert skipped.started_at is None
+    assert not marker.exists()
+    assert manager.announced == [("user-1", 7)]
+
+
+def test_cancelling_a_running_job_terminates_its_process(manager_factory, tmp_path):
+    manager = manager_factory()
+    marker = tmp_path / "running-model-row"
+
+    async def scenario():
+        await manager.start()
+        job = manager.submit(
+            "user-1", "ds-1", {"stages": ["training"], "stage_seconds": 30, "model_row": str(marker)}
+        )
+        await _wait_for(manager, job.id, lambda j: j.stage == "training")
+        process = manager._processes[job.id]
+
+        manager.cancel(job.id, "user-1")
+        await manager._queue.join()
+        assert not process.is_alive()
+        cancelled = manager.get(job.id, "user-1")
+        await manager.shutdown()
+        return cancelled
+
+    cancelled = asyncio.run(scenario())
+    assert cancelled.status == JobStatus.CANCELLED
+    assert cancelled.result is None
+    assert not marker.exists()
+    assert manager.announced == []
+
+
+def test_every_process_serves_jobs_from_the_shared_store(manager_factory, tmp_path):
+    owner = manager_factory()
+    other = manager_factory()
+    marker = tmp_path / "other-model-row"
+
+    async def scenario():
+        await owner.start()
+        await other.start()
+        assert owner.is_owner and not other.is_owner
+
+        # Submitted through a non-owner, run by the owner, reported by both
+        job = other.submit("user-1", "ds-1", {})
+        done = await _wait_for(other, job.id, lambda j: j.status == JobStatus.SUCCEEDED)
+        assert done.result["id"] == 7
+        assert [j.id for j in owner.list("user-1")] == [job.id]
+
+        # Cancelled through the non-owner, the owner terminates the process on its next poll
+        running = other.submit("user-1", "ds-2", {"stages": ["training"], "stage_seconds": 30, "model_row": str(marker)})
+        await _wait_for(other, running.id, lambda j: j.stage == "training")
+        other.cancel(running.id, "user-1")
+        await owner._queue.join()
+        assert owner.get(running.id, "user-1").status == JobStatus.CANCELLED
+
+        # The other process takes over the pool once the owner exits
+        await owner.shutdown()
+        await asyncio.sleep(0.2)
+        assert other.is_owner
+        late = other.submit("user-1", "ds-3", {})
+        await _wait_for(other, late.id, lambda j: j.status == JobStatus.SUCCEEDED)
+        await other.shutdown()
+
+    asyncio.run(scenario())
+    assert not marker.exists()
+
+
+def test_job_ids_outside_the_store_are_not_found(manager_factory):
+    manager = manager_factory()
+    assert manager.get("../../etc/passwd", "user-1") is None
+    assert manager.cancel("../owner", "user-1") is None
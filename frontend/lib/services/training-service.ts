@@ -76,6 +76,20 @@ export interface TrainingResponse {
   }
 }
 
+export interface TrainingJob {
+  job_id: string
+  dataset_id: string
+  status: "queued" | "running" | "succeeded" | "failed" | "cancelled"
+  stage: string | null
+  error: string | null
+  model_id: string | null
+  queue_position: number | null
+}
+
+const JOB_POLL_INTERVAL_MS = 2000
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
 export const trainingService = {
   async getDatasets(): Promise<Dataset[]> {
     return apiRequest<Dataset[]>('/datasets/', {
@@ -101,11 +115,34 @@ export const trainingService = {
       }
     })
 
-    return apiRequest<TrainingResponse>(
+    // Training runs as a background job: submit it, then poll until it finishes
+    const submitted = await apiRequest<{ status: string; data: TrainingJob }>(
       `/train/${dataset_id}?${queryParams.toString()}`,
       {
         method: 'POST',
       }
     )
+
+    let job = submitted.data
+    while (job.status === "queued" || job.status === "running") {
+      await sleep(JOB_POLL_INTERVAL_MS)
+      job = await this.getJob(job.job_id)
+    }
+
+    return apiRequest<TrainingResponse>(`/train/jobs/${job.job_id}/result`, {
+      method: 'GET',
+    })
+  },
+
+  async getJob(jobId: string): Promise<TrainingJob> {
+    return apiRequest<{ status: string; data: TrainingJob }>(`/train/jobs/${jobId}`, {
+      method: 'GET',
+    }).then(res => res.data)
+  },
+
+  async cancelJob(jobId: string): Promise<TrainingJob> {
+    return apiRequest<{ status: string; data: TrainingJob }>(`/train/jobs/${jobId}`, {
+      method: 'DELETE',
+    }).then(res => res.data)
   },
 }
\ No newline at end of file